@@ -0,0 +1,180 @@
+"""
+Benchmark do workflow de segurança
+
+Corre run_security_check (modo "single", um website de cada vez, com a
+análise LLM falsa) e o BatchSecurityScanner (modo "batch") contra a
+StubFarm local, e reporta:
+
+- sites/s e latência p50/p95 por website
+- ligações TCP abertas e handshakes TLS (contados pela farm)
+- pico de memória (RSS) do processo
+
+Cada cenário (modo x número de websites) corre num processo próprio, com
+uma cache vazia, para que o pico de RSS e a cache não se misturem.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_security.py
+    python benchmarks/bench_security.py --sizes 10 100 1000 --modes batch --latency-ms 50
+    python benchmarks/bench_security.py --output bench.json
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / "src"
+
+
+def run_scenario(mode: str, n_sites: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """Executa um cenário no processo atual (chamado pelo subprocesso)"""
+    from stub_farm import StubFarm
+
+    with tempfile.TemporaryDirectory(prefix="leadgen-bench-") as workdir:
+        farm = StubFarm(n_sites, latency_ms=args.latency_ms, workdir=Path(workdir)).start()
+
+        # Ambiente isolado: cache vazia, CA da farm e nenhuma chave real
+        os.environ["LEADGEN_CACHE_DIR"] = str(Path(workdir) / "cache")
+        os.environ["REQUESTS_CA_BUNDLE"] = str(farm.ca_bundle)
+        os.environ["OPENAI_API_KEY"] = "bench-fake-key"
+        sys.path.insert(0, str(SRC_DIR))
+
+        import orchestration.security_workflow as security_workflow
+        from fakes import FakeSecurityAnalysisAgent
+
+        security_workflow.set_analysis_agent(FakeSecurityAnalysisAgent(args.llm_latency_ms / 1000))
+
+        urls = farm.urls
+        started = time.perf_counter()
+        if mode == "single":
+            latencies, reports = _run_single(security_workflow, urls, args)
+        else:
+            latencies, reports = _run_batch(urls, args)
+        elapsed = time.perf_counter() - started
+
+        farm.stop()
+
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    return {
+        "mode": mode,
+        "sites": n_sites,
+        "elapsed_s": round(elapsed, 2),
+        "sites_per_s": round(n_sites / elapsed, 2) if elapsed else None,
+        "p50_ms": round(_percentile(latencies_ms, 50), 1),
+        "p95_ms": round(_percentile(latencies_ms, 95), 1),
+        "sockets_opened": farm.sockets_accepted,
+        "tls_handshakes": farm.tls_handshakes,
+        "unreachable": sum(1 for report in reports if report.get("reachable") is False),
+        "timed_out": sum(1 for report in reports if report.get("timed_out")),
+        "errors": sum(1 for report in reports if report.get("error")),
+        # ru_maxrss em KiB no Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def _run_single(security_workflow, urls: List[str], args: argparse.Namespace):
+    """Um website de cada vez, como no separador Security (LLM incluída)"""
+    latencies, reports = [], []
+    for url in urls:
+        started = time.perf_counter()
+        reports.append(security_workflow.run_security_check(url, llm_mode="wait", budget=args.budget))
+        latencies.append(time.perf_counter() - started)
+    return latencies, reports
+
+
+def _run_batch(urls: List[str], args: argparse.Namespace):
+    """Dataset completo pelo BatchSecurityScanner (LLM ignorada)"""
+    import pandas as pd
+    from orchestration.batch_scanner import BatchSecurityScanner
+
+    df = pd.DataFrame({"Nome": [f"Empresa {i}" for i in range(len(urls))], "Website": urls})
+    scanner = BatchSecurityScanner(max_workers=args.workers, budget=args.budget, llm_top_n=args.llm_top_n)
+    results = scanner.scan(df)
+
+    latencies = results["duration_s"].dropna().tolist()
+    reports = [
+        {"reachable": row.get("reachable"), "timed_out": row.get("timed_out"), "error": row.get("error")}
+        for row in results.to_dict("records")
+    ]
+    return latencies, reports
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    index = min(int(round(percent / 100 * (len(values) - 1))), len(values) - 1)
+    return values[index]
+
+
+def _spawn(mode: str, n_sites: int, argv: List[str]) -> Dict[str, Any]:
+    """Corre o cenário num subprocesso e devolve o resultado (última linha JSON)"""
+    completed = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), "--scenario", mode, "--sites", str(n_sites), *argv],
+        capture_output=True,
+        text=True,
+        cwd=BENCH_DIR,
+    )
+    if completed.returncode != 0:
+        return {"mode": mode, "sites": n_sites, "failed": completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _print_table(results: List[Dict[str, Any]]):
+    columns = ["mode", "sites", "sites_per_s", "p50_ms", "p95_ms", "sockets_opened",
+               "tls_handshakes", "unreachable", "timed_out", "peak_rss_mb"]
+    print(" | ".join(f"{column:>14}" for column in columns))
+    for result in results:
+        if "failed" in result:
+            print(f"{result['mode']:>14} | {result['sites']:>14} | FALHOU: {result['failed']}")
+            continue
+        print(" | ".join(f"{str(result.get(column)):>14}" for column in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do workflow de segurança contra uma farm local")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="Número de websites por cenário")
+    parser.add_argument("--modes", nargs="+", choices=["single", "batch"], default=["single", "batch"])
+    parser.add_argument("--single-max", type=int, default=100,
+                        help="Maior cenário executado em modo single (é sequencial)")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Latência média de cada resposta da farm")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Latência do LLM falso")
+    parser.add_argument("--workers", type=int, default=16, help="Workers do modo batch")
+    parser.add_argument("--llm-top-n", type=int, default=0, help="Análises LLM no fim do batch")
+    parser.add_argument("--budget", type=float, default=None, help="Prazo por scan (s)")
+    parser.add_argument("--output", type=Path, help="Guardar os resultados em JSON")
+    parser.add_argument("--scenario", choices=["single", "batch"], help=argparse.SUPPRESS)
+    parser.add_argument("--sites", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        print(json.dumps(run_scenario(args.scenario, args.sites, args)))
+        return
+
+    # Opções repassadas a cada subprocesso
+    argv = ["--latency-ms", str(args.latency_ms), "--llm-latency-ms", str(args.llm_latency_ms),
+            "--workers", str(args.workers), "--llm-top-n", str(args.llm_top_n)]
+    if args.budget is not None:
+        argv += ["--budget", str(args.budget)]
+
+    results = []
+    for mode in args.modes:
+        for n_sites in args.sizes:
+            if mode == "single" and n_sites > args.single_max:
+                continue
+            print(f"▶ {mode} x {n_sites} websites...", file=sys.stderr)
+            results.append(_spawn(mode, n_sites, argv))
+
+    _print_table(results)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Fakes para os benchmarks
+
+Substitutos determinísticos dos agentes LLM, para que os benchmarks não
+dependam da rede nem da API da OpenAI.
+"""
+
+from typing import Any, Callable, Dict, Optional
+import time
+
+
+class FakeSecurityAnalysisAgent:
+    """
+    Substituto do SecurityAnalysisAgent com latência fixa e texto
+    determinístico (mesmo formato de resposta).
+    """
+
+    def __init__(self, latency_s: float = 0.0):
+        self.latency_s = latency_s
+        self.calls = 0
+
+    def process(self, input_data: Dict[str, Any],
+                on_token: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        self.calls += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+        url = input_data.get("url", "")
+        risk_score = input_data.get("risk_score", 0)
+        risk_level = input_data.get("risk_level", "UNKNOWN")
+        analysis = f"Resumo: {url} tem risco {risk_level} ({risk_score}/100)."
+        if on_token is not None:
+            on_token(analysis)
+        return {
+            "llm_analysis": {
+                "status": "✅ Análise Completa",
+                "analysis": analysis,
+                "url": url,
+                "risk_score": risk_score,
+                "risk_level": risk_level
+            }
+        }
@@ -0,0 +1,121 @@
+"""
+Import-time budget
+
+Verifica que os módulos carregados no arranque das páginas Streamlit
+importam dentro do orçamento de tempo e sem puxar dependências pesadas
+(LLM, langgraph, fpdf, plotly), que só devem ser carregadas no primeiro
+uso.
+
+Cada módulo é importado num processo novo com `python -X importtime`, a
+partir de src/. Termina com código 1 se algum módulo falhar o orçamento.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/import_budget.py
+    python benchmarks/import_budget.py --budget-ms 800 --verbose
+"""
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+# Módulos importados pelas páginas antes do primeiro paint
+STARTUP_MODULES = [
+    "ui.pagesEnum",
+    "ui.sidebar",
+    "ui.company_selector",
+    "ui.company_details",
+    "ui.upload_data",
+    "ui.batch_scan_ui",
+    "ui.website_analysis.website_analysis_ui",
+]
+
+# Dependências que só podem ser carregadas no primeiro uso
+DEFERRED_MODULES = [
+    "langchain_openai",
+    "langchain_core",
+    "langgraph",
+    "openai",
+    "fpdf",
+    # O streamlit já importa plotly.graph_objects; plotly.express não
+    "plotly.express",
+    "orchestration.security_workflow",
+]
+
+DEFAULT_BUDGET_MS = 1500
+
+
+def measure_import(module: str) -> Tuple[float, List[Tuple[float, str]], List[str]]:
+    """
+    Importa `module` num processo novo.
+
+    Returns:
+        (tempo cumulativo em ms, [(ms, módulo)] mais lentos, módulos adiados que foram carregados)
+    """
+    probe = (
+        f"import sys, json; import {module}; "
+        f"print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))"
+    )
+    env = {**os.environ, "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "import-budget")}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        capture_output=True,
+        text=True,
+        cwd=SRC_DIR,
+        env=env,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+
+    cumulative: Dict[str, float] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace("import time:", "|").split("|")]
+        cumulative[name.strip()] = int(cumulative_us) / 1000
+
+    total = cumulative.get(module, 0.0)
+    slowest = sorted(((ms, name) for name, ms in cumulative.items() if name != module), reverse=True)[:5]
+    loaded = json.loads(completed.stdout.strip().splitlines()[-1])
+    return total, slowest, loaded
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Orçamento de tempo de import dos módulos de arranque")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Tempo máximo por módulo")
+    parser.add_argument("--modules", nargs="+", default=STARTUP_MODULES)
+    parser.add_argument("--verbose", action="store_true", help="Mostrar os imports mais lentos de cada módulo")
+    args = parser.parse_args()
+
+    failures = 0
+    for module in args.modules:
+        try:
+            total, slowest, loaded = measure_import(module)
+        except RuntimeError as e:
+            print(f"❌ {module}: erro no import ({e})")
+            failures += 1
+            continue
+
+        problems = []
+        if total > args.budget_ms:
+            problems.append(f"{total:.0f} ms > {args.budget_ms:.0f} ms")
+        if loaded:
+            problems.append(f"carrega {', '.join(loaded)}")
+
+        status = "❌" if problems else "✅"
+        print(f"{status} {module}: {total:.0f} ms" + (f" ({'; '.join(problems)})" if problems else ""))
+        if args.verbose or problems:
+            for ms, name in slowest:
+                print(f"      {ms:8.1f} ms  {name}")
+        failures += bool(problems)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+"""
+Stub Web Farm
+
+Servidores HTTP e HTTPS locais que simulam N websites para os benchmarks
+do workflow de segurança, sem acesso à rede.
+
+Cada website tem um endereço próprio em 127.0.0.0/8 (127.0.1.1,
+127.0.1.2, ...) e é identificado pelo header Host. As características de
+cada site (esquema, headers, cookies, CMS, ficheiros expostos, websites
+inacessíveis) são determinísticas a partir do seu índice, para que os
+resultados sejam comparáveis entre execuções.
+
+O certificado TLS é autoassinado (openssl) e cobre todos os IPs da farm;
+usar `farm.ca_bundle` como REQUESTS_CA_BUNDLE.
+
+Uso:
+    with StubFarm(n_sites=100, latency_ms=20) as farm:
+        for url in farm.urls:
+            ...
+"""
+
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+import random
+import socket
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+
+
+SECURITY_HEADERS = {
+    "Content-Security-Policy": "default-src 'self'",
+    "X-Frame-Options": "DENY",
+    "X-Content-Type-Options": "nosniff",
+    "Strict-Transport-Security": "max-age=31536000",
+}
+
+CMS_BODIES = [
+    '<html><head><meta name="generator" content="WordPress 6.1"></head>'
+    '<body><script src="/wp-includes/js/jquery.js?ver=6.1.1"></script>wp-content</body></html>',
+    '<html><body><a href="/components/com_content/">Joomla</a></body></html>',
+    '<html><body><img src="/sites/default/files/logo.png">drupal</body></html>',
+    '<html><body><h1>Empresa</h1><p>Site estático</p></body></html>',
+]
+
+
+@dataclass
+class SiteProfile:
+    """Características de um website da farm"""
+    index: int
+    host: str
+    https: bool
+    dead: bool
+    redirect_to_https: bool
+    security_headers: bool
+    secure_cookies: bool
+    body: str
+    exposed: Dict[str, int]
+    latency_s: float
+
+
+def site_profile(index: int, latency_ms: float, jitter: float = 0.5) -> SiteProfile:
+    """
+    Perfil determinístico do website `index`.
+
+    - 1 em cada 20 websites não responde (porta fechada)
+    - Metade é HTTPS; 1 em cada 4 HTTP redireciona para HTTPS
+    - 1 em cada 10 expõe /.git/HEAD, 1 em cada 25 expõe /.env
+    """
+    rng = random.Random(index)
+    exposed = {"/robots.txt": 200, "/sitemap.xml": 200}
+    if index % 10 == 0:
+        exposed["/.git/HEAD"] = 200
+        exposed["/.git/config"] = 200
+    if index % 25 == 0:
+        exposed["/.env"] = 200
+    if index % 7 == 0:
+        exposed["/admin"] = 403
+        exposed["/wp-admin/"] = 200
+
+    latency = latency_ms / 1000 * (1 + rng.uniform(-jitter, jitter))
+    return SiteProfile(
+        index=index,
+        host=f"127.0.{1 + index // 250}.{1 + index % 250}",
+        https=index % 2 == 0,
+        dead=index % 20 == 19,
+        redirect_to_https=index % 4 == 1,
+        security_headers=index % 3 == 0,
+        secure_cookies=index % 2 == 0,
+        body=CMS_BODIES[index % len(CMS_BODIES)],
+        exposed=exposed,
+        latency_s=max(latency, 0.0),
+    )
+
+
+class _FarmHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_FarmServer"
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self._respond(body=False)
+
+    def do_GET(self):
+        self._respond(body=True)
+
+    def _respond(self, body: bool):
+        host = (self.headers.get("Host") or "").split(":")[0]
+        profile = self.server.farm.profiles.get(host)
+        if profile is None:
+            self._send(404, {}, b"", body)
+            return
+
+        if profile.latency_s:
+            time.sleep(profile.latency_s)
+
+        path = self.path.split("?")[0]
+        if path == "/":
+            if not self.server.tls and profile.redirect_to_https:
+                location = f"https://{host}:{self.server.farm.https_port}/"
+                self._send(301, {"Location": location}, b"", body)
+                return
+
+            headers = dict(SECURITY_HEADERS) if profile.security_headers else {}
+            headers["Server"] = "stub-farm"
+            cookie_flags = "; Secure; HttpOnly; SameSite=Lax" if profile.secure_cookies else ""
+            headers["Set-Cookie"] = [f"sessionid=s{profile.index}; Path=/{cookie_flags}", "tracking=1; Path=/"]
+            self._send(200, headers, profile.body.encode(), body)
+            return
+
+        status = profile.exposed.get(path, 404)
+        content = b"ref: refs/heads/main\n" if status == 200 and path.startswith("/.git") else b""
+        self._send(status, {}, content, body)
+
+    def _send(self, status: int, headers: Dict, content: bytes, body: bool):
+        self.send_response(status)
+        for name, value in headers.items():
+            for item in (value if isinstance(value, list) else [value]):
+                self.send_header(name, item)
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.end_headers()
+        if body and content:
+            self.wfile.write(content)
+
+
+class _FarmServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, farm: "StubFarm", tls_context: Optional[ssl.SSLContext]):
+        # Todas as interfaces: os websites usam vários endereços 127.x.x.x
+        super().__init__(("0.0.0.0", 0), _FarmHandler)
+        self.farm = farm
+        self.tls = tls_context
+
+    def verify_request(self, request, client_address) -> bool:
+        # Só aceita ligações locais
+        return client_address[0].startswith("127.")
+
+    def finish_request(self, request, client_address):
+        with self.farm.lock:
+            self.farm.sockets_accepted += 1
+
+        if self.tls:
+            # Handshake na thread do pedido (não serializa o accept)
+            try:
+                request = self.tls.wrap_socket(request, server_side=True)
+            except (ssl.SSLError, OSError):
+                return
+            with self.farm.lock:
+                self.farm.tls_handshakes += 1
+
+        super().finish_request(request, client_address)
+
+
+class StubFarm:
+    """
+    Farm de websites sintéticos (HTTP e HTTPS) num único processo.
+
+    Attributes:
+        urls: URL inicial de cada website (pela ordem dos índices)
+        sockets_accepted: Ligações TCP aceites pelos servidores
+        tls_handshakes: Handshakes TLS concluídos
+        ca_bundle: Certificado a usar como REQUESTS_CA_BUNDLE
+    """
+
+    def __init__(self, n_sites: int, latency_ms: float = 20.0, jitter: float = 0.5,
+                 workdir: Optional[Path] = None):
+        """
+        Args:
+            n_sites: Número de websites (até 62 500)
+            latency_ms: Latência média de cada resposta
+            jitter: Variação relativa da latência (0.5 = ±50%)
+            workdir: Diretório para o certificado (por omissão, temporário)
+        """
+        self.n_sites = n_sites
+        self.profiles: Dict[str, SiteProfile] = {}
+        for index in range(n_sites):
+            profile = site_profile(index, latency_ms, jitter)
+            self.profiles[profile.host] = profile
+
+        self.workdir = Path(workdir or tempfile.mkdtemp(prefix="leadgen-bench-"))
+        self.ca_bundle = self.workdir / "farm-cert.pem"
+        self.lock = threading.Lock()
+        self.sockets_accepted = 0
+        self.tls_handshakes = 0
+
+        self._servers: List[_FarmServer] = []
+        self.http_port = 0
+        self.https_port = 0
+        self.dead_port = 0
+
+    @property
+    def urls(self) -> List[str]:
+        urls = []
+        for profile in self.profiles.values():
+            if profile.dead:
+                urls.append(f"http://{profile.host}:{self.dead_port}/")
+            elif profile.https:
+                urls.append(f"https://{profile.host}:{self.https_port}/")
+            else:
+                urls.append(f"http://{profile.host}:{self.http_port}/")
+        return urls
+
+    def start(self) -> "StubFarm":
+        """Gera o certificado e arranca os servidores HTTP e HTTPS"""
+        key_file = self.workdir / "farm-key.pem"
+        self._generate_certificate(key_file)
+
+        tls_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        tls_context.load_cert_chain(self.ca_bundle, key_file)
+
+        http_server = _FarmServer(self, None)
+        https_server = _FarmServer(self, tls_context)
+        self.http_port = http_server.server_address[1]
+        self.https_port = https_server.server_address[1]
+        self.dead_port = _closed_port()
+
+        for server in (http_server, https_server):
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self._servers.append(server)
+        return self
+
+    def stop(self):
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        self._servers.clear()
+
+    def __enter__(self) -> "StubFarm":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _generate_certificate(self, key_file: Path):
+        """Certificado autoassinado com todos os IPs da farm no subjectAltName"""
+        san = ",".join(f"IP:{host}" for host in self.profiles) or "IP:127.0.0.1"
+        subprocess.run(
+            [
+                "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+                "-keyout", str(key_file), "-out", str(self.ca_bundle),
+                "-days", "2", "-subj", "/CN=leadgen-bench",
+                "-addext", f"subjectAltName={san}",
+            ],
+            check=True,
+            capture_output=True,
+        )
+
+
+def _closed_port() -> int:
+    """Porta local sem nenhum servidor (ligações recusadas)"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
@@ -1,16 +1,352 @@
-from abc import ABC, abstractmethod
-from typing import Dict, Any
+from abc import ABC
+from dataclasses import dataclass
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple, Union
+import asyncio
+import copy
 import logging
 
+from services.cache.llm_cache import get_llm_cache, make_key
+from services.llm import (acall_with_retry, call_with_retry, count_tokens, get_llm, get_prompt_budget,
+                          get_rate_limiter, record_usage, run_async, truncate_text)
+
+# Tokens reservados para a resposta quando o modelo não define max_tokens
+DEFAULT_COMPLETION_TOKENS = 512
+
+
+@dataclass
+class LLMRequest:
+    """Pedido ao LLM preparado por um agente (variáveis e template a usar)"""
+    inputs: Dict[str, Any]
+    prompt: Any = None
+
+
 class BaseAgent(ABC):
+    """
+    Base dos agentes.
+
+    Os agentes LLM definem _prepare (dados -> LLMRequest), _parse (resposta
+    -> resultado) e _failure (erro -> resultado); process e aprocess fazem
+    o resto, respetivamente com invoke e ainvoke. As variáveis do pedido
+    são cortadas ao orçamento de tokens do agente (services.llm.budget).
+    Com on_token, process recebe a resposta em streaming, pedaço a pedaço.
+    Para muitos pedidos, process_many corre abatch no event loop LLM
+    partilhado (services.llm.event_loop) a partir de código síncrono.
+    Agentes sem LLM reescrevem process diretamente.
+
+    O modelo (self.llm) vem do registo partilhado (services.llm.clients),
+    com o perfil LLM_PROFILE de config_llm.yaml.
+    """
+
+    # Incrementar quando o prompt do agente mudar (invalida as respostas em cache)
+    PROMPT_VERSION = "1"
+    # Perfil em config_llm.yaml (a secção routes pode trocá-lo por agente)
+    LLM_PROFILE = "default"
+
     def __init__(self, name: str):
         self.name = name
         self.logger = logging.getLogger(f"agent.{name}")
-    
-    @abstractmethod
-    def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Processa os dados e retorna resultado"""
-        pass
-    
+        # Reutilizar respostas LLM já obtidas (ver services.cache.llm_cache)
+        self.use_llm_cache = True
+        # Tokens máximos por variável do prompt
+        self.prompt_budget = get_prompt_budget(name)
+
+    def process(self, input_data: Dict[str, Any],
+                on_token: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Processa os dados e retorna resultado
+
+        Args:
+            input_data: Dados do pedido
+            on_token: Chamada com cada pedaço de texto assim que o modelo o
+                gera (respostas da cache chegam num só pedaço)
+
+        Returns:
+            Resultado do agente (com a resposta completa)
+        """
+        try:
+            request = self._prepare(input_data)
+            if not isinstance(request, LLMRequest):
+                return request
+            request = self._fit_budget(request)
+            return self._parse(self._invoke(request.inputs, request.prompt, on_token), input_data)
+        except Exception as e:
+            return self._failure(e, input_data)
+
+    async def aprocess(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Versão assíncrona de process (ainvoke, sem bloquear o event loop)
+
+        Agentes sem _prepare correm process numa thread.
+        """
+        if type(self)._prepare is BaseAgent._prepare:
+            return await asyncio.to_thread(self.process, input_data)
+        try:
+            request = self._prepare(input_data)
+            if not isinstance(request, LLMRequest):
+                return request
+            request = self._fit_budget(request)
+            return self._parse(await self._ainvoke(request.inputs, request.prompt), input_data)
+        except Exception as e:
+            return self._failure(e, input_data)
+
+    async def abatch(self, inputs: Iterable[Dict[str, Any]], max_concurrency: int = 16) -> List[Dict[str, Any]]:
+        """
+        Processa vários pedidos em simultâneo
+
+        O ritmo real é limitado pelo rate limiter partilhado (RPM/TPM);
+        max_concurrency só limita os pedidos em voo.
+
+        Args:
+            inputs: Dados de cada pedido
+            max_concurrency: Pedidos em simultâneo
+
+        Returns:
+            Resultados pela mesma ordem
+        """
+        slots = asyncio.Semaphore(max(max_concurrency, 1))
+
+        async def run(input_data: Dict[str, Any]) -> Dict[str, Any]:
+            async with slots:
+                return await self.aprocess(input_data)
+
+        return list(await asyncio.gather(*(run(input_data) for input_data in inputs)))
+
+    def process_many(self, inputs: Iterable[Dict[str, Any]], max_concurrency: int = 16) -> List[Dict[str, Any]]:
+        """
+        Versão síncrona de abatch: os pedidos correm em simultâneo no event
+        loop LLM partilhado e a thread que chama espera pelos resultados
+
+        Args:
+            inputs: Dados de cada pedido
+            max_concurrency: Pedidos em simultâneo
+
+        Returns:
+            Resultados pela mesma ordem
+        """
+        return run_async(self.abatch(list(inputs), max_concurrency))
+
+    def _prepare(self, input_data: Dict[str, Any]) -> Union[LLMRequest, Dict[str, Any]]:
+        """Pedido ao LLM para estes dados (ou já o resultado, se não for preciso LLM)"""
+        raise NotImplementedError(f"{self.name} não define _prepare")
+
+    def _parse(self, text: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Resultado a partir do texto da resposta"""
+        return {"response": text}
+
+    def _failure(self, error: Exception, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Resultado quando o pedido falha"""
+        self.logger.error(f"Erro em {self.name}: {str(error)}")
+        return {"error": str(error)}
+
+    def with_temperature(self, temperature: Optional[float]) -> "BaseAgent":
+        """
+        Cópia do agente com outra temperatura (ex: a escolhida na sidebar)
+
+        A cópia partilha os prompts; o cliente vem do registo, por isso
+        não é criado nenhum modelo novo por pedido.
+
+        Args:
+            temperature: Nova temperatura (None = a do perfil)
+
+        Returns:
+            O próprio agente, se a temperatura não mudar, ou uma cópia
+        """
+        llm = self._client(temperature)
+        if llm is getattr(self, "llm", None):
+            return self
+        agent = copy.copy(self)
+        agent.llm = llm
+        return agent
+
+    def _client(self, temperature: Optional[float] = None):
+        """Cliente partilhado do perfil do agente (ver services.llm.clients)"""
+        return get_llm(self.LLM_PROFILE, temperature, agent=self.name)
+
+    def _fit_budget(self, request: LLMRequest) -> LLMRequest:
+        """Corta as variáveis do pedido ao orçamento do agente"""
+        return LLMRequest({name: self._fit_field(name, value) for name, value in request.inputs.items()},
+                          request.prompt)
+
+    def _fit_field(self, name: str, value: Any) -> Any:
+        """Texto de uma variável do prompt cortado ao seu orçamento (outros valores ficam iguais)"""
+        max_tokens = self.prompt_budget.get(name)
+        if not max_tokens or not isinstance(value, str):
+            return value
+        return truncate_text(value, max_tokens, self._model_name())
+
+    def _model_name(self) -> str:
+        """Modelo do agente (para contar tokens)"""
+        return getattr(self.llm, "model_name", "") or "gpt-3.5-turbo"
+
     def log_action(self, action: str, data: Dict[str, Any] = None):
-        self.logger.info(f"{self.name}: {action} - {data or ''}")
\ No newline at end of file
+        self.logger.info(f"{self.name}: {action} - {data or ''}")
+
+    def _invoke(self, inputs: Dict[str, Any], prompt=None, on_token: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Preenche o prompt e pede a resposta ao LLM (self.llm), passando pela cache.
+
+        A chave da cache junta o modelo, a temperatura, PROMPT_VERSION e o
+        prompt preenchido; só respostas bem-sucedidas e não vazias são guardadas.
+
+        Args:
+            inputs: Variáveis do prompt
+            prompt: Template a usar (por omissão self.prompt)
+            on_token: Recebe a resposta em streaming (ver process)
+
+        Returns:
+            Texto da resposta (sem espaços nas pontas)
+        """
+        prompt_value, key, cached = self._lookup(inputs, prompt)
+        if cached is not None:
+            if on_token is not None:
+                on_token(cached)
+            return cached
+        text = self._call_llm(self.llm, prompt_value, on_token)
+        self._store(key, text)
+        return text
+
+    async def _ainvoke(self, inputs: Dict[str, Any], prompt=None) -> str:
+        """Versão assíncrona de _invoke (self.llm.ainvoke)"""
+        prompt_value, key, cached = self._lookup(inputs, prompt)
+        if cached is not None:
+            return cached
+        text = await self._acall_llm(self.llm, prompt_value)
+        self._store(key, text)
+        return text
+
+    def _call_llm(self, llm, prompt_value, on_token: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Um pedido ao modelo, dentro dos limites RPM/TPM e com novas
+        tentativas em erros de rate limit
+
+        Args:
+            llm: Modelo (ou runnable) a chamar
+            prompt_value: Prompt já preenchido
+            on_token: Se indicado, o pedido é feito com llm.stream e cada
+                pedaço é entregue assim que chega; depois do primeiro pedaço
+                entregue, um erro já não é repetido (o texto sairia em dobro)
+
+        Returns:
+            Texto da resposta (sem espaços nas pontas)
+        """
+        limiter = get_rate_limiter()
+        estimated = self._estimate_tokens(llm, prompt_value)
+        emitted = False
+
+        def attempt():
+            nonlocal emitted
+            reserved = limiter.acquire(estimated)
+            result, succeeded = None, False
+            try:
+                if on_token is None:
+                    result = llm.invoke(prompt_value)
+                else:
+                    for chunk in llm.stream(prompt_value):
+                        text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+                        if text:
+                            emitted = True
+                            on_token(text)
+                        result = chunk if result is None else result + chunk
+                succeeded = True
+                return result
+            finally:
+                limiter.settle(reserved, _settled_tokens(result, succeeded))
+
+        result = call_with_retry(attempt, can_retry=lambda: not emitted)
+        self._record_usage(prompt_value, result)
+        return _text(result)
+
+    async def _acall_llm(self, llm, prompt_value) -> str:
+        """Versão assíncrona de _call_llm (llm.ainvoke)"""
+        limiter = get_rate_limiter()
+        estimated = self._estimate_tokens(llm, prompt_value)
+
+        async def attempt():
+            reserved = await limiter.aacquire(estimated)
+            result, succeeded = None, False
+            try:
+                result = await llm.ainvoke(prompt_value)
+                succeeded = True
+                return result
+            finally:
+                limiter.settle(reserved, _settled_tokens(result, succeeded))
+
+        result = await acall_with_retry(attempt)
+        self._record_usage(prompt_value, result)
+        return _text(result)
+
+    def _estimate_tokens(self, llm, prompt_value) -> int:
+        """Tokens de prompt (tiktoken) mais a resposta máxima do modelo chamado"""
+        # llm pode ser um modelo com bind (ex: batch_llm): o modelo está em .bound
+        model = getattr(llm, "bound", llm)
+        max_tokens = getattr(model, "max_tokens", None) or DEFAULT_COMPLETION_TOKENS
+        return count_tokens(prompt_value.to_string(), self._model_name()) + max_tokens
+
+    def _record_usage(self, prompt_value, result: Any):
+        """Tokens de entrada e saída da chamada (da API ou, sem usage, contados com tiktoken)"""
+        usage = getattr(result, "usage_metadata", None) or {}
+        prompt_tokens = usage.get("input_tokens")
+        if prompt_tokens is None:
+            prompt_tokens = count_tokens(prompt_value.to_string(), self._model_name())
+        completion_tokens = usage.get("output_tokens")
+        if completion_tokens is None:
+            completion_tokens = count_tokens(_text(result), self._model_name())
+        record_usage(self.name, prompt_tokens, completion_tokens)
+
+    def _lookup(self, inputs: Dict[str, Any], prompt=None) -> Tuple[Any, Optional[str], Optional[str]]:
+        """Preenche o prompt e procura a resposta na cache: (prompt_value, chave, resposta ou None)"""
+        prompt_value = (prompt or self.prompt).invoke(inputs)
+        if not self.use_llm_cache:
+            return prompt_value, None, None
+
+        key = self._cache_key(prompt_value.to_string())
+        cached = get_llm_cache().get(key)
+        if cached is not None:
+            self.log_action("Resposta LLM da cache", {"key": key[:12]})
+        return prompt_value, key, cached
+
+    def _store(self, key: Optional[str], text: str):
+        """Guarda a resposta na cache (se a cache estiver ativa)"""
+        if key is not None:
+            get_llm_cache().put(key, text, agent=self.name, model=getattr(self.llm, "model_name", ""))
+
+    def _cache_key(self, text: str, variant: str = "") -> str:
+        """
+        Chave da cache LLM para um texto deste agente
+
+        Args:
+            text: Prompt preenchido (ou o dado que identifica a resposta)
+            variant: Distingue respostas do mesmo agente com formatos diferentes
+
+        Returns:
+            Chave de services.cache.llm_cache.make_key
+        """
+        version = f"{self.name}:{variant}:{self.PROMPT_VERSION}" if variant else f"{self.name}:{self.PROMPT_VERSION}"
+        return make_key(getattr(self.llm, "model_name", ""), getattr(self.llm, "temperature", None), version, text)
+
+
+def _text(result: Any) -> str:
+    """Texto de uma resposta do modelo"""
+    if result is None:
+        return ""
+    text = result.content if hasattr(result, 'content') else str(result)
+    return text.strip()
+
+
+def _used_tokens(result: Any) -> Optional[int]:
+    """Tokens reportados pela API (usage_metadata), se existirem"""
+    usage = getattr(result, "usage_metadata", None) or {}
+    return usage.get("total_tokens")
+
+
+def _settled_tokens(result: Any, succeeded: bool) -> Optional[int]:
+    """
+    Tokens a acertar com o rate limiter depois de uma tentativa
+
+    Pedidos falhados (ex: 429, erro de ligação) sem usage devolvem a
+    reserva toda; pedidos bem-sucedidos sem usage mantêm a estimativa.
+    """
+    used = _used_tokens(result)
+    if used is None and not succeeded:
+        return 0
+    return used
@@ -1,23 +1,34 @@
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import PromptTemplate
-import os
-from typing import Dict, Any
-from .base_agent import BaseAgent
-from domain.models import CategoriasValidas
+from pydantic import ValidationError
+import asyncio
+import threading
+from typing import Dict, Any, List, Optional, Sequence, Union
+from .base_agent import BaseAgent, LLMRequest
+from domain.models import CategoriasValidas, CategorizacaoEmpresa, CategorizacaoLote
+from services.cache.llm_cache import get_llm_cache
+from services.llm import count_tokens, run_async
+from services.sector_classifier import get_sector_classifier
+
+# Orçamento de um pedido em lote: tokens das descrições e número máximo de empresas
+DEFAULT_BATCH_TOKENS = 3000
+DEFAULT_BATCH_SIZE = 50
+# Tokens por empresa além da descrição (id no prompt e a linha da resposta JSON)
+TOKENS_PER_ITEM = 20
 
 class CategorizationAgent(BaseAgent):
-    def __init__(self, temperature: float = 0.1):
+    LLM_PROFILE = "deterministic"
+
+    def __init__(self, temperature: Optional[float] = None, max_batch_tokens: int = DEFAULT_BATCH_TOKENS,
+                 max_batch_size: int = DEFAULT_BATCH_SIZE):
         super().__init__("CategorizationAgent")
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max(max_batch_size, 1)
 
-        self.llm = ChatOpenAI(
-            model="gpt-3.5-turbo",
-            temperature=temperature,
-            openai_api_key=os.getenv("OPENAI_API_KEY")
-        )
+        self.llm = self._client(temperature)
 
         categorias_formatadas = "\n".join([f"- {cat.value}" for cat in CategoriasValidas])
 
-        self.prompt = PromptTemplate.from_template(
+        template = PromptTemplate.from_template(
             "Com base na descrição: '{descricao}', classifique esta empresa "
             "em UM dos seguintes setores EXATOS: \n"
             "{categorias}\n\n"
@@ -28,7 +39,42 @@ class CategorizationAgent(BaseAgent):
             "Setor escolhido:"
         )
 
-        self.chain = self.prompt.partial(categorias=categorias_formatadas) | self.llm
+        self.prompt = template.partial(categorias=categorias_formatadas)
+
+        # Classificador local: descrições óbvias não passam pelo LLM
+        self.local_classifier = get_sector_classifier()
+        self._resolved = {"local": 0, "cache": 0, "llm": 0}
+        self._resolved_lock = threading.Lock()
+
+        # Várias empresas num só pedido, com a resposta em JSON
+        self.batch_prompt = PromptTemplate.from_template(
+            "Classifique cada uma das empresas abaixo em UM dos seguintes setores EXATOS:\n"
+            "{categorias}\n\n"
+            "INSTRUÇÕES:\n"
+            "1. Escolha APENAS um setor da lista para cada empresa\n"
+            "2. Use o NOME EXATO do setor\n"
+            "3. Se não se encaixar, escolha 'Outros'\n"
+            "4. Responda só com JSON no formato "
+            '{{"resultados": [{{"id": 1, "setor": "..."}}, ...]}}, '
+            "com um resultado por empresa e o mesmo id\n\n"
+            "Empresas:\n"
+            "{empresas}"
+        ).partial(categorias=categorias_formatadas)
+        self.batch_llm = self.llm.bind(response_format={"type": "json_object"})
+
+    def with_temperature(self, temperature: Optional[float]) -> "CategorizationAgent":
+        agent = super().with_temperature(temperature)
+        if agent is not self:
+            agent.batch_llm = agent.llm.bind(response_format={"type": "json_object"})
+        return agent
+
+    def _categoria_exata(self, categoria_sugerida: Optional[str]) -> Optional[str]:
+        """Setor de CategoriasValidas com exatamente este nome (sem distinguir maiúsculas), ou None"""
+        categoria_sugerida = (categoria_sugerida or "").strip().lower()
+        for categoria in CategoriasValidas:
+            if categoria.value.lower() == categoria_sugerida:
+                return categoria.value
+        return None
 
     def _normalizar_categoria(self, categoria_sugerida: str) -> str:
         """Normaliza categoria usando enum"""
@@ -51,58 +97,266 @@ class CategorizationAgent(BaseAgent):
                 
         return CategoriasValidas.OUTROS.value
         
-    def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        try:
-            descricao = input_data.get('descricao', "")
-            
-            
-            if descricao is None:
-                descricao = ""
-            
-            
-            if descricao and len(descricao) > 100:
-                descricao_preview = descricao[:100] + "..."
+    def _prepare(self, input_data: Dict[str, Any]) -> Union[LLMRequest, Dict[str, Any]]:
+        descricao = input_data.get('descricao', "")
+        
+        
+        if descricao is None:
+            descricao = ""
+        
+        
+        if descricao and len(descricao) > 100:
+            descricao_preview = descricao[:100] + "..."
+        else:
+            descricao_preview = descricao or "Descrição vazia"
+        
+        self.log_action("Processando a categorização", {
+            "descricao_preview": descricao_preview
+        })
+
+        if not descricao:
+            return {"setor": CategoriasValidas.OUTROS.value, "error": "Descrição ausente"}
+
+        setor_local = self._classify_locally(descricao)
+        if setor_local is not None:
+            return {"setor": setor_local}
+
+        return LLMRequest({"descricao": descricao})
+
+    def _parse(self, setor_sugerido: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        setor_final = self._normalizar_categoria(setor_sugerido)
+        # Respostas aproximadas ou fora da lista não ensinam o classificador local
+        if self._categoria_exata(setor_sugerido) is not None:
+            self._learn(input_data.get('descricao'), setor_final)
+
+        self.log_action("Categorização Concluída", {
+            "setor_sugerido": setor_sugerido,
+            "setor_final": setor_final
+        })
+
+        return {"setor": setor_final}
+
+    def _failure(self, e: Exception, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        self.logger.error(f"Erro na categorização: {str(e)}")
+        return {"setor": CategoriasValidas.OUTROS.value, "error": str(e)}
+
+    def process_batch(self, descricoes: Sequence[Optional[str]], max_concurrency: int = 4) -> List[Dict[str, Any]]:
+        """
+        Categoriza várias empresas com um pedido ao LLM por lote
+
+        Os lotes são formados pela ordem das descrições até esgotar o
+        orçamento de tokens (max_batch_tokens) ou max_batch_size empresas.
+        Descrições repetidas ou já em cache não são enviadas; empresas que
+        faltem na resposta ou com um setor fora de CategoriasValidas são
+        categorizadas individualmente (abatch). Os pedidos correm em
+        simultâneo no event loop LLM partilhado (ver aprocess_batch).
+
+        Args:
+            descricoes: Descrições das empresas
+            max_concurrency: Pedidos ao LLM em simultâneo
+
+        Returns:
+            Um resultado por descrição, na mesma ordem e no formato de process
+        """
+        return run_async(self.aprocess_batch(descricoes, max_concurrency))
+
+    async def aprocess_batch(self, descricoes: Sequence[Optional[str]],
+                             max_concurrency: int = 4) -> List[Dict[str, Any]]:
+        """Versão assíncrona de process_batch (os lotes e as empresas de fora correm em simultâneo)"""
+        descricoes = [str(descricao).strip() if descricao else "" for descricao in descricoes]
+        setores: Dict[str, str] = {}
+        cache = get_llm_cache() if self.use_llm_cache else None
+
+        pendentes = []
+        for descricao in dict.fromkeys(filter(None, descricoes)):
+            setor_local = self._classify_locally(descricao)
+            if setor_local is not None:
+                setores[descricao] = setor_local
+                continue
+            cached = cache.get(self._cache_key(descricao, "batch")) if cache is not None else None
+            if cached is not None:
+                # Já normalizado (e aprendido quando o LLM respondeu)
+                setores[descricao] = cached
+                self._count("cache")
             else:
-                descricao_preview = descricao or "Descrição vazia"
-            
-            self.log_action("Processando a categorização", {
-                "descricao_preview": descricao_preview
-            })
+                pendentes.append(descricao)
+
+        lotes = []
+        while pendentes:
+            size = self.fit_batch(pendentes)
+            lotes.append(pendentes[:size])
+            pendentes = pendentes[size:]
+
+        slots = asyncio.Semaphore(max(max_concurrency, 1))
+
+        async def run(lote: List[str]) -> Dict[str, str]:
+            async with slots:
+                return await self._acategorize_batch(lote)
+
+        for resultado in await asyncio.gather(*(run(lote) for lote in lotes)):
+            setores.update(resultado)
 
+        restantes = [descricao for descricao in dict.fromkeys(filter(None, descricoes)) if descricao not in setores]
+        individuais = dict(zip(restantes, await self.abatch(
+            [{"descricao": descricao} for descricao in restantes], max_concurrency)))
+        for descricao, result in individuais.items():
+            if cache is not None and not result.get("error"):
+                cache.put(self._cache_key(descricao, "batch"), result["setor"], agent=self.name,
+                          model=getattr(self.llm, "model_name", ""))
+
+        results = []
+        for descricao in descricoes:
             if not descricao:
-                return {"setor": CategoriasValidas.OUTROS.value, "error": "Descrição ausente"}
-                
-            result = self.chain.invoke({
-                "descricao": descricao,
-            })
-            
-            
-            if hasattr(result, 'content'):
-                result_text = result.content
-            elif hasattr(result, 'text'):
-                result_text = result.text
+                results.append({"setor": CategoriasValidas.OUTROS.value, "error": "Descrição ausente"})
+            elif descricao in setores:
+                results.append({"setor": setores[descricao]})
             else:
-                result_text = str(result)
-                
-            setor_sugerido = result_text.strip() if result_text else ""
+                results.append(dict(individuais[descricao]))
+        return results
+
+    def resolution_stats(self) -> Dict[str, Any]:
+        """
+        Descrições resolvidas pelo classificador local, pela cache LLM e
+        por chamadas ao LLM desde a criação do agente
+
+        Returns:
+            Dict com local, cache, llm e local_share (0-1)
+        """
+        with self._resolved_lock:
+            stats = dict(self._resolved)
+        total = stats["local"] + stats["cache"] + stats["llm"]
+        stats["local_share"] = round(stats["local"] / total, 3) if total else 0.0
+        return stats
+
+    def _classify_locally(self, descricao: str) -> Optional[str]:
+        """Setor do classificador local, se estiver confiante"""
+        if self.local_classifier is None:
+            return None
+        setor = self.local_classifier.classify(descricao)
+        if setor is not None:
+            self._count("local")
+            self.log_action("Categorização local", {"setor": setor})
+        return setor
+
+    def _lookup(self, inputs: Dict[str, Any], prompt=None):
+        prompt_value, key, cached = super()._lookup(inputs, prompt)
+        self._count("llm" if cached is None else "cache")
+        return prompt_value, key, cached
+
+    def _count(self, source: str):
+        """Conta uma descrição resolvida (local, cache ou llm)"""
+        with self._resolved_lock:
+            self._resolved[source] += 1
+
+    def _learn(self, descricao: Optional[str], setor: str):
+        """
+        Ensina ao classificador local um setor dado pelo LLM
+
+        "Outros" não é aprendido: é o recurso para descrições que não
+        encaixam em nenhum setor, não um setor com vocabulário próprio.
+        """
+        if self.local_classifier is None or not descricao or setor == CategoriasValidas.OUTROS.value:
+            return
+        self.local_classifier.learn(descricao, setor)
 
-            setor_final = self._normalizar_categoria(setor_sugerido)
+    def fit_batch(self, descricoes: Sequence[str]) -> int:
+        """
+        Número de descrições iniciais que cabem num pedido em lote
 
-            self.log_action("Categorização Concluída", {
-                "setor_sugerido": setor_sugerido,
-                "setor_final": setor_final
-            })
+        Args:
+            descricoes: Descrições candidatas, por ordem
 
-            return {"setor": setor_final}
+        Returns:
+            Tamanho do lote (pelo menos 1 se houver descrições)
+        """
+        model = self._model_name()
+        limit = self.prompt_budget.get("descricao")
+        tokens = 0
+        for size, descricao in enumerate(descricoes[:self.max_batch_size]):
+            described = count_tokens(descricao, model)
+            tokens += (min(described, limit) if limit else described) + TOKENS_PER_ITEM
+            if tokens > self.max_batch_tokens:
+                return max(size, 1)
+        return min(len(descricoes), self.max_batch_size)
 
+    async def _acategorize_batch(self, descricoes: List[str]) -> Dict[str, str]:
+        """
+        Um pedido ao LLM para um lote de descrições distintas
+
+        Returns:
+            {descrição: setor} só das empresas com resposta válida
+        """
+        if len(descricoes) == 1:
+            return {}  # Sem ganho em lote: fica para o pedido individual
+
+        self.log_action("Categorização em lote", {"empresas": len(descricoes)})
+        empresas = "\n".join(
+            f"[{i}] {' '.join(self._fit_field('descricao', descricao).split())}"
+            for i, descricao in enumerate(descricoes, start=1)
+        )
+        try:
+            text = await self._acall_llm(self.batch_llm, self.batch_prompt.invoke({"empresas": empresas}))
+            resultados = CategorizacaoLote.model_validate_json(_strip_code_fence(text)).resultados
+        except (ValidationError, ValueError) as e:
+            self.logger.warning(f"Resposta em lote inválida, a categorizar individualmente: {e}")
+            return {}
         except Exception as e:
-            self.logger.error(f"Erro na categorização: {str(e)}")
-            return {"setor": CategoriasValidas.OUTROS.value, "error": str(e)}
+            self.logger.error(f"Erro na categorização em lote: {str(e)}")
+            return {}
+
+        setores: Dict[str, str] = {}
+        for item in resultados:
+            try:
+                empresa = CategorizacaoEmpresa.model_validate(item)
+            except ValidationError:
+                continue
+            if 1 <= empresa.id <= len(descricoes) and descricoes[empresa.id - 1] not in setores:
+                setores[descricoes[empresa.id - 1]] = empresa.setor.value
+                self._count("llm")
+                self._learn(descricoes[empresa.id - 1], empresa.setor.value)
+
+        cache = get_llm_cache() if self.use_llm_cache else None
+        if cache is not None:
+            model = getattr(self.llm, "model_name", "")
+            for descricao, setor in setores.items():
+                cache.put(self._cache_key(descricao, "batch"), setor, agent=self.name, model=model)
+
+        self.log_action("Lote concluído", {
+            "empresas": len(descricoes),
+            "validas": len(setores),
+        })
+        return setores
+
+
+def _strip_code_fence(text: str) -> str:
+    """Remove um eventual bloco ```json ... ``` à volta da resposta"""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+    return text
+
+
+_agent: Optional[CategorizationAgent] = None
+_agent_lock = threading.Lock()
+
+
+def get_categorization_agent() -> CategorizationAgent:
+    """Agente partilhado por todo o processo (criado no primeiro uso)"""
+    global _agent
+    with _agent_lock:
+        if _agent is None:
+            _agent = CategorizationAgent()
+        return _agent
+
 
 def categorizar_empresa(descricao: str) -> str:
     """Agente real de categorização"""
-    agent = CategorizationAgent()
-    print(f"Tipo da descrição: {type(descricao)}")
-    print(f"Conteúdo da descrição: {repr(descricao)}")  # ✅ Melhor debug
-    result = agent.process({"descricao": descricao})
+    result = get_categorization_agent().process({"descricao": descricao})
     return result.get("setor", "Não identificado")
+
+
+def categorizar_empresas(descricoes: Sequence[Optional[str]]) -> List[str]:
+    """Categoriza várias empresas em lote (um setor por descrição, na mesma ordem)"""
+    return [result.get("setor", "Não identificado")
+            for result in get_categorization_agent().process_batch(descricoes)]
@@ -1,18 +1,14 @@
 # src/agents/classification_agent.py
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import PromptTemplate
-import os
-from typing import Dict, Any
-from .base_agent import BaseAgent
+from typing import Dict, Any, Optional
+from .base_agent import BaseAgent, LLMRequest
 
 class ClassificationAgent(BaseAgent):
-    def __init__(self, temperature: float = 0.3):
+    LLM_PROFILE = "precise"
+
+    def __init__(self, temperature: Optional[float] = None):
         super().__init__("ClassificationAgent")
-        self.llm = ChatOpenAI(
-            model="gpt-3.5-turbo",
-            temperature=temperature,
-            openai_api_key=os.getenv("OPENAI_API_KEY")
-        )
+        self.llm = self._client(temperature)
         
         self.prompt = PromptTemplate.from_template(
             "Agrupe as seguintes necessidades em categorias como: "
@@ -24,33 +20,29 @@ class ClassificationAgent(BaseAgent):
             "Categoria 1: necessidade 1, necessidade 2\n"
             "Categoria 2: necessidade 3, necessidade 4"
         )
-        
-        self.chain = self.prompt | self.llm
+
     
-    def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        try:
-            self.log_action("Classificando necessidades", {"count": len(input_data.get('necessidades', []))})
-            
-            necessidades = input_data['necessidades']
-            necessidades_str = "\n".join([f"- {n}" for n in necessidades])
-            
-            result = self.chain.invoke({"necessidades": necessidades_str})
-            classificacao_text = result.content if hasattr(result, 'content') else str(result)
-            classificacao_text = classificacao_text.strip()
-            
-            # Processar o texto em dicionário
-            categorias = {}
-            for line in classificacao_text.split('\n'):
-                if ':' in line:
-                    categoria, items = line.split(':', 1)
-                    categoria = categoria.strip()
-                    items_list = [item.strip() for item in items.split(',')]
-                    categorias[categoria] = items_list
-            
-            self.log_action("Classificação concluída", {"categorias": list(categorias.keys())})
-            
-            return {"categorias": categorias}
-            
-        except Exception as e:
-            self.logger.error(f"Erro na classificação de necessidades: {str(e)}")
-            return {"categorias": {"Erro": ["Não foi possível classificar necessidades"]}, "error": str(e)}
+    def _prepare(self, input_data: Dict[str, Any]) -> LLMRequest:
+        self.log_action("Classificando necessidades", {"count": len(input_data.get('necessidades', []))})
+
+        necessidades = input_data['necessidades']
+        necessidades_str = "\n".join([f"- {n}" for n in necessidades])
+        return LLMRequest({"necessidades": necessidades_str})
+
+    def _parse(self, classificacao_text: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        # Processar o texto em dicionário
+        categorias = {}
+        for line in classificacao_text.split('\n'):
+            if ':' in line:
+                categoria, items = line.split(':', 1)
+                categoria = categoria.strip()
+                items_list = [item.strip() for item in items.split(',')]
+                categorias[categoria] = items_list
+
+        self.log_action("Classificação concluída", {"categorias": list(categorias.keys())})
+
+        return {"categorias": categorias}
+
+    def _failure(self, e: Exception, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        self.logger.error(f"Erro na classificação de necessidades: {str(e)}")
+        return {"categorias": {"Erro": ["Não foi possível classificar necessidades"]}, "error": str(e)}
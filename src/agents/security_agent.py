@@ -5,8 +5,11 @@ Agente responsável por orquestrar todas as verificações de segurança.
 Delega trabalho para checkers especializados.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from .base_agent import BaseAgent
+from services.check_valid_url import is_valid_url
+from services.http_client import HttpClient, get_default_client
+from services.instrumentation import measure, record_error
 from services.security import (
     SSLChecker,
     HeadersChecker,
@@ -14,7 +17,9 @@ from services.security import (
     ExposedFilesChecker,
     CookieChecker,
     CMSDetector,
-    ProtocolChecker
+    ProtocolChecker,
+    ResponseSnapshot,
+    fetch_snapshot
 )
 
 
@@ -30,19 +35,25 @@ class SecurityAgent(BaseAgent):
     5. ExposedFilesChecker - Arquivos/diretórios expostos
     6. CookieChecker - Segurança de cookies
     7. CMSDetector - Detecção de CMS
+
+    A página é descarregada uma única vez (fetch) e o ResponseSnapshot
+    resultante é partilhado por todos os checkers. Todos os pedidos passam
+    pelo mesmo HttpClient, reutilizando ligações keep-alive por host.
     """
 
-    def __init__(self):
+    def __init__(self, http_client: Optional[HttpClient] = None):
         super().__init__("SecurityAgent")
 
+        self.http_client = http_client or get_default_client()
+
         # Inicializar todos os checkers
-        self.ssl_checker = SSLChecker()
-        self.headers_checker = HeadersChecker()
-        self.vulnerability_checker = VulnerabilityChecker()
-        self.exposed_files_checker = ExposedFilesChecker()
-        self.cookie_checker = CookieChecker()
-        self.cms_detector = CMSDetector()
-        self.protocol_checker = ProtocolChecker()
+        self.ssl_checker = SSLChecker(self.http_client)
+        self.headers_checker = HeadersChecker(self.http_client)
+        self.vulnerability_checker = VulnerabilityChecker(self.http_client)
+        self.exposed_files_checker = ExposedFilesChecker(self.http_client)
+        self.cookie_checker = CookieChecker(self.http_client)
+        self.cms_detector = CMSDetector(self.http_client)
+        self.protocol_checker = ProtocolChecker(self.http_client)
 
     def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -52,6 +63,7 @@ class SecurityAgent(BaseAgent):
             input_data: Dict contendo:
                 - url: URL do website
                 - check_type: Tipo de verificação a realizar
+                - snapshot: ResponseSnapshot partilhado (opcional)
 
         Returns:
             Dict com resultados da verificação
@@ -59,45 +71,76 @@ class SecurityAgent(BaseAgent):
         try:
             url = input_data["url"]
             check_type = input_data["check_type"]
+            snapshot = input_data.get("snapshot")
 
             # Mapeamento de check_type para método do checker apropriado
             checkers = {
-                "ssl": lambda u: self._run_checker("ssl", self.ssl_checker.check, u),
-                "ssl_advanced": lambda u: self._run_checker("ssl_advanced", self.ssl_checker.check_advanced, u),
-                "headers": lambda u: self._run_checker("headers", self.headers_checker.check, u),
-                "vulnerabilities": lambda u: self._run_checker("vulnerabilities", self.vulnerability_checker.check, u),
-                "exposed_files": lambda u: self._run_checker("exposed_files", self.exposed_files_checker.check, u),
-                "cookie_security": lambda u: self._run_checker("cookie_security", self.cookie_checker.check, u),
-                "cms_detection": lambda u: self._run_checker("cms_detection", self.cms_detector.detect, u),
-                "general": lambda u: self._run_checker("general", self.protocol_checker.check, u)
+                "ssl": lambda u, s: self._run_checker("ssl", self.ssl_checker.check, u, s),
+                "ssl_advanced": lambda u, s: self._run_checker("ssl_advanced", self.ssl_checker.check_advanced, u, s),
+                "headers": lambda u, s: self._run_checker("headers", self.headers_checker.check, u, s),
+                "vulnerabilities": lambda u, s: self._run_checker("vulnerabilities", self.vulnerability_checker.check, u, s),
+                "exposed_files": lambda u, s: self._run_checker("exposed_files", self.exposed_files_checker.check, u, s),
+                "cookie_security": lambda u, s: self._run_checker("cookie_security", self.cookie_checker.check, u, s),
+                "cms_detection": lambda u, s: self._run_checker("cms_detection", self.cms_detector.detect, u, s),
+                "general": lambda u, s: self._run_checker("general", self.protocol_checker.check, u, s)
             }
 
             # Executar o checker apropriado
             checker_fn = checkers.get(check_type, checkers["general"])
-            return checker_fn(url)
+            return checker_fn(url, snapshot)
 
         except Exception as e:
             self.logger.error(f"Erro na verificação de segurança: {str(e)}")
             return {"error": str(e)}
 
-    def _run_checker(self, check_name: str, checker_fn, url: str) -> Dict[str, Any]:
+    def fetch(self, url: str) -> ResponseSnapshot:
+        """
+        Descarrega a página uma única vez para partilhar entre os checkers.
+
+        Args:
+            url: URL do website
+
+        Returns:
+            ResponseSnapshot com redirects, headers, cookies e corpo
+        """
+        self.log_action("Iniciando fetch", {"url": url})
+
+        snapshot = fetch_snapshot(url, self.http_client)
+
+        self.log_action("Fetch concluído", {
+            "final_url": snapshot.final_url,
+            "status_code": snapshot.status_code,
+            "error": snapshot.error
+        })
+        return snapshot
+
+    def validate_url(self, url: str) -> bool:
+        """Verifica se o URL é válido e acessível usando o cliente partilhado"""
+        return is_valid_url(url, self.http_client)
+
+    def _run_checker(self, check_name: str, checker_fn, url: str,
+                     snapshot: Optional[ResponseSnapshot] = None) -> Dict[str, Any]:
         """
-        Executa um checker com logging.
+        Executa um checker com logging e medição (ver services.instrumentation).
 
         Args:
             check_name: Nome da verificação
             checker_fn: Função do checker a executar
             url: URL a verificar
+            snapshot: Resposta partilhada (se None, o checker faz o próprio fetch)
 
         Returns:
             Resultado da verificação
         """
         self.log_action(f"Iniciando verificação: {check_name}", {"url": url})
 
-        try:
-            result = checker_fn(url)
-            self.log_action(f"Verificação {check_name} concluída", {"status": "sucesso"})
-            return result
-        except Exception as e:
-            self.log_action(f"Erro em {check_name}", {"error": str(e)})
-            return {"error": str(e)}
+        with measure(check_name) as measurement:
+            try:
+                result = checker_fn(url, snapshot)
+            except Exception as e:
+                record_error()
+                self.log_action(f"Erro em {check_name}", {"error": str(e)})
+                return {"error": str(e)}
+
+        self.log_action(f"Verificação {check_name} concluída", {"status": "sucesso", "ms": round(measurement.wall_ms)})
+        return result
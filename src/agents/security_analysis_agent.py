@@ -5,11 +5,11 @@ Agente que usa LLM para interpretar resultados de análise de segurança
 e gerar relatórios em linguagem natural.
 """
 
-from typing import Dict, Any
-from langchain_openai import ChatOpenAI
+from typing import Dict, Any, List, Optional
 from langchain_core.prompts import PromptTemplate
-from .base_agent import BaseAgent
-import os
+from .base_agent import BaseAgent, LLMRequest
+from services.llm import count_tokens
+from domain.findings import Category, Finding, Severity, findings, select, status_label
 from dotenv import load_dotenv
 import json
 
@@ -28,14 +28,15 @@ class SecurityAnalysisAgent(BaseAgent):
     - Explicações em linguagem clara
     """
 
+    # 2: findings agrupados e ordenados por gravidade, dentro do orçamento
+    PROMPT_VERSION = "2"
+    # Baixa temperatura para análise técnica
+    LLM_PROFILE = "precise"
+
     def __init__(self):
         super().__init__("SecurityAnalysisAgent")
 
-        self.llm = ChatOpenAI(
-            model="gpt-3.5-turbo",
-            temperature=0.3,  # Baixa temperatura para análise técnica
-            api_key=os.getenv("OPENAI_API_KEY")
-        )
+        self.llm = self._client()
 
         self.analysis_prompt = PromptTemplate(
             template="""Você é um especialista em segurança de websites. Analise os seguintes resultados de uma verificação de segurança e forneça uma interpretação detalhada.
@@ -82,141 +83,206 @@ Responda em Português de Portugal.""",
             input_variables=["url", "risk_score", "risk_level", "security_data"]
         )
 
-    def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _prepare(self, input_data: Dict[str, Any]) -> LLMRequest:
         """
-        Analisa resultados de segurança usando LLM.
+        Prepara a análise dos resultados de segurança.
 
         Args:
             input_data: Dict contendo os resultados do security workflow
 
         Returns:
-            Dict com análise interpretada pelo LLM
+            Pedido ao LLM com os dados formatados
         """
-        try:
-            self.log_action("Iniciando análise com LLM", {})
-
-            # Extrair dados
-            url = input_data.get("url", "")
-            risk_score = input_data.get("risk_score", 0)
-            risk_level = input_data.get("risk_level", "UNKNOWN")
-
-            # Formatar dados para o LLM
-            security_data = self._format_security_data(input_data)
-
-            # Criar chain
-            chain = self.analysis_prompt | self.llm
-
-            # Executar análise
-            response = chain.invoke({
-                "url": url,
-                "risk_score": risk_score,
-                "risk_level": risk_level,
-                "security_data": security_data
-            })
+        self.log_action("Iniciando análise com LLM", {})
 
-            analysis_text = response.content
+        # Formatar dados para o LLM (respostas repetidas vêm da cache LLM)
+        return LLMRequest({
+            "url": input_data.get("url", ""),
+            "risk_score": input_data.get("risk_score", 0),
+            "risk_level": input_data.get("risk_level", "UNKNOWN"),
+            "security_data": self._format_security_data(input_data, self.prompt_budget.get("security_data"))
+        }, prompt=self.analysis_prompt)
 
-            self.log_action("Análise LLM concluída", {"chars": len(analysis_text)})
+    def _parse(self, analysis_text: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Monta o resultado com a análise interpretada pelo LLM.
 
-            return {
-                "llm_analysis": {
-                    "status": "✅ Análise Completa",
-                    "analysis": analysis_text,
-                    "url": url,
-                    "risk_score": risk_score,
-                    "risk_level": risk_level
-                }
+        Returns:
+            Dict com análise interpretada pelo LLM
+        """
+        self.log_action("Análise LLM concluída", {"chars": len(analysis_text)})
+
+        return {
+            "llm_analysis": {
+                "status": "✅ Análise Completa",
+                "analysis": analysis_text,
+                "url": input_data.get("url", ""),
+                "risk_score": input_data.get("risk_score", 0),
+                "risk_level": input_data.get("risk_level", "UNKNOWN")
             }
-
-        except Exception as e:
-            self.logger.error(f"Erro na análise LLM: {str(e)}")
-            return {
-                "llm_analysis": {
-                    "status": "❌ Erro na análise",
-                    "error": str(e)
-                }
+        }
+
+    def _failure(self, e: Exception, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        self.logger.error(f"Erro na análise LLM: {str(e)}")
+        return {
+            "llm_analysis": {
+                "status": "❌ Erro na análise",
+                "error": str(e)
             }
+        }
 
-    def _format_security_data(self, data: Dict[str, Any]) -> str:
+    def _format_security_data(self, data: Dict[str, Any], max_tokens: Optional[int] = None) -> str:
         """
         Formata dados de segurança para o prompt do LLM.
 
+        Os findings só aqui são convertidos em texto (ver Finding.label).
+        Findings repetidos (ex: a mesma falha em vários cookies) ficam numa
+        só linha. Com orçamento, os factos de cada secção entram sempre e
+        os findings entram do mais grave para o menos grave até esgotar
+        `max_tokens`.
+
         Args:
             data: Dados brutos do security workflow
+            max_tokens: Tokens máximos do texto (None = todos os findings)
 
         Returns:
             String formatada para o LLM
         """
+        sections = self._security_sections(data)
+        model = self._model_name()
+
+        # Agrupar findings repetidos: {chave: [linha, finding, ocorrências, ordem]}
+        groups: Dict[Any, List[Any]] = {}
+        for section in sections:
+            for line, finding in section["items"]:
+                key = _group_key(finding)
+                if key in groups:
+                    groups[key][2] += 1
+                else:
+                    groups[key] = [line, finding, 1, len(groups)]
+
+        facts = "\n".join(line for section in sections for line in [section["title"], *section["facts"]])
+        used = count_tokens(facts, model)
+        selected = set()
+        ranked = sorted(groups.items(), key=lambda item: (-item[1][1].severity, item[1][3]))
+        for key, (line, _, occurrences, _) in ranked:
+            cost = count_tokens(line, model) + 4 * (occurrences > 1) + 1
+            if max_tokens is not None and used + cost > max_tokens and selected:
+                break  # o finding mais grave entra sempre
+            selected.add(key)
+            used += cost
+        omitted = len(groups) - len(selected)
+
         formatted = []
+        for section in sections:
+            lines = []
+            for line, finding in section["items"]:
+                key = _group_key(finding)
+                if key not in selected:
+                    continue
+                selected.discard(key)
+                occurrences = groups[key][2]
+                lines.append(f"{line} (+{occurrences - 1} semelhantes)" if occurrences > 1 else line)
+            if lines and section.get("items_heading"):
+                lines.insert(0, section["items_heading"])
+            if section["facts"] or lines:
+                formatted.extend([section["title"], *section["facts"], *lines])
+
+        if omitted:
+            formatted.append(f"\n(+{omitted} findings de menor gravidade omitidos)")
+        return "\n".join(formatted).lstrip("\n")
+
+    def _security_sections(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Secções do relatório para o prompt: título, factos (linhas fixas) e
+        findings candidatos, cada um com a linha já formatada.
+        """
+        sections = []
 
         # Protocolo e SSL
         if "security_issues" in data:
-            formatted.append("## PROTOCOLO")
-            for issue in data["security_issues"]:
-                formatted.append(f"- {issue}")
+            sections.append({
+                "title": "## PROTOCOLO",
+                "facts": [],
+                "items": [(f"- {finding.label}", finding) for finding in findings(data["security_issues"])],
+            })
 
         # SSL Avançado
         if "ssl_advanced" in data:
             ssl = data["ssl_advanced"]
-            formatted.append("\n## SSL/TLS")
-            formatted.append(f"- Status: {ssl.get('status')}")
+            facts = [f"- Status: {status_label('ssl_advanced', ssl)}"]
             if ssl.get('dias_restantes'):
-                formatted.append(f"- Dias até expiração: {ssl.get('dias_restantes')}")
+                facts.append(f"- Dias até expiração: {ssl.get('dias_restantes')}")
             if ssl.get('protocolo'):
-                formatted.append(f"- Protocolo: {ssl.get('protocolo')}")
+                facts.append(f"- Protocolo: {ssl.get('protocolo')}")
             if ssl.get('emissor'):
-                formatted.append(f"- Emissor: {ssl.get('emissor')}")
-            if ssl.get('issues'):
-                for issue in ssl.get('issues', []):
-                    formatted.append(f"  - {issue}")
-            if ssl.get('info'):
-                for info in ssl.get('info', []):
-                    formatted.append(f"  - {info}")
+                facts.append(f"- Emissor: {ssl.get('emissor')}")
+            sections.append({
+                "title": "\n## SSL/TLS",
+                "facts": facts,
+                "items": [(f"  - {finding.label}", finding) for finding in select(findings(ssl), Severity.OK)],
+            })
 
         # Headers
         if "headers_check" in data:
-            formatted.append("\n## HEADERS DE SEGURANÇA")
-            for header, status in data["headers_check"].items():
-                formatted.append(f"- {header}: {status}")
+            items = []
+            for finding in findings(data["headers_check"]):
+                if finding.severity == Severity.UNKNOWN:
+                    items.append((f"- {finding.label}", finding))
+                else:
+                    items.append((f"- {finding.evidence[0]}: {finding.label}", finding))
+            sections.append({"title": "\n## HEADERS DE SEGURANÇA", "facts": [], "items": items})
 
         # Vulnerabilidades
         if "vulnerabilities" in data:
-            formatted.append("\n## VULNERABILIDADES")
-            for vuln in data["vulnerabilities"]:
-                formatted.append(f"- {vuln}")
+            sections.append({
+                "title": "\n## VULNERABILIDADES",
+                "facts": [],
+                "items": [(f"- {finding.label}", finding) for finding in findings(data["vulnerabilities"])],
+            })
 
         # Arquivos Expostos
         if "exposed_files" in data:
-            exp = data["exposed_files"]
-            formatted.append("\n## ARQUIVOS EXPOSTOS")
-            formatted.append(f"- Total de arquivos expostos: {exp.get('total_exposed', 0)}")
-
-            if exp.get('critical_exposed'):
-                formatted.append("- CRÍTICOS:")
-                for item in exp['critical_exposed']:
-                    formatted.append(f"  - {item}")
-
-            if exp.get('warnings'):
-                formatted.append(f"- Avisos: {len(exp['warnings'])} itens")
+            exposed = findings(data["exposed_files"])
+            critical = select(exposed, Severity.CRITICAL)
+            warnings = select(exposed, Severity.LOW, Severity.HIGH)
+            facts = [f"- Total de arquivos expostos: {len(critical) + len(warnings)}"]
+            if warnings:
+                facts.append(f"- Avisos: {len(warnings)} itens")
+            sections.append({
+                "title": "\n## ARQUIVOS EXPOSTOS",
+                "facts": facts,
+                "items_heading": "- CRÍTICOS:",
+                "items": [(f"  - {finding.label}", finding) for finding in critical],
+            })
 
         # Cookies
         if "cookie_security" in data:
             cookies = data["cookie_security"]
-            formatted.append("\n## COOKIES")
-            formatted.append(f"- Status: {cookies.get('status')}")
-            formatted.append(f"- Cookies analisados: {cookies.get('cookies_analyzed', 0)}")
-            if cookies.get('issues'):
-                for issue in cookies.get('issues', [])[:3]:  # Primeiros 3
-                    formatted.append(f"  - {issue}")
+            sections.append({
+                "title": "\n## COOKIES",
+                "facts": [
+                    f"- Status: {status_label('cookie_security', cookies)}",
+                    f"- Cookies analisados: {cookies.get('cookies_analyzed', 0)}",
+                ],
+                "items": [(f"  - {finding.label}", finding) for finding in select(findings(cookies))],
+            })
 
         # CMS
         if "cms_detection" in data:
             cms = data["cms_detection"]
-            formatted.append("\n## CMS DETECTADO")
-            formatted.append(f"- Status: {cms.get('status')}")
+            facts = [f"- Status: {status_label('cms_detection', cms)}"]
             if cms.get('cms'):
-                formatted.append(f"- CMS: {cms.get('cms')}")
+                facts.append(f"- CMS: {cms.get('cms')}")
                 if cms.get('version'):
-                    formatted.append(f"- Versão: {cms.get('version')}")
+                    facts.append(f"- Versão: {cms.get('version')}")
+            sections.append({"title": "\n## CMS DETECTADO", "facts": facts, "items": []})
+
+        return sections
+
 
-        return "\n".join(formatted)
+def _group_key(finding: Finding) -> Any:
+    """Findings com a mesma chave ficam numa só linha (a mesma falha em vários cookies)"""
+    if finding.category == Category.COOKIES or finding.code == "vuln.cookie_httponly":
+        return finding.code
+    return finding.code, finding.evidence
@@ -1,20 +1,16 @@
 # src/agents/website_agent.py
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import PromptTemplate
-import os
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from services.check_valid_url import is_valid_url
-from .base_agent import BaseAgent
+from .base_agent import BaseAgent, LLMRequest
 
 class WebsiteAgent(BaseAgent):
-    def __init__(self, temperature: float = 0.3):
+    LLM_PROFILE = "precise"
+
+    def __init__(self, temperature: Optional[float] = None):
         super().__init__("WebsiteAgent")
-        self.llm = ChatOpenAI(
-            model="gpt-3.5-turbo",
-            temperature=temperature,
-            openai_api_key=os.getenv("OPENAI_API_KEY")
-        )
+        self.llm = self._client(temperature)
         
         self.prompt = PromptTemplate.from_template(
             """Com base no website '{url}', faça uma avaliação detalhada considerando os seguintes critérios.
@@ -49,24 +45,15 @@ class WebsiteAgent(BaseAgent):
                 Seja objetivo, crítico e honesto na avaliação. Não hesite em apontar problemas e áreas que precisam de melhoria."""
             )
         
-        self.chain = self.prompt | self.llm
-    
-    def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        try:
-            self.log_action("Avaliando website", {"url": input_data.get('url', '')})
-            
-            url = input_data['url']
 
-            
-            
-            result = self.chain.invoke({"url": url})
-            avaliacao = result.content if hasattr(result, 'content') else str(result)
-            avaliacao = avaliacao.strip()
-            
-            self.log_action("Avaliação concluída")
-            
-            return {"avaliacao": avaliacao}
-            
-        except Exception as e:
-            self.logger.error(f"Erro na avaliação do website: {str(e)}")
-            return {"avaliacao": "Não foi possível avaliar o website", "error": str(e)}
\ No newline at end of file
+    def _prepare(self, input_data: Dict[str, Any]) -> LLMRequest:
+        self.log_action("Avaliando website", {"url": input_data.get('url', '')})
+        return LLMRequest({"url": input_data['url']})
+
+    def _parse(self, avaliacao: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        self.log_action("Avaliação concluída")
+        return {"avaliacao": avaliacao}
+
+    def _failure(self, e: Exception, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        self.logger.error(f"Erro na avaliação do website: {str(e)}")
+        return {"avaliacao": "Não foi possível avaliar o website", "error": str(e)}
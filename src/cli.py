@@ -0,0 +1,518 @@
+"""
+LeadGenerator - Linha de comandos
+
+Processamento em bulk (sem browser) de um dataset CSV/XLSX com as
+colunas Nome, Website e Descrição Atividade, para jobs noturnos:
+
+- security: workflow de segurança (scores e contagens por website)
+- categorize: setor de atividade (CategorizationAgent, várias empresas por pedido)
+- website: avaliação qualitativa do website (WebsiteAgent)
+
+Linhas com o mesmo website escrito de formas diferentes (http/https,
+com ou sem www, outra página) partilham um único scan de segurança.
+
+Os resultados são escritos à medida que cada linha termina (CSV, JSONL
+ou Parquet). Se o ficheiro de saída já existir, as linhas já processadas
+são ignoradas, por isso um job interrompido retoma onde parou.
+
+Uso (a partir da raiz do repositório):
+    uv run python src/cli.py empresas.xlsx -o resultados.jsonl
+    uv run python src/cli.py empresas.csv -o resultados.parquet --tasks security categorize --workers 16
+    uv run python src/cli.py empresas.csv -o resultados.csv --retry-errors
+"""
+
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import signal
+import sys
+import threading
+import time
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from services.deadline import DEFAULT_SCAN_BUDGET
+from services.result_writer import FORMATS, KEY_COLUMN, open_result_writer
+from services.risk_scoring import RiskWeights, default_weights
+from utils.helpers import canonicalize_url, host_key, scan_urls_by_host
+
+
+REQUIRED_COLUMNS = ["Nome", "Website", "Descrição Atividade"]
+
+TASKS = ("security", "categorize", "website")
+
+# Colunas escritas por cada tarefa (a ordem é a do ficheiro de saída)
+TASK_COLUMNS = {
+    "security": [
+        "security_status", "risk_score", "risk_level", "vulnerabilities", "critical_exposed",
+        "ssl_issues", "cookie_issues", "cms", "reachable", "timed_out", "duration_s",
+    ],
+    "categorize": ["setor"],
+    "website": ["avaliacao"],
+}
+
+BASE_COLUMNS = [KEY_COLUMN, "Nome", "Website", "host", "url"]
+TRAILING_COLUMNS = ["error", "processed_at"]
+
+
+def read_dataset(path: Path, sheet: Optional[str] = None) -> pd.DataFrame:
+    """
+    Lê o dataset de entrada e valida as colunas necessárias.
+
+    Args:
+        path: Ficheiro .csv ou .xlsx
+        sheet: Folha do Excel (por omissão a primeira)
+
+    Returns:
+        DataFrame com índice 0..n-1 (a chave `row` dos resultados)
+
+    Raises:
+        ValueError: Formato não suportado ou colunas em falta
+    """
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        df = pd.read_csv(path)
+    elif suffix in (".xlsx", ".xls"):
+        df = pd.read_excel(path, sheet_name=sheet or 0)
+    else:
+        raise ValueError(f"Formato de entrada não suportado: '{path.name}' (usar .csv ou .xlsx)")
+
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"Colunas necessárias em falta: {missing}")
+    return df.reset_index(drop=True)
+
+
+def output_columns(tasks: List[str], security_llm: bool = False) -> List[str]:
+    """Colunas do ficheiro de saída para as tarefas pedidas"""
+    columns = list(BASE_COLUMNS)
+    for task in TASKS:
+        if task in tasks:
+            columns += TASK_COLUMNS[task]
+            if task == "security" and security_llm:
+                columns.append("llm_analysis")
+    return columns + TRAILING_COLUMNS
+
+
+class RowBatches:
+    """
+    Linhas de uma tarefa processada em lote (ex: categorização): a primeira
+    linha que precisa do resultado leva as seguintes ainda por processar
+    no mesmo pedido, e estas recebem depois o resultado já pronto.
+    """
+
+    def __init__(self, pending: Optional[Dict[int, Any]] = None):
+        """
+        Args:
+            pending: Valor (ex: descrição) por chave das linhas a processar,
+                pela ordem do dataset
+        """
+        self._pending: "OrderedDict[int, Any]" = OrderedDict(pending or {})
+        self._futures: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+
+    def result(self, key: int, value: Any, max_size: int, run: Callable[[List[Any]], List[Dict[str, Any]]],
+               fit: Callable[[List[Any]], int] = len) -> Dict[str, Any]:
+        """
+        Resultado da linha `key` (pedido agora num lote ou à espera de um lote já pedido)
+
+        Args:
+            key: Chave da linha
+            value: Valor da linha
+            max_size: Linhas por lote
+            run: Processa um lote (um resultado por valor, pela mesma ordem)
+            fit: Quantos dos valores candidatos cabem num lote (por omissão todos)
+
+        Returns:
+            Resultado da linha
+        """
+        with self._lock:
+            future = self._futures.pop(key, None)
+            batch: Dict[int, Any] = {}
+            if future is None:
+                batch = self._take(key, value, max_size, fit)
+                futures = {other: Future() for other in batch}
+                future = futures[key]
+                self._futures.update((other, f) for other, f in futures.items() if other != key)
+
+        if batch:
+            try:
+                for f, result in zip(futures.values(), run(list(batch.values()))):
+                    f.set_result(result)
+            except Exception as e:
+                for f in futures.values():
+                    if not f.done():
+                        f.set_exception(e)
+        return dict(future.result())
+
+    def _take(self, key: int, value: Any, max_size: int, fit: Callable[[List[Any]], int]) -> Dict[int, Any]:
+        """
+        Reserva a linha `key` e as próximas por processar para um lote
+        (chamar com o lock)
+
+        Returns:
+            {chave: valor}, com `key` primeiro
+        """
+        self._pending.pop(key, None)
+        candidates = [value]
+        for other in self._pending.values():
+            if len(candidates) >= max_size:
+                break
+            candidates.append(other)
+
+        batch = {key: value}
+        for _ in range(fit(candidates) - 1):
+            other, other_value = self._pending.popitem(last=False)
+            batch[other] = other_value
+        return batch
+
+
+class RowProcessor:
+    """
+    Executa as tarefas pedidas sobre uma linha do dataset.
+
+    Os agentes LLM são criados uma vez e partilhados entre threads. A
+    categorização e a avaliação de websites correm em lotes (RowBatches)
+    no event loop LLM partilhado, com `llm_concurrency` pedidos em
+    simultâneo por tarefa.
+    """
+
+    def __init__(self, tasks: List[str], llm_concurrency: int = 4, budget: Optional[float] = None,
+                 security_llm: bool = False, force_refresh: bool = False,
+                 scan_urls: Optional[Dict[str, str]] = None, weights: Optional[RiskWeights] = None,
+                 descriptions: Optional[Dict[int, str]] = None, categorize_batch_size: int = 50,
+                 websites: Optional[Dict[int, str]] = None):
+        """
+        Args:
+            tasks: Subconjunto de TASKS
+            llm_concurrency: Chamadas LLM simultâneas dos agentes (categorize e website)
+            budget: Prazo (segundos) de cada scan de segurança
+            security_llm: Incluir a análise LLM no scan de segurança
+            force_refresh: Ignorar a cache de scans
+            scan_urls: URL a analisar por host (ver utils.helpers.scan_urls_by_host);
+                por omissão, o URL canónico da primeira linha de cada host
+            weights: Pesos do risk score (por omissão os de services.risk_scoring)
+            descriptions: Descrições por chave das linhas a processar, pela ordem do
+                dataset; com categorize, as próximas são categorizadas em lote
+            categorize_batch_size: Máximo de empresas por pedido de categorização (1 = sem lotes)
+            websites: URL canónico por chave das linhas a processar, pela ordem do
+                dataset; com website, as próximas são avaliadas em simultâneo
+        """
+        self.tasks = tasks
+        self.budget = budget
+        self.security_llm = security_llm
+        self.force_refresh = force_refresh
+        self.weights = weights
+        self.llm_concurrency = max(llm_concurrency, 1)
+        self._llm_slots = threading.Semaphore(self.llm_concurrency)
+
+        # Um scan por host: linhas do mesmo website esperam pelo primeiro scan
+        self._scan_urls = scan_urls or {}
+        self._host_scans: Dict[str, Future] = {}
+        self._host_scans_lock = threading.Lock()
+
+        # Categorização em lote: a primeira linha sem setor leva as seguintes no mesmo pedido
+        self._categories = RowBatches(descriptions)
+        # Avaliação de websites: a primeira linha leva as seguintes para o mesmo abatch
+        self._evaluations = RowBatches(websites)
+        self._evaluations_lock = threading.Lock()
+
+        # Imports pesados (langgraph, langchain) só para as tarefas pedidas
+        self._steps: List[Callable[[Dict[str, Any]], Dict[str, Any]]] = []
+        if "security" in tasks:
+            from orchestration.batch_scanner import summarize_report
+            from orchestration.security_workflow import run_security_check
+            self._run_security_check = run_security_check
+            self._summarize_report = summarize_report
+            self._steps.append(self._security)
+        if "categorize" in tasks:
+            from agents.categorization_agent import CategorizationAgent
+            self._categorization_agent = CategorizationAgent(max_batch_size=categorize_batch_size)
+            self._steps.append(self._categorize)
+        if "website" in tasks:
+            from agents.website_agent import WebsiteAgent
+            self._website_agent = WebsiteAgent()
+            self._steps.append(self._website)
+
+    def process(self, key: int, row: pd.Series) -> Dict[str, Any]:
+        """
+        Processa uma linha sem deixar escapar exceções.
+
+        Returns:
+            Registo com as colunas das tarefas; erros ficam na coluna `error`
+        """
+        website = row.get("Website") if pd.notna(row.get("Website")) else ""
+        record = {
+            KEY_COLUMN: key,
+            "Nome": row.get("Nome"),
+            "Website": website,
+            "host": host_key(str(website)),
+            "url": canonicalize_url(str(website)),
+        }
+
+        errors = []
+        for step in self._steps:
+            try:
+                result = step({**row.to_dict(), **record})
+            except Exception as e:
+                result = {"error": f"{step.__name__.lstrip('_')}: {e}"}
+            if result.get("error"):
+                errors.append(result.pop("error"))
+            record.update(result)
+
+        record["error"] = "; ".join(errors)
+        record["processed_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        return record
+
+    def _security(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        if not row["host"]:
+            return {"security_status": "⚪ Sem website"}
+
+        with self._host_scans_lock:
+            future = self._host_scans.get(row["host"])
+            owner = future is None
+            if owner:
+                future = self._host_scans[row["host"]] = Future()
+
+        if owner:
+            try:
+                future.set_result(self._scan_host(self._scan_urls.get(row["host"], row["url"])))
+            except Exception as e:
+                future.set_exception(e)
+        return dict(future.result())
+
+    def _scan_host(self, url: str) -> Dict[str, Any]:
+        """Scan de segurança do URL canónico de um host"""
+        # A narrativa LLM corre no pool de análises do workflow (já limitado)
+        started = time.monotonic()
+        llm_mode = "wait" if self.security_llm else "skip"
+        report = self._run_security_check(url, self.force_refresh, llm_mode, self.budget)
+
+        result = {
+            "url": url,
+            "security_status": "✅ Concluído" if report.get("reachable", True) else "🔌 Inacessível",
+            **self._summarize_report(report, self.weights),
+            "duration_s": round(time.monotonic() - started, 2),
+        }
+        if self.security_llm:
+            llm_analysis = report.get("llm_analysis", {})
+            result["llm_analysis"] = llm_analysis.get("analysis") or llm_analysis.get("status")
+        return result
+
+    def categorization_stats(self) -> Dict[str, Any]:
+        """Setores resolvidos localmente, pela cache LLM e pelo LLM (ver CategorizationAgent.resolution_stats)"""
+        return self._categorization_agent.resolution_stats()
+
+    def _categorize(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        descricao = row.get("Descrição Atividade")
+        descricao = str(descricao) if pd.notna(descricao) else ""
+        agent = self._categorization_agent
+        return self._categories.result(row[KEY_COLUMN], descricao, agent.max_batch_size,
+                                       self._categorize_batch, agent.fit_batch)
+
+    def _categorize_batch(self, descricoes: List[str]) -> List[Dict[str, Any]]:
+        with self._llm_slots:
+            return self._categorization_agent.process_batch(descricoes, max_concurrency=self.llm_concurrency)
+
+    def _website(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        if not row["url"]:
+            return {"avaliacao": None}
+        return self._evaluations.result(row[KEY_COLUMN], row["url"], self.llm_concurrency, self._evaluate_websites)
+
+    def _evaluate_websites(self, urls: List[str]) -> List[Dict[str, Any]]:
+        # Um lote de cada vez: no máximo llm_concurrency avaliações em voo
+        with self._evaluations_lock:
+            return self._website_agent.process_many([{"url": url} for url in urls],
+                                                    max_concurrency=self.llm_concurrency)
+
+
+def run(df: pd.DataFrame, processor: RowProcessor, writer, workers: int = 8,
+        skip_keys: Optional[set] = None, progress_every: int = 50) -> Dict[str, int]:
+    """
+    Processa as linhas do dataset num pool de threads e escreve cada
+    registo assim que fica pronto.
+
+    Só ficam em voo 2 x `workers` linhas de cada vez, para que uma
+    interrupção perca pouco trabalho e a memória não cresça com o dataset.
+
+    Args:
+        df: Dataset (índice = chave `row`)
+        processor: RowProcessor com as tarefas
+        writer: ResultWriter de destino
+        workers: Linhas processadas em simultâneo
+        skip_keys: Linhas já processadas (retoma)
+        progress_every: Mostrar o progresso a cada N linhas
+
+    Returns:
+        Contagens {"processed", "errors", "skipped"}
+    """
+    from orchestration.batch_scanner import BatchProgress
+
+    skip_keys = skip_keys or set()
+    pending_rows = ((key, row) for key, row in df.iterrows() if key not in skip_keys)
+    progress = BatchProgress(total=len(df) - len(skip_keys & set(df.index)))
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    in_flight: Dict[Future, int] = {}
+    try:
+        for key, row in pending_rows:
+            in_flight[executor.submit(processor.process, key, row)] = key
+            if len(in_flight) < 2 * workers:
+                continue
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            _write_done(done, in_flight, writer, progress, progress_every)
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            _write_done(done, in_flight, writer, progress, progress_every)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        writer.close()
+
+    return {"processed": progress.completed, "errors": progress.failed, "skipped": len(skip_keys)}
+
+
+def _write_done(done, in_flight: Dict[Future, int], writer, progress, progress_every: int):
+    for future in done:
+        in_flight.pop(future)
+        record = future.result()
+        writer.write(record)
+
+        progress.completed += 1
+        if record.get("error"):
+            progress.failed += 1
+        if progress.completed % progress_every == 0 or progress.completed == progress.total:
+            _print_progress(progress)
+
+
+def _print_progress(progress):
+    eta = progress.eta_seconds
+    eta_text = f"{eta / 60:.1f} min" if eta is not None else "—"
+    print(
+        f"⏳ {progress.completed}/{progress.total} ({progress.fraction:.0%}) | "
+        f"{progress.sites_per_minute:.1f} linhas/min | erros: {progress.failed} | ETA: {eta_text}",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+def _raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="leadgen",
+        description="Processamento em bulk de um dataset de empresas (segurança e agentes LLM)",
+    )
+    parser.add_argument("input", type=Path, help="Dataset .csv ou .xlsx (colunas Nome, Website, Descrição Atividade)")
+    parser.add_argument("-o", "--output", type=Path, required=True,
+                        help="Ficheiro de saída (.csv, .jsonl) ou diretório .parquet")
+    parser.add_argument("--format", choices=FORMATS, help="Formato de saída (por omissão pela extensão)")
+    parser.add_argument("--tasks", nargs="+", choices=TASKS, default=["security"], help="Tarefas a executar")
+    parser.add_argument("--workers", type=int, default=8, help="Linhas processadas em simultâneo")
+    parser.add_argument("--llm-concurrency", type=int, default=4,
+                        help="Chamadas LLM simultâneas (o ritmo é limitado por LEADGEN_LLM_RPM/LEADGEN_LLM_TPM)")
+    parser.add_argument("--categorize-batch-size", type=int, default=50,
+                        help="Máximo de empresas por pedido de categorização (1 = uma a uma)")
+    parser.add_argument("--budget", type=float, default=DEFAULT_SCAN_BUDGET,
+                        help="Prazo de cada scan de segurança em segundos (0 = sem limite)")
+    parser.add_argument("--security-llm", action="store_true", help="Incluir a análise LLM no scan de segurança")
+    parser.add_argument("--force-refresh", action="store_true", help="Ignorar a cache de scans")
+    parser.add_argument("--risk-weights", default="",
+                        help='Pesos do risk score, ex: "critical_exposed=25:50,cookie_issues=1" (pontos[:máximo])')
+    parser.add_argument("--overwrite", action="store_true", help="Apagar resultados anteriores em vez de retomar")
+    parser.add_argument("--retry-errors", action="store_true", help="Reprocessar linhas que terminaram com erro")
+    parser.add_argument("--limit", type=int, help="Processar só as primeiras N linhas")
+    parser.add_argument("--sheet", help="Folha do ficheiro Excel")
+    parser.add_argument("--flush-every", type=int, default=100, help="Registos por ficheiro Parquet")
+    parser.add_argument("--progress-every", type=int, default=50, help="Mostrar o progresso a cada N linhas")
+    return parser
+
+
+def _pending_descriptions(df: pd.DataFrame, skip_keys: set) -> Dict[int, str]:
+    """Descrições das linhas por processar, pela ordem do dataset"""
+    if "Descrição Atividade" not in df.columns:
+        return {}
+    pending = df.loc[~df.index.isin(list(skip_keys)), "Descrição Atividade"]
+    return pending.where(pending.notna(), "").astype(str).to_dict()
+
+
+def _pending_websites(websites: pd.Series, skip_keys: set) -> Dict[int, str]:
+    """URL canónico das linhas por processar que têm website, pela ordem do dataset"""
+    urls = websites[~websites.index.isin(list(skip_keys))].map(canonicalize_url)
+    return urls[urls != ""].to_dict()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    load_dotenv()
+    args = build_parser().parse_args(argv)
+
+    try:
+        df = read_dataset(args.input, args.sheet)
+        if args.limit is not None:
+            df = df.head(args.limit)
+
+        tasks = [task for task in TASKS if task in args.tasks]
+        weights = RiskWeights.parse(args.risk_weights, default_weights()) if args.risk_weights else None
+        writer = open_result_writer(args.output, output_columns(tasks, args.security_llm), args.format,
+                                    overwrite=args.overwrite, flush_every=args.flush_every)
+        done_keys = writer.completed_keys(skip_errors=args.retry_errors)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+    skip_keys = done_keys & set(df.index)
+    if len(skip_keys) == len(df):
+        print(f"✅ Nada a fazer: as {len(df)} linhas já estão em {args.output}", file=sys.stderr)
+        return 0
+    if skip_keys:
+        print(f"↩️ A retomar: {len(skip_keys)} de {len(df)} linhas já processadas", file=sys.stderr)
+
+    websites = df["Website"].where(df["Website"].notna(), "").astype(str)
+    processor = RowProcessor(tasks, llm_concurrency=args.llm_concurrency, budget=args.budget,
+                             security_llm=args.security_llm, force_refresh=args.force_refresh,
+                             scan_urls=scan_urls_by_host(websites), weights=weights,
+                             descriptions=_pending_descriptions(df, skip_keys) if "categorize" in tasks else None,
+                             categorize_batch_size=args.categorize_batch_size,
+                             websites=_pending_websites(websites, skip_keys) if "website" in tasks else None)
+
+    # SIGTERM (ex: fim do job agendado) interrompe como um Ctrl+C
+    signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+    started = time.monotonic()
+    try:
+        counts = run(df, processor, writer, workers=args.workers, skip_keys=skip_keys,
+                     progress_every=args.progress_every)
+    except KeyboardInterrupt:
+        print(f"⏹️ Interrompido: os resultados já escritos em {args.output} são retomados na próxima execução",
+              file=sys.stderr)
+        return 130
+
+    print(
+        f"✅ {counts['processed']} linhas processadas em {time.monotonic() - started:.1f}s "
+        f"({counts['errors']} com erro, {counts['skipped']} já existentes) → {args.output}",
+        file=sys.stderr,
+    )
+    if {"categorize", "website"} & set(tasks) or args.security_llm:
+        from services.cache import get_llm_cache
+        stats = get_llm_cache().stats()
+        print(f"🧠 Cache LLM: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%})",
+              file=sys.stderr)
+        from services.llm import token_usage
+        usage = token_usage()
+        print(f"🔢 Tokens LLM: {usage['prompt_tokens']} in, {usage['completion_tokens']} out "
+              f"em {usage['calls']} chamadas", file=sys.stderr)
+    if "categorize" in tasks:
+        resolved = processor.categorization_stats()
+        total = resolved['local'] + resolved['cache'] + resolved['llm']
+        print(f"🏷️ Setores: {resolved['local']} de {total} ({resolved['local_share']:.0%}) pelo classificador "
+              f"local, {resolved['cache']} da cache LLM, {resolved['llm']} pelo LLM", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
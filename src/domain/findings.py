@@ -0,0 +1,231 @@
+"""
+Findings das verificações de segurança
+
+Os checkers devolvem cada resultado como um Finding compacto (código,
+severidade, categoria e evidência) em vez de frases com emojis. O score,
+as contagens do batch e a serialização trabalham só com estes campos; o
+texto em português é produzido apenas ao mostrar o resultado (ver label
+e status_label).
+
+Cada secção do relatório é um dict {"findings": [Finding, ...], ...factos}.
+Em JSON (cache e fila de jobs) um Finding é guardado como
+[código, *evidência]: severidade e categoria vêm do catálogo.
+"""
+
+from dataclasses import dataclass
+from enum import Enum, IntEnum
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+class Severity(IntEnum):
+    """Gravidade de um finding (UNKNOWN = a verificação falhou)"""
+    UNKNOWN = -1
+    OK = 0
+    INFO = 1
+    LOW = 2
+    MEDIUM = 3
+    HIGH = 4
+    CRITICAL = 5
+
+
+class Category(str, Enum):
+    """Área da verificação que produziu o finding"""
+    PROTOCOL = "protocol"
+    SSL = "ssl"
+    HEADERS = "headers"
+    VULNERABILITY = "vulnerability"
+    EXPOSED_FILES = "exposed_files"
+    COOKIES = "cookies"
+    CMS = "cms"
+
+
+# código -> (categoria, severidade, texto; {0}, {1}... são a evidência)
+CATALOG: Dict[str, Tuple[Category, Severity, str]] = {
+    # Protocolo
+    "protocol.https": (Category.PROTOCOL, Severity.OK, "✅ Usa HTTPS"),
+    "protocol.http": (Category.PROTOCOL, Severity.HIGH, "❌ Usa HTTP em vez de HTTPS"),
+    "protocol.http_no_redirect": (Category.PROTOCOL, Severity.HIGH, "❌ Usa HTTP sem redirecionamento para HTTPS"),
+    "protocol.http_redirect": (Category.PROTOCOL, Severity.LOW,
+                               "⚠️  Aceita HTTP mas redireciona para HTTPS (melhor: só aceitar HTTPS)"),
+    "protocol.redirect": (Category.PROTOCOL, Severity.INFO, "⚠️  Redireciona com status {0}"),
+    "protocol.timeout": (Category.PROTOCOL, Severity.UNKNOWN, "❌ Website não responde (timeout)"),
+    "protocol.connection": (Category.PROTOCOL, Severity.UNKNOWN, "❌ Não conseguiu conectar ao website"),
+    "protocol.error": (Category.PROTOCOL, Severity.UNKNOWN, "❌ Erro ao verificar: {0}"),
+
+    # SSL/TLS
+    "ssl.valid": (Category.SSL, Severity.OK, "✅ SSL Válido"),
+    "ssl.missing": (Category.SSL, Severity.HIGH, "❌ Sem SSL"),
+    "ssl.redirected": (Category.SSL, Severity.INFO, "URL original HTTP redirecionou para HTTPS"),
+    "ssl.handshake_error": (Category.SSL, Severity.UNKNOWN, "❌ Erro de SSL: {0}"),
+    "ssl.error": (Category.SSL, Severity.UNKNOWN, "❌ Erro ao verificar SSL: {0}"),
+    "ssl.cert_invalid": (Category.SSL, Severity.UNKNOWN, "❌ Certificado Inválido: {0}"),
+    "ssl.analysis_error": (Category.SSL, Severity.UNKNOWN, "❌ Erro na análise: {0}"),
+    "ssl.expired": (Category.SSL, Severity.HIGH, "❌ Certificado EXPIRADO há {0} dias"),
+    "ssl.expiring_critical": (Category.SSL, Severity.CRITICAL, "🚨 CRÍTICO: Expira em {0} dias"),
+    "ssl.expiring_soon": (Category.SSL, Severity.MEDIUM, "⚠️  Expira em breve: {0} dias"),
+    "ssl.valid_for": (Category.SSL, Severity.OK, "✅ Válido por {0} dias"),
+    "ssl.tls13": (Category.SSL, Severity.OK, "✅ TLS 1.3 (mais seguro)"),
+    "ssl.tls12": (Category.SSL, Severity.OK, "✅ TLS 1.2 (seguro)"),
+    "ssl.tls_obsolete": (Category.SSL, Severity.HIGH, "❌ {0} - versão obsoleta e insegura"),
+    "ssl.sslv": (Category.SSL, Severity.CRITICAL, "❌ {0} - EXTREMAMENTE INSEGURO"),
+
+    # Headers de segurança (evidência: nome do header[, valor])
+    "header.present": (Category.HEADERS, Severity.OK, "✅ Presente: {1}"),
+    "header.missing": (Category.HEADERS, Severity.MEDIUM, "❌ Ausente"),
+    "headers.error": (Category.HEADERS, Severity.UNKNOWN, "❌ {0}"),
+
+    # Vulnerabilidades comuns
+    "vuln.cookie_httponly": (Category.VULNERABILITY, Severity.MEDIUM, "⚠️  Cookie sem flag HttpOnly: {0}"),
+    "vuln.no_hsts": (Category.VULNERABILITY, Severity.MEDIUM, "⚠️  Sem HSTS header (man-in-the-middle risk)"),
+    "vuln.no_csp": (Category.VULNERABILITY, Severity.MEDIUM, "⚠️  Sem Content-Security-Policy (XSS risk)"),
+    "vuln.server_header": (Category.VULNERABILITY, Severity.LOW, "⚠️  Server header exposto: {0}"),
+    "vuln.powered_by": (Category.VULNERABILITY, Severity.LOW, "⚠️  X-Powered-By exposto: {0}"),
+    "vuln.error": (Category.VULNERABILITY, Severity.UNKNOWN, "❌ Erro ao verificar: {0}"),
+
+    # Ficheiros e diretórios expostos (evidência: caminho)
+    "exposed.critical": (Category.EXPOSED_FILES, Severity.CRITICAL, "🚨 CRÍTICO: {0} (HTTP 200)"),
+    "exposed.admin": (Category.EXPOSED_FILES, Severity.MEDIUM, "⚠️  {0} acessível (HTTP 200)"),
+    "exposed.blocked": (Category.EXPOSED_FILES, Severity.LOW, "⚠️  {0} existe mas bloqueado (HTTP 403)"),
+    "exposed.public": (Category.EXPOSED_FILES, Severity.INFO, "ℹ️  {0} público (esperado)"),
+
+    # Cookies (evidência: nome do cookie)
+    "cookie.no_secure": (Category.COOKIES, Severity.HIGH,
+                         "Cookie '{0}': ❌ Sem flag 'Secure' (pode ser transmitido via HTTP)"),
+    "cookie.no_httponly": (Category.COOKIES, Severity.HIGH, "Cookie '{0}': ❌ Sem flag 'HttpOnly' (vulnerável a XSS)"),
+    "cookie.no_samesite": (Category.COOKIES, Severity.MEDIUM,
+                           "Cookie '{0}': ⚠️  Sem atributo 'SameSite' (vulnerável a CSRF)"),
+    "cookies.error": (Category.COOKIES, Severity.UNKNOWN, "❌ Erro ao analisar cookies: {0}"),
+
+    # CMS
+    "cms.wordpress_plugins": (Category.CMS, Severity.LOW, "⚠️  WordPress: Verificar se plugins estão atualizados"),
+    "cms.wordpress_version": (Category.CMS, Severity.LOW,
+                              "⚠️  WordPress: Esconder versão (security through obscurity)"),
+    "cms.version": (Category.CMS, Severity.INFO, "ℹ️  Versão detectada: {0}"),
+    "cms.error": (Category.CMS, Severity.UNKNOWN, "❌ Erro ao detectar CMS: {0}"),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Finding:
+    """Resultado de uma verificação (imutável; sem evidência é partilhado)"""
+    code: str
+    severity: Severity
+    category: Category
+    evidence: Tuple[str, ...] = ()
+
+    @classmethod
+    def of(cls, code: str, *evidence: Any) -> "Finding":
+        """
+        Cria o finding a partir do catálogo
+
+        Args:
+            code: Código do finding (chave de CATALOG)
+            *evidence: Valores que o texto mostra (convertidos para str)
+
+        Returns:
+            Finding com a severidade e a categoria do catálogo
+        """
+        if not evidence:
+            return _SHARED[code]
+        category, severity, _ = CATALOG[code]
+        return cls(code, severity, category, tuple(str(value) for value in evidence))
+
+    @property
+    def label(self) -> str:
+        """Texto para mostrar ao utilizador (gerado a cada chamada)"""
+        return CATALOG[self.code][2].format(*self.evidence)
+
+    def to_json(self) -> List[str]:
+        """Forma compacta para JSON: [código, *evidência]"""
+        return [self.code, *self.evidence]
+
+    @classmethod
+    def from_json(cls, value: Any) -> "Finding":
+        """Inverso de to_json (aceita um Finding já construído)"""
+        if isinstance(value, Finding):
+            return value
+        return cls.of(*value)
+
+
+# Findings sem evidência: uma única instância por código
+_SHARED: Dict[str, Finding] = {
+    code: Finding(code, severity, category) for code, (category, severity, _) in CATALOG.items()
+}
+
+
+def findings(section: Any) -> List[Finding]:
+    """Findings de uma secção do relatório ([] se vazia, em falta ou fora do prazo)"""
+    if not isinstance(section, dict):
+        return []
+    return section.get("findings") or []
+
+
+def partial_sections(report: Dict[str, Any]) -> List[str]:
+    """Secções do relatório que ficaram incompletas (ex: caminhos por testar no prazo)"""
+    return [name for name, section in report.items() if isinstance(section, dict) and section.get("partial")]
+
+
+def count(items: Iterable[Finding], min_severity: Severity = Severity.LOW,
+          max_severity: Severity = Severity.CRITICAL) -> int:
+    """Número de findings com severidade entre min_severity e max_severity"""
+    return sum(1 for finding in items if min_severity <= finding.severity <= max_severity)
+
+
+def select(items: Iterable[Finding], min_severity: Severity = Severity.LOW,
+           max_severity: Severity = Severity.CRITICAL) -> List[Finding]:
+    """Findings com severidade entre min_severity e max_severity"""
+    return [finding for finding in items if min_severity <= finding.severity <= max_severity]
+
+
+def status_label(name: str, section: Any) -> str:
+    """
+    Estado resumido de uma secção, para mostrar ao utilizador
+
+    Args:
+        name: Nome da secção no relatório (ex: "cookie_security")
+        section: Valor da secção
+
+    Returns:
+        Texto do estado ("N/A" se a secção estiver vazia)
+    """
+    if not section:
+        return "N/A"
+    if section.get("timed_out"):
+        return "⌛ Tempo esgotado"
+
+    items = findings(section)
+    errors = select(items, Severity.UNKNOWN, Severity.UNKNOWN)
+    if errors:
+        return errors[0].label
+    if section.get("partial") and not count(items):
+        return "⌛ Verificação incompleta (prazo esgotado)"
+
+    if name == "cookie_security":
+        if not section.get("cookies_analyzed"):
+            return "ℹ️  Nenhum cookie definido"
+        return "⚠️  Problemas detectados" if count(items) else "✅ Cookies seguros"
+    if name == "cms_detection":
+        cms = section.get("cms")
+        return f"✅ CMS Detectado: {cms}" if cms else "ℹ️  Nenhum CMS conhecido detectado"
+    if name == "ssl_advanced":
+        return "⚠️  Problemas Detectados" if count(items, Severity.HIGH) else "✅ Análise Completa"
+    return "⚠️  Problemas detectados" if count(items) else "✅ Sem problemas"
+
+
+def decode_section(section: Any) -> Any:
+    """Reconstrói os Finding de uma secção lida de JSON (cache ou fila de jobs)"""
+    if isinstance(section, dict) and section.get("findings"):
+        return {**section, "findings": [Finding.from_json(value) for value in section["findings"]]}
+    return section
+
+
+def decode_report(report: Dict[str, Any]) -> Dict[str, Any]:
+    """decode_section aplicado a todas as secções de um relatório"""
+    return {key: decode_section(value) for key, value in report.items()}
+
+
+def json_default(value: Any) -> Any:
+    """`default` de json.dumps: Finding na forma compacta, o resto como str"""
+    if isinstance(value, Finding):
+        return value.to_json()
+    return str(value)
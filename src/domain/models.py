@@ -4,6 +4,9 @@
 # - Serialização/deserialização
 # - Tipagem estática
 from enum import Enum
+from typing import Any, Dict, List
+
+from pydantic import BaseModel, field_validator
 
 
 class CategoriasValidas(Enum):
@@ -27,4 +30,24 @@ class CategoriasValidas(Enum):
     IMOBILIARIO = "Imobiliário"
     LOGISTICA = "Logística"
     SEGUROS = "Seguros"
-    OUTROS = "Outros"
\ No newline at end of file
+    OUTROS = "Outros"
+
+class CategorizacaoEmpresa(BaseModel):
+    """Setor atribuído a uma empresa de um lote (id = posição no prompt)"""
+    id: int
+    setor: CategoriasValidas
+
+    @field_validator("setor", mode="before")
+    @classmethod
+    def _setor_exato(cls, value: Any) -> Any:
+        """Aceita o nome exato do setor, ignorando maiúsculas e espaços"""
+        if isinstance(value, str):
+            for categoria in CategoriasValidas:
+                if categoria.value.lower() == value.strip().lower():
+                    return categoria
+        return value
+
+
+class CategorizacaoLote(BaseModel):
+    """Resposta estruturada da categorização em lote"""
+    resultados: List[Dict[str, Any]]
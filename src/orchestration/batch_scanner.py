@@ -0,0 +1,356 @@
+"""
+Batch Security Scanner
+
+Executa o workflow de segurança sobre todas as linhas de um dataset
+(coluna Website) num pool de workers, devolvendo os resultados linha a
+linha à medida que ficam prontos, com progresso, throughput e ETA.
+
+Antes do scan, os URLs são canonicalizados (esquema, host, IDN, caminho)
+e as linhas agrupadas por host: cada website é analisado uma vez e o
+resultado é replicado para todas as linhas que lhe correspondem.
+
+As medições de cada node (report["timings"]) são agregadas durante o
+batch: ver timing_summary() e timing_histogram().
+
+No fim, a tabela é pontuada de uma só vez (services.risk_scoring): cada
+linha fica com risk_score, risk_level e risk_rank, e pode voltar a ser
+pontuada com outros pesos sem repetir os scans.
+
+A análise LLM é, por omissão, ignorada no batch; pode ser pedida para
+os `llm_top_n` websites com maior risco, depois de o batch terminar.
+
+Uso em Python:
+    scanner = BatchSecurityScanner(max_workers=16, llm_top_n=20)
+    results_df = scanner.scan(df)
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from collections import defaultdict
+import heapq
+import itertools
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+from domain.findings import partial_sections
+from orchestration.security_workflow import deferred_analysis, run_security_check
+from services.risk_scoring import RiskWeights, finding_counts, risk_level, score_counts, score_table
+from utils.helpers import host_key, scan_urls_by_host
+
+
+@dataclass
+class BatchProgress:
+    """Estado de progresso de um scan em batch"""
+    total: int
+    completed: int = 0
+    failed: int = 0
+    # Websites únicos (um scan por host, ver iter_scan)
+    hosts: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        """Segundos desde o início do batch"""
+        return time.monotonic() - self.started_at
+
+    @property
+    def fraction(self) -> float:
+        """Fração concluída (0.0 - 1.0)"""
+        return self.completed / self.total if self.total else 1.0
+
+    @property
+    def sites_per_minute(self) -> float:
+        """Throughput médio desde o início"""
+        elapsed = self.elapsed
+        return self.completed / elapsed * 60 if elapsed > 0 else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Estimativa de segundos até terminar (None enquanto não há dados)"""
+        rate = self.sites_per_minute
+        if rate <= 0:
+            return None
+        return (self.total - self.completed) / rate * 60
+
+
+def summarize_report(report: Dict[str, Any], weights: Optional[RiskWeights] = None) -> Dict[str, Any]:
+    """
+    Reduz um final_report às colunas da tabela de resultados do batch.
+
+    Args:
+        report: final_report devolvido por run_security_check
+        weights: Pesos do score (se None, mantém o score do relatório)
+
+    Returns:
+        Dict com score, nível e contagens por categoria
+    """
+    counts = finding_counts(report)
+    risk_score, level = report.get("risk_score"), report.get("risk_level")
+    if weights is not None and report.get("reachable", True):
+        risk_score = score_counts(counts, weights)
+        level = risk_level(risk_score)
+
+    return {
+        "risk_score": risk_score,
+        "risk_level": level,
+        **counts,
+        "cms": report.get("cms_detection", {}).get("cms"),
+        "reachable": report.get("reachable", True),
+        "timed_out": ", ".join([*report.get("timed_out", []), *partial_sections(report)]),
+    }
+
+
+class BatchSecurityScanner:
+    """
+    Motor de scans de segurança em batch.
+
+    Cada linha do dataset é analisada por `scan_fn` (por omissão o
+    workflow completo) num ThreadPoolExecutor com `max_workers` threads.
+    """
+
+    def __init__(self, max_workers: int = 8, scan_fn: Optional[Callable[[str], Dict[str, Any]]] = None,
+                 keep_reports: bool = False, llm_mode: str = "skip", llm_top_n: int = 0,
+                 budget: Optional[float] = None, weights: Optional[RiskWeights] = None):
+        """
+        Args:
+            max_workers: Número de websites analisados em simultâneo
+            scan_fn: Função url -> final_report (por omissão run_security_check)
+            keep_reports: Guardar os relatórios completos em `self.reports`
+                (desligado por omissão para poupar memória em datasets grandes)
+            llm_mode: Modo da análise LLM por website ("skip", "background" ou "wait");
+                ignorado se for dado `scan_fn`
+            llm_top_n: Gerar a análise LLM só para os N websites de maior risco
+                no fim do batch (0 = nenhum)
+            budget: Prazo (segundos) de cada scan; por omissão o do workflow.
+                Ignorado se for dado `scan_fn`
+            weights: Pesos do risk score (por omissão os de services.risk_scoring)
+        """
+        self.max_workers = max_workers
+        self.scan_fn = scan_fn or partial(run_security_check, llm_mode=llm_mode, budget=budget)
+        self.keep_reports = keep_reports
+        self.llm_top_n = llm_top_n
+        self.weights = weights
+        self.reports: Dict[Any, Dict[str, Any]] = {}
+        self._cancelled = False
+
+        # Min-heap (risk_score, seq, report) com os N relatórios de maior risco
+        self._top_reports = []
+        self._top_lock = threading.Lock()
+        self._seq = itertools.count()
+
+        # Amostras por node: {node: {contador: [valores]}}
+        self._timings = defaultdict(lambda: defaultdict(list))
+        self._timings_lock = threading.Lock()
+
+    def cancel(self):
+        """Pede o cancelamento: linhas ainda em fila deixam de ser analisadas"""
+        self._cancelled = True
+
+    def iter_scan(self, df: pd.DataFrame, website_column: str = "Website") -> Iterator[Tuple[Dict[str, Any], BatchProgress]]:
+        """
+        Analisa o dataset e devolve cada resultado assim que fica pronto.
+
+        Linhas com o mesmo website escrito de formas diferentes ("http://x.pt",
+        "https://www.x.pt/", "x.pt/contactos") partilham um único scan; a
+        coluna `host` indica o grupo e `url` o URL canónico analisado.
+
+        Args:
+            df: DataFrame com (pelo menos) a coluna de websites
+            website_column: Nome da coluna com os URLs
+
+        Yields:
+            (resultado da linha, progresso atualizado)
+        """
+        self._cancelled = False
+        self._top_reports = []
+        self._timings.clear()
+        progress = BatchProgress(total=len(df))
+
+        # Linhas agrupadas por website (host canónico): cada host é analisado
+        # uma única vez e o resultado é replicado para todas as suas linhas
+        websites = df[website_column].where(df[website_column].notna(), "").astype(str)
+        scan_urls = scan_urls_by_host(websites)
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        without_website = []
+        for (index, row), website in zip(df.iterrows(), websites):
+            key = host_key(website)
+            base = {"index": index, "Nome": row.get("Nome"), "Website": row.get(website_column), "host": key}
+            if key:
+                groups.setdefault(key, []).append(base)
+            else:
+                without_website.append({**base, "url": "", "status": "⚪ Sem website"})
+        progress.hosts = len(groups)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        futures = {executor.submit(self._scan_one, url): key for key, url in scan_urls.items()}
+        try:
+            for result in without_website:
+                progress.completed += 1
+                yield result, progress
+
+            for future in as_completed(futures):
+                if self._cancelled:
+                    break
+
+                key = futures[future]
+                scan = future.result()
+                for base in groups[key]:
+                    progress.completed += 1
+                    if scan.get("error"):
+                        progress.failed += 1
+                    yield {**base, "url": scan_urls[key], **scan}, progress
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def scan(self, df: pd.DataFrame, website_column: str = "Website",
+             on_progress: Optional[Callable[[Dict[str, Any], BatchProgress], None]] = None) -> pd.DataFrame:
+        """
+        Analisa o dataset completo e devolve a tabela de resultados.
+
+        Args:
+            df: DataFrame com a coluna de websites
+            website_column: Nome da coluna com os URLs
+            on_progress: Callback chamado após cada linha concluída
+
+        Returns:
+            DataFrame com uma linha por empresa, na ordem original, com
+            risk_score, risk_level e risk_rank
+        """
+        rows = []
+        for result, progress in self.iter_scan(df, website_column):
+            rows.append(result)
+            if on_progress:
+                on_progress(result, progress)
+
+        if not rows:
+            return pd.DataFrame()
+        # Repor a ordem original (os resultados chegam por ordem de conclusão)
+        results = pd.DataFrame(rows).set_index("index")
+        results = results.loc[[i for i in df.index if i in results.index]]
+        return self.analyze_top_n(score_table(results, self.weights))
+
+    def analyze_top_n(self, results: pd.DataFrame, timeout: Optional[float] = None) -> pd.DataFrame:
+        """
+        Gera a análise LLM para os `llm_top_n` websites de maior risco.
+
+        As análises correm em paralelo no pool de análises LLM (ver
+        security_workflow.deferred_analysis) e ficam em cache.
+
+        Args:
+            results: DataFrame devolvido pelo batch (coluna url)
+            timeout: Segundos máximos de espera por cada análise
+
+        Returns:
+            DataFrame com a coluna llm_analysis preenchida para esses websites
+        """
+        with self._top_lock:
+            top = [report for _, _, report in sorted(self._top_reports, reverse=True)]
+        if not top or self._cancelled:
+            return results
+
+        for report in top:
+            deferred_analysis.submit(report)
+
+        analyses = {}
+        for report in top:
+            llm_analysis = deferred_analysis.wait(report, timeout=timeout)
+            analyses[report["url"]] = llm_analysis.get("analysis") or llm_analysis.get("status")
+
+        results = results.copy()
+        results["llm_analysis"] = results["url"].map(analyses)
+        return results
+
+    def timing_summary(self) -> pd.DataFrame:
+        """
+        Distribuição das medições por node no último batch.
+
+        Returns:
+            DataFrame (uma linha por node, ordenado por p95) com contagem,
+            percentis do tempo e médias de pedidos, bytes, handshakes e erros
+        """
+        with self._timings_lock:
+            samples = {node: {k: list(v) for k, v in counters.items()} for node, counters in self._timings.items()}
+
+        rows = []
+        for node, counters in samples.items():
+            wall = np.asarray(counters["wall_ms"])
+            p50, p95, p99 = np.percentile(wall, [50, 95, 99])
+            rows.append({
+                "node": node,
+                "count": len(wall),
+                "mean_ms": round(float(wall.mean()), 1),
+                "p50_ms": round(float(p50), 1),
+                "p95_ms": round(float(p95), 1),
+                "p99_ms": round(float(p99), 1),
+                "max_ms": round(float(wall.max()), 1),
+                "requests_avg": round(float(np.mean(counters["requests"])), 2),
+                "kb_avg": round(float(np.mean(counters["bytes"])) / 1024, 1),
+                "tls_handshakes_avg": round(float(np.mean(counters["tls_handshakes"])), 2),
+                "errors": int(np.sum(counters["errors"])),
+            })
+
+        if not rows:
+            return pd.DataFrame()
+        return pd.DataFrame(rows).sort_values("p95_ms", ascending=False).reset_index(drop=True)
+
+    def timing_histogram(self, node: str = "total", bins: int = 20) -> pd.DataFrame:
+        """
+        Histograma do tempo (ms) de um node no último batch.
+
+        Args:
+            node: Nome do node ("total" = scan completo)
+            bins: Número de intervalos
+
+        Returns:
+            DataFrame com colunas from_ms, to_ms, count
+        """
+        with self._timings_lock:
+            wall = list(self._timings.get(node, {}).get("wall_ms", []))
+        if not wall:
+            return pd.DataFrame(columns=["from_ms", "to_ms", "count"])
+
+        counts, edges = np.histogram(wall, bins=bins)
+        return pd.DataFrame({"from_ms": edges[:-1].round(1), "to_ms": edges[1:].round(1), "count": counts})
+
+    def _record_timings(self, timings: Dict[str, Dict[str, Any]]):
+        """Acumula as medições de um relatório (relatórios da cache não têm)"""
+        with self._timings_lock:
+            for node, measurement in timings.items():
+                for counter in ("wall_ms", "requests", "bytes", "tls_handshakes", "errors"):
+                    self._timings[node][counter].append(measurement.get(counter, 0))
+
+    def _remember_top(self, url: str, report: Dict[str, Any], risk_score: int):
+        """Mantém apenas os `llm_top_n` relatórios com maior risk_score"""
+        entry = (risk_score or 0, next(self._seq), {**report, "url": url})
+        with self._top_lock:
+            if len(self._top_reports) < self.llm_top_n:
+                heapq.heappush(self._top_reports, entry)
+            elif entry[0] > self._top_reports[0][0]:
+                heapq.heapreplace(self._top_reports, entry)
+
+    def _scan_one(self, url: str) -> Dict[str, Any]:
+        """Executa o scan de um website sem deixar escapar exceções"""
+        started = time.monotonic()
+        try:
+            report = self.scan_fn(url)
+            if self.keep_reports:
+                self.reports[url] = report
+            summary = summarize_report(report, self.weights)
+            if self.llm_top_n and report.get("reachable", True):
+                self._remember_top(url, report, summary["risk_score"])
+            self._record_timings(report.get("timings", {}))
+            return {
+                "status": "✅ Concluído" if report.get("reachable", True) else "🔌 Inacessível",
+                **summary,
+                "duration_s": round(time.monotonic() - started, 2),
+            }
+        except Exception as e:
+            return {
+                "status": "❌ Erro",
+                "error": str(e),
+                "duration_s": round(time.monotonic() - started, 2),
+            }
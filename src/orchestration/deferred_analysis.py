@@ -0,0 +1,262 @@
+"""
+Deferred LLM Analysis
+
+Executa a análise LLM do relatório de segurança (SecurityAnalysisAgent)
+fora do workflow, num pool de threads próprio. O relatório determinístico
+fica disponível de imediato; a narrativa é anexada mais tarde e guardada
+na cache de scans (secção llm_analysis).
+
+A narrativa é gerada em streaming: enquanto a análise corre, stream(url)
+devolve o texto pedaço a pedaço e text(url) o texto gerado até agora, sem
+esperar (a UI redesenha-o a cada poll do job).
+
+Uso (ver security_workflow.deferred_analysis):
+    runner = DeferredAnalysis(analyze_fn)
+    runner.submit(report)                 # não bloqueia
+    for chunk in runner.stream(url): ...  # texto à medida que é gerado
+    runner.text(url)                      # texto até agora (não bloqueia)
+    runner.wait(report, timeout=60)       # anexa report["llm_analysis"]
+"""
+
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, TimeoutError
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import threading
+
+from services.cache import ScanCache, get_scan_cache
+from utils.helpers import normalize_url
+
+
+# Estados de llm_analysis enquanto não há narrativa
+LLM_PENDING = {"status": "⏳ Análise LLM em curso"}
+LLM_SKIPPED = {"status": "⏭️ Análise LLM não executada"}
+LLM_CANCELLED = {"status": "🚫 Análise LLM cancelada"}
+LLM_TIMEOUT = {"status": "⌛ Análise LLM ainda não terminou"}
+
+LLM_MODES = ("wait", "background", "skip")
+
+
+class TextStream:
+    """
+    Texto de uma análise em curso, lido por vários consumidores enquanto é
+    gerado (cada leitor recebe o texto desde o início)
+    """
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def append(self, chunk: str):
+        """Acrescenta um pedaço de texto (chamado pelo produtor)"""
+        with self._condition:
+            self._chunks.append(chunk)
+            self._condition.notify_all()
+
+    def close(self):
+        """Marca o texto como completo (ou a análise como terminada sem texto)"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def text(self) -> str:
+        """Texto gerado até agora (não bloqueia)"""
+        with self._condition:
+            return "".join(self._chunks)
+
+    def read(self, idle_timeout: Optional[float] = None) -> Iterator[str]:
+        """
+        Pedaços de texto à medida que chegam, até o stream ser fechado
+
+        Args:
+            idle_timeout: Segundos máximos sem texto novo (None = sem limite)
+
+        Yields:
+            Pedaços de texto, pela ordem em que foram gerados
+        """
+        position = 0
+        while True:
+            with self._condition:
+                if position >= len(self._chunks) and not self._closed:
+                    self._condition.wait(idle_timeout)
+                new = self._chunks[position:]
+                closed = self._closed
+            if not new and (closed or idle_timeout is not None):
+                return
+            position += len(new)
+            yield from new
+
+
+class DeferredAnalysis:
+    """
+    Fila de análises LLM em background, uma por URL.
+
+    Pedidos repetidos para o mesmo URL reaproveitam a tarefa em curso.
+    Cancelar retira a tarefa da fila; se a chamada ao LLM já começou não
+    é interrompida, mas o resultado é descartado e não vai para a cache.
+    """
+
+    def __init__(self, analyze_fn: Callable[[Dict[str, Any], Callable[[str], None]], Dict[str, Any]],
+                 max_workers: int = 2, cache: Optional[ScanCache] = None):
+        """
+        Args:
+            analyze_fn: Função (report, on_token) -> {"llm_analysis": {...}}
+                (ex: SecurityAnalysisAgent); on_token recebe o texto em streaming
+            max_workers: Número de análises LLM em simultâneo
+            cache: Cache de scans (por omissão, a do processo)
+        """
+        self.analyze_fn = analyze_fn
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-analysis")
+        self._futures: Dict[str, Future] = {}
+        self._streams: Dict[str, TextStream] = {}
+        self._cancelled = set()
+        self._lock = threading.Lock()
+
+    def submit(self, report: Dict[str, Any]) -> Future:
+        """
+        Agenda a análise LLM de um relatório (não bloqueia).
+
+        Args:
+            report: final_report do workflow (determinístico)
+
+        Returns:
+            Future cujo resultado é o dict llm_analysis
+        """
+        key = normalize_url(report["url"])
+
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None and not future.cancelled():
+                return future
+
+        # Análise recente na cache: não se repete a chamada ao LLM
+        cached = self._cache().get_sections(report["url"]).get("llm_analysis")
+        if cached:
+            future = Future()
+            future.set_result(cached)
+            return future
+
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None and not future.cancelled():
+                return future
+
+            self._cancelled.discard(key)
+            stream = self._streams[key] = TextStream()
+            future = self._executor.submit(self._analyze, key, report, stream)
+            self._futures[key] = future
+
+        # Fora do lock: se a análise já terminou, o callback corre aqui mesmo
+        future.add_done_callback(lambda f, k=key: self._forget(k, f))
+        return future
+
+    def get(self, url: str) -> Optional[Future]:
+        """Future da análise em curso para o URL (ou None)"""
+        with self._lock:
+            return self._futures.get(normalize_url(url))
+
+    def stream(self, url: str, idle_timeout: Optional[float] = None) -> Iterator[str]:
+        """
+        Texto da análise em curso para o URL, à medida que é gerado
+
+        Args:
+            url: URL do relatório
+            idle_timeout: Segundos máximos sem texto novo (None = até terminar)
+
+        Yields:
+            Pedaços de texto desde o início da narrativa (nada se não houver
+            análise em curso)
+        """
+        with self._lock:
+            stream = self._streams.get(normalize_url(url))
+        if stream is not None:
+            yield from stream.read(idle_timeout)
+
+    def text(self, url: str) -> Optional[str]:
+        """
+        Texto já gerado pela análise em curso para o URL (não bloqueia)
+
+        Returns:
+            Texto até agora, ou None se não houver análise em curso
+        """
+        with self._lock:
+            stream = self._streams.get(normalize_url(url))
+        return stream.text() if stream is not None else None
+
+    def cancel(self, url: str) -> bool:
+        """
+        Cancela a análise de um URL.
+
+        Returns:
+            True se havia uma análise pendente ou em curso
+        """
+        key = normalize_url(url)
+        with self._lock:
+            future = self._futures.pop(key, None)
+            stream = self._streams.pop(key, None)
+            if future is None:
+                return False
+            self._cancelled.add(key)
+        future.cancel()
+        if stream is not None:
+            stream.close()
+        return True
+
+    def wait(self, report: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Espera pela análise do relatório e anexa-a em report["llm_analysis"].
+
+        Se ainda não foi pedida, é agendada agora; se foi cancelada, não é
+        repetida (usar submit para a pedir de novo).
+
+        Args:
+            report: final_report do workflow
+            timeout: Segundos máximos de espera (None = sem limite)
+
+        Returns:
+            O dict llm_analysis anexado
+        """
+        with self._lock:
+            if normalize_url(report["url"]) in self._cancelled:
+                report["llm_analysis"] = dict(LLM_CANCELLED)
+                return report["llm_analysis"]
+
+        future = self.get(report["url"]) or self.submit(report)
+        try:
+            llm_analysis = future.result(timeout=timeout)
+        except CancelledError:
+            llm_analysis = dict(LLM_CANCELLED)
+        except TimeoutError:
+            llm_analysis = dict(LLM_TIMEOUT)
+
+        report["llm_analysis"] = llm_analysis
+        return llm_analysis
+
+    def shutdown(self):
+        """Cancela tudo o que está em fila e termina o pool"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _analyze(self, key: str, report: Dict[str, Any], stream: TextStream) -> Dict[str, Any]:
+        """Executa a análise e guarda-a na cache (corre no pool)"""
+        try:
+            llm_analysis = self.analyze_fn(report, stream.append).get("llm_analysis", {})
+        finally:
+            stream.close()
+
+        with self._lock:
+            if key in self._cancelled:
+                return dict(LLM_CANCELLED)
+
+        # Só análises com texto são guardadas (ver ScanCache)
+        self._cache().put_report(report["url"], {"llm_analysis": llm_analysis})
+        return llm_analysis
+
+    def _cache(self) -> ScanCache:
+        return self.cache or get_scan_cache()
+
+    def _forget(self, key: str, future: Future):
+        """Remove a tarefa terminada do registo"""
+        with self._lock:
+            if self._futures.get(key) is future:
+                del self._futures[key]
+                self._streams.pop(key, None)
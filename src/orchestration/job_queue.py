@@ -0,0 +1,551 @@
+"""
+Background Job Queue
+
+Executa scans e chamadas aos agentes fora da thread do script
+Streamlit, num pool de workers do processo. O estado, o progresso e os
+resultados de cada job ficam numa base SQLite (jobs.sqlite3 no diretório
+de cache), por isso um rerun, a mudança de página ou de empresa não
+cancelam nem repetem o trabalho: a UI guarda apenas o id do job e vai
+consultando o estado.
+
+- submit(kind, params, inputs) devolve o id; pedidos iguais (mesmo tipo
+  e parâmetros) a um job ainda ativo reaproveitam esse job
+- Dados grandes (ex: as linhas de um batch) vão em `inputs`: ficam uma
+  só vez na tabela job_inputs, identificados pelo hash do conteúdo, e os
+  parâmetros do job guardam apenas esse hash (INPUTS_PARAM); o handler
+  lê-os com context.inputs()
+- Resultados parciais (ex: cada linha de um batch, cada check de um
+  scan) são acrescentados como items, lidos por páginas com
+  items(job_id, after, limit)
+- Jobs que estavam na fila ou a correr quando o processo terminou são
+  retomados do início no arranque seguinte
+
+Tipos de job (JOB_HANDLERS):
+    security_scan       {"url", "force_refresh"}
+    batch_scan          {"max_workers", "llm_top_n", "budget"}, inputs: linhas
+    website_evaluation  {"url", "temperature" (opcional)}
+
+Uso:
+    queue = get_job_queue()
+    job_id = queue.submit("security_scan", {"url": url})
+    job = queue.get(job_id)       # job.status, job.progress, job.result
+    queue.items(job_id, after=0, limit=100)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+
+from domain.findings import Finding
+from services.cache._sqlite import connect, default_cache_dir
+
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+FINAL_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+# Workers do pool de jobs (cada batch_scan usa ainda o seu próprio pool)
+DEFAULT_JOB_WORKERS = int(os.getenv("LEADGEN_JOB_WORKERS", "4"))
+
+# Jobs terminados há mais tempo do que isto são apagados no arranque
+JOB_RETENTION = 7 * 24 * 60 * 60
+
+# Intervalo mínimo entre escritas de progresso do mesmo job (segundos)
+PROGRESS_INTERVAL = 0.5
+
+# Parâmetro com o hash dos inputs do job (ver submit)
+INPUTS_PARAM = "inputs_hash"
+
+
+@dataclass
+class Job:
+    """Estado persistido de um job"""
+    id: str
+    kind: str
+    params: Dict[str, Any]
+    status: str
+    progress: float = 0.0
+    meta: Dict[str, Any] = field(default_factory=dict)
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINAL_STATUSES
+
+    @property
+    def elapsed(self) -> Optional[float]:
+        """Segundos de execução (até agora, se ainda estiver a correr)"""
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.time()) - self.started_at
+
+
+class JobContext:
+    """Interface dada a cada handler para reportar progresso e resultados parciais"""
+
+    def __init__(self, queue: "JobQueue", job_id: str, inputs_hash: Optional[str] = None):
+        self.queue = queue
+        self.job_id = job_id
+        self.inputs_hash = inputs_hash
+        self._last_update = 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        """True se o cancelamento foi pedido (o handler deve parar assim que puder)"""
+        return self.queue._cancel_requested(self.job_id)
+
+    def update(self, progress: float, force: bool = False, **meta):
+        """
+        Atualiza o progresso (0.0 - 1.0) e os metadados do job.
+
+        As escritas são limitadas a uma a cada PROGRESS_INTERVAL, exceto
+        com `force` ou no fim (progress >= 1).
+        """
+        now = time.monotonic()
+        if not force and progress < 1 and now - self._last_update < PROGRESS_INTERVAL:
+            return
+        self._last_update = now
+        self.queue._set_progress(self.job_id, progress, meta)
+
+    def emit(self, item: Any):
+        """Acrescenta um resultado parcial (lido pela UI com items())"""
+        self.queue._add_item(self.job_id, item)
+
+    def inputs(self) -> Any:
+        """
+        Inputs do job (os dados passados em submit(..., inputs=...))
+
+        Raises:
+            KeyError: Se o job não tiver inputs ou se já tiverem sido apagados
+        """
+        if self.inputs_hash is None:
+            raise KeyError(f"O job {self.job_id} não tem inputs")
+        return self.queue._load_inputs(self.inputs_hash)
+
+
+class JobQueue:
+    """
+    Fila de jobs persistente com um pool de workers no processo.
+
+    O acesso à base é serializado por um lock (como nas caches); o modo
+    WAL permite que outras sessões leiam enquanto um worker escreve.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_workers: int = DEFAULT_JOB_WORKERS,
+                 handlers: Optional[Dict[str, Callable[[Dict[str, Any], JobContext], Any]]] = None):
+        """
+        Args:
+            path: Ficheiro SQLite (por omissão, jobs.sqlite3 no diretório de cache)
+            max_workers: Jobs executados em simultâneo
+            handlers: Função por tipo de job (por omissão JOB_HANDLERS)
+        """
+        self.path = path or default_cache_dir() / "jobs.sqlite3"
+        self.handlers = handlers or JOB_HANDLERS
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._cancelling = set()
+        self._conn = connect(self.path)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                params TEXT NOT NULL,
+                dedupe_key TEXT NOT NULL,
+                status TEXT NOT NULL,
+                progress REAL NOT NULL DEFAULT 0,
+                meta TEXT NOT NULL DEFAULT '{}',
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_dedupe ON jobs (dedupe_key, status);
+            CREATE TABLE IF NOT EXISTS job_items (
+                job_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (job_id, seq)
+            );
+            CREATE TABLE IF NOT EXISTS job_inputs (
+                hash TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                used_at REAL NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+        self._purge_expired()
+        self._resume_pending()
+
+    def submit(self, kind: str, params: Dict[str, Any], inputs: Any = None) -> str:
+        """
+        Coloca um job na fila (não bloqueia).
+
+        Args:
+            kind: Tipo de job (chave de JOB_HANDLERS)
+            params: Parâmetros do handler (serializáveis em JSON)
+            inputs: Dados grandes do job (serializáveis em JSON), guardados
+                à parte; os parâmetros levam só o hash (INPUTS_PARAM)
+
+        Returns:
+            Id do job (o de um job igual ainda ativo, se existir)
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Tipo de job desconhecido: {kind}")
+
+        inputs_payload = None
+        if inputs is not None:
+            inputs_payload = _dumps(inputs)
+            params = {**params, INPUTS_PARAM: hashlib.sha256(inputs_payload.encode()).hexdigest()}
+
+        payload = _dumps(params)
+        dedupe_key = hashlib.sha256(f"{kind}\n{payload}".encode()).hexdigest()
+
+        with self._lock:
+            if inputs_payload is not None:
+                self._conn.execute(
+                    "INSERT INTO job_inputs (hash, payload, used_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(hash) DO UPDATE SET used_at = excluded.used_at",
+                    (params[INPUTS_PARAM], inputs_payload, time.time()),
+                )
+                self._conn.commit()
+            row = self._conn.execute(
+                f"SELECT id FROM jobs WHERE dedupe_key = ? AND status IN ({_placeholders(ACTIVE_STATUSES)})",
+                (dedupe_key, *ACTIVE_STATUSES),
+            ).fetchone()
+            if row:
+                return row[0]
+
+            job_id = uuid.uuid4().hex
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, params, dedupe_key, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, payload, dedupe_key, QUEUED, time.time()),
+            )
+            self._conn.commit()
+
+        self._executor.submit(self._run, job_id)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Estado atual do job (None se não existir)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, kind, params, status, progress, meta, result, error, created_at, started_at, finished_at "
+                "FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+
+        return Job(
+            id=row[0],
+            kind=row[1],
+            params=json.loads(row[2]),
+            status=row[3],
+            progress=row[4],
+            meta=json.loads(row[5]),
+            result=json.loads(row[6]) if row[6] is not None else None,
+            error=row[7],
+            created_at=row[8],
+            started_at=row[9],
+            finished_at=row[10],
+        )
+
+    def items(self, job_id: str, after: int = 0, limit: Optional[int] = None) -> List[Tuple[int, Any]]:
+        """
+        Resultados parciais do job.
+
+        Args:
+            job_id: Id do job
+            after: Devolver só os items com seq > after (leitura incremental)
+            limit: Máximo de items devolvidos (None = todos)
+
+        Returns:
+            Lista de (seq, item) por ordem de emissão (seq começa em 1)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, payload FROM job_items WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (job_id, after, -1 if limit is None else limit),
+            ).fetchall()
+        return [(seq, json.loads(payload)) for seq, payload in rows]
+
+    def item_count(self, job_id: str) -> int:
+        """Número de resultados parciais do job"""
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(seq) FROM job_items WHERE job_id = ?", (job_id,)).fetchone()
+        return row[0] or 0
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Pede o cancelamento de um job.
+
+        Um job na fila é cancelado de imediato; um job a correr termina
+        quando o handler verificar `context.cancelled` (os resultados
+        parciais mantêm-se).
+
+        Returns:
+            True se o job ainda estava ativo
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None or row[0] not in ACTIVE_STATUSES:
+                return False
+
+            if row[0] == QUEUED:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ?", (CANCELLED, time.time(), job_id)
+                )
+                self._conn.commit()
+            else:
+                self._cancelling.add(job_id)
+        return True
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, job_id: str):
+        """Executa um job num worker do pool"""
+        with self._lock:
+            row = self._conn.execute("SELECT kind, params, status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None or row[2] != QUEUED:
+                return
+            kind, params = row[0], json.loads(row[1])
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ? WHERE id = ?", (RUNNING, time.time(), job_id)
+            )
+            self._conn.commit()
+
+        context = JobContext(self, job_id, params.get(INPUTS_PARAM))
+        try:
+            result = self.handlers[kind](params, context)
+            status, error = (CANCELLED if context.cancelled else SUCCEEDED), None
+        except Exception as e:
+            result, status, error = None, FAILED, str(e)
+
+        with self._lock:
+            self._cancelling.discard(job_id)
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, "
+                "progress = CASE WHEN ? = ? THEN 1 ELSE progress END WHERE id = ?",
+                (status, _dumps(result) if result is not None else None, error, time.time(),
+                 status, SUCCEEDED, job_id),
+            )
+            self._conn.commit()
+
+    def _cancel_requested(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._cancelling
+
+    def _set_progress(self, job_id: str, progress: float, meta: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET progress = ?, meta = ? WHERE id = ?", (min(progress, 1.0), _dumps(meta), job_id)
+            )
+            self._conn.commit()
+
+    def _add_item(self, job_id: str, item: Any):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO job_items (job_id, seq, payload) "
+                "SELECT ?, COALESCE(MAX(seq), 0) + 1, ? FROM job_items WHERE job_id = ?",
+                (job_id, _dumps(item), job_id),
+            )
+            self._conn.commit()
+
+    def _load_inputs(self, inputs_hash: str) -> Any:
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM job_inputs WHERE hash = ?", (inputs_hash,)).fetchone()
+        if row is None:
+            raise KeyError(f"Inputs do job não encontrados: {inputs_hash[:12]}")
+        return json.loads(row[0])
+
+    def _resume_pending(self):
+        """Volta a pôr na fila os jobs interrompidos por um reinício do processo"""
+        with self._lock:
+            job_ids = [row[0] for row in self._conn.execute(
+                f"SELECT id FROM jobs WHERE status IN ({_placeholders(ACTIVE_STATUSES)}) ORDER BY created_at",
+                ACTIVE_STATUSES,
+            )]
+            for job_id in job_ids:
+                self._conn.execute("DELETE FROM job_items WHERE job_id = ?", (job_id,))
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, progress = 0, meta = '{}', started_at = NULL WHERE id = ?",
+                    (QUEUED, job_id),
+                )
+            self._conn.commit()
+
+        for job_id in job_ids:
+            self._executor.submit(self._run, job_id)
+
+    def _purge_expired(self):
+        cutoff = time.time() - JOB_RETENTION
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM job_items WHERE job_id IN (SELECT id FROM jobs WHERE finished_at < ?)", (cutoff,)
+            )
+            self._conn.execute("DELETE FROM jobs WHERE finished_at < ?", (cutoff,))
+            # Inputs sem uso recente, exceto os de jobs ainda por retomar
+            self._conn.execute(
+                "DELETE FROM job_inputs WHERE used_at < ? AND NOT EXISTS ("
+                f"SELECT 1 FROM jobs WHERE status IN ({_placeholders(ACTIVE_STATUSES)}) "
+                "AND instr(jobs.params, job_inputs.hash) > 0)",
+                (cutoff, *ACTIVE_STATUSES),
+            )
+            self._conn.commit()
+
+
+# ========== HANDLERS ==========
+
+def run_security_scan_job(params: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    """
+    Workflow de segurança de um website.
+
+    Cada node concluído é emitido como item {"node", "update"}; o
+    relatório determinístico é emitido como node "final_report" antes de
+    se esperar pela análise LLM. Devolve o final_report com a análise.
+    """
+    from orchestration.security_workflow import CHECK_NODES, stream_security_check, wait_llm_analysis
+
+    # fetch, verify, checks, agregação, relatório e, por fim, a análise LLM
+    total_steps = len(CHECK_NODES) + 5
+    done = 0
+    report: Dict[str, Any] = {}
+    for node, update in stream_security_check(params["url"], force_refresh=params.get("force_refresh", False),
+                                              llm_mode="background"):
+        if node == "final_report":
+            report = update
+        elif node not in CHECK_NODES:
+            # fetch_response/verify_security transportam o snapshot (não serializável)
+            done += 1
+            context.update(done / total_steps, node=node)
+            continue
+
+        done += 1
+        context.emit({"node": node, "update": update})
+        context.update(done / total_steps, force=True, node=node)
+        if context.cancelled:
+            return report
+
+    wait_llm_analysis(report)
+    return report
+
+
+def run_batch_scan_job(params: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    """
+    Scan em batch (BatchSecurityScanner) de uma lista de empresas.
+
+    Cada linha concluída é emitida como item; o progresso inclui
+    throughput e ETA. Devolve as análises LLM dos top-N e as medições.
+    """
+    import pandas as pd
+    from orchestration.batch_scanner import BatchSecurityScanner
+
+    df = pd.DataFrame(context.inputs()).set_index("index")
+    scanner = BatchSecurityScanner(max_workers=params.get("max_workers", 8), llm_top_n=params.get("llm_top_n", 0),
+                                   budget=params.get("budget"))
+
+    rows = []
+    for result, progress in scanner.iter_scan(df):
+        context.emit(result)
+        rows.append(result)
+        context.update(
+            progress.fraction,
+            completed=progress.completed,
+            total=progress.total,
+            failed=progress.failed,
+            hosts=progress.hosts,
+            sites_per_minute=progress.sites_per_minute,
+            eta_seconds=progress.eta_seconds,
+        )
+        if context.cancelled:
+            scanner.cancel()
+            break
+
+    llm_analysis = {}
+    if rows and scanner.llm_top_n and not context.cancelled:
+        context.update(1.0, force=True, completed=len(rows), total=len(df), message="llm_top_n")
+        analysed = scanner.analyze_top_n(pd.DataFrame(rows))
+        if "llm_analysis" in analysed.columns:
+            llm_analysis = analysed.dropna(subset=["llm_analysis"]).set_index("url")["llm_analysis"].to_dict()
+
+    return {
+        "llm_analysis": llm_analysis,
+        "timings": scanner.timing_summary().to_dict("records"),
+        "histogram": scanner.timing_histogram("total").to_dict("records"),
+    }
+
+
+_website_agent = None
+_website_agent_lock = threading.Lock()
+
+
+def run_website_evaluation_job(params: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+    """Avaliação qualitativa do website (WebsiteAgent)"""
+    global _website_agent
+    with _website_agent_lock:
+        if _website_agent is None:
+            from agents.website_agent import WebsiteAgent
+            _website_agent = WebsiteAgent()
+
+    context.update(0.1, force=True)
+    agent = _website_agent.with_temperature(params.get("temperature"))
+    # No event loop LLM partilhado, como as avaliações em bulk do CLI
+    return agent.process_many([{"url": params["url"]}])[0]
+
+
+JOB_HANDLERS: Dict[str, Callable[[Dict[str, Any], JobContext], Any]] = {
+    "security_scan": run_security_scan_job,
+    "batch_scan": run_batch_scan_job,
+    "website_evaluation": run_website_evaluation_job,
+}
+
+
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Fila de jobs do processo (partilhada por todas as sessões Streamlit)"""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue()
+        return _job_queue
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=_json_default)
+
+
+def _json_default(value: Any) -> Any:
+    """numpy/pandas (ex: np.int64, NaN), findings e outros tipos não nativos"""
+    if isinstance(value, Finding):
+        return value.to_json()
+    if hasattr(value, "item"):
+        return value.item()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _placeholders(values) -> str:
+    return ", ".join("?" for _ in values)
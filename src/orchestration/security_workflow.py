@@ -1,131 +1,291 @@
 from langgraph.graph import StateGraph, START, END
-from typing import TypedDict, Annotated
-from agents.security_agent import SecurityAgent
-from agents.security_analysis_agent import SecurityAnalysisAgent
-
+from typing import TypedDict, Annotated, Callable, Iterator, Optional, Tuple
+from functools import wraps
+import operator
+import os
+import threading
+import time
+from orchestration.deferred_analysis import DeferredAnalysis, LLM_MODES, LLM_PENDING, LLM_SKIPPED
+from services.cache import get_scan_cache
+from services.deadline import DEFAULT_SCAN_BUDGET, Deadline, deadline_scope
+from services.risk_scoring import UNREACHABLE_LEVEL, finding_counts, risk_level, score_counts
+from services.instrumentation import measure
+from services.security import ResponseSnapshot
+
+
+def _merge_dicts(left: dict, right: dict) -> dict:
+    """Reducer - junta as medições escritas por nodes em paralelo"""
+    return {**(left or {}), **(right or {})}
 
 # Estado compartilhado entre nodes
 class SecurityState(TypedDict):
     url: str
+    snapshot: ResponseSnapshot
     security_issues: dict
     ssl_status: dict
     ssl_advanced: dict
     headers_check: dict
-    vulnerabilities: list
+    vulnerabilities: dict
     exposed_files: dict
     cookie_security: dict
     cms_detection: dict
     llm_analysis: dict
+    cached_sections: dict
+    deadline: Deadline
+    timed_out: Annotated[list, operator.add]
+    timings: Annotated[dict, _merge_dicts]
     final_report: dict
 
-# Inicializar agentes
-security_agent = SecurityAgent()
-analysis_agent = SecurityAnalysisAgent()
+# Checks executados em paralelo quando o website responde
+CHECK_NODES = [
+    "check_ssl",
+    "check_ssl_advanced",
+    "check_headers",
+    "check_vulnerabilities",
+    "check_exposed_files",
+    "check_cookie_security",
+    "check_cms_detection",
+]
+
+# Erros de fetch que indicam que o website não está acessível
+UNREACHABLE_ERROR_KINDS = ("timeout", "connection")
+
+# Valor de uma secção cujo check não terminou dentro do prazo
+TIMED_OUT = {"findings": [], "timed_out": True}
+
+# Agentes e grafo compilado: criados no primeiro uso e partilhados pelo processo
+_security_agent = None
+_analysis_agent = None
+_security_graph = None
+_resources_lock = threading.Lock()
+
+def get_security_agent():
+    """SecurityAgent partilhado (criado no primeiro uso)"""
+    global _security_agent
+    with _resources_lock:
+        if _security_agent is None:
+            from agents.security_agent import SecurityAgent
+            _security_agent = SecurityAgent()
+        return _security_agent
+
+def get_analysis_agent():
+    """SecurityAnalysisAgent partilhado (importa o cliente LLM só no primeiro uso)"""
+    global _analysis_agent
+    with _resources_lock:
+        if _analysis_agent is None:
+            from agents.security_analysis_agent import SecurityAnalysisAgent
+            _analysis_agent = SecurityAnalysisAgent()
+        return _analysis_agent
+
+def set_analysis_agent(agent):
+    """Substitui o agente de análise LLM (ex: agente falso nos benchmarks)"""
+    global _analysis_agent
+    with _resources_lock:
+        _analysis_agent = agent
+
+def get_security_graph():
+    """Workflow compilado (compilado no primeiro uso)"""
+    global _security_graph
+    with _resources_lock:
+        if _security_graph is None:
+            _security_graph = _build_security_graph()
+        return _security_graph
+
+def _timed(node):
+    """Decorator - mede o node (tempo, pedidos, bytes, TLS, erros) em state["timings"]"""
+    @wraps(node)
+    def wrapper(state: SecurityState) -> dict:
+        with measure(node.__name__) as measurement:
+            update = node(state)
+        return {**update, "timings": {node.__name__: measurement.as_dict()}}
+    return wrapper
+
+def _reuse_cached(section: str):
+    """Decorator - devolve a secção ainda válida em cache em vez de repetir o check"""
+    def decorator(node):
+        @wraps(node)
+        def wrapper(state: SecurityState) -> dict:
+            cached = state.get("cached_sections") or {}
+            if section in cached:
+                return {section: cached[section]}
+            return node(state)
+        return wrapper
+    return decorator
+
+def _within_deadline(section: str):
+    """
+    Decorator - executa o check respeitando o prazo global do scan
+
+    O check corre na própria thread do node (o LangGraph já executa os
+    checks em paralelo, uma thread por check) com o prazo ativo
+    (deadline_scope): cada pedido HTTP/SSL tem o timeout limitado ao tempo
+    restante e, depois de o prazo esgotar, novos pedidos falham logo com
+    DeadlineExceeded, o que faz o check terminar. O prazo mede assim só o
+    tempo de execução do check. Se o prazo esgotar antes de o check
+    começar ou enquanto corre, o resultado (incompleto) é descartado e a
+    secção é marcada como "timed out".
+    """
+    def decorator(node):
+        @wraps(node)
+        def wrapper(state: SecurityState) -> dict:
+            deadline = state.get("deadline")
+            if deadline is None or deadline.remaining() is None:
+                return node(state)
+
+            if not deadline.expired:
+                with deadline_scope(deadline):
+                    update = node(state)
+                if not deadline.expired:
+                    return update
+
+            return {section: dict(TIMED_OUT), "timed_out": [section]}
+        return wrapper
+    return decorator
+
+# Node: Descarregar a página uma única vez
+@_timed
+def fetch_response(state: SecurityState) -> dict:
+    """Node inicial - captura a resposta partilhada por todos os checks"""
+    with deadline_scope(state.get("deadline")):
+        return {"snapshot": get_security_agent().fetch(state["url"])}
 
 # Node: Verificar inseguranças gerais
+@_timed
+@_reuse_cached("security_issues")
 def verify_security(state: SecurityState) -> dict:
     """Node principal - verifica inseguranças"""
-    result = security_agent.process({
+    result = get_security_agent().process({
         "url": state["url"],
-        "check_type": "general"
+        "check_type": "general",
+        "snapshot": state["snapshot"]
     })
     
     return {"security_issues": result.get("issues", {})}
 
+# Router: decidir se vale a pena correr os checks
+def route_after_verify(state: SecurityState) -> list:
+    """
+    Conditional edge após verify_security.
+
+    Se o fetch inicial falhou por timeout ou ligação recusada, os restantes
+    checks iriam esperar cada um pelo seu timeout e a análise LLM seria
+    feita sobre um relatório vazio: segue-se diretamente para o relatório
+    de website inacessível.
+    """
+    snapshot = state.get("snapshot")
+    if snapshot is not None and snapshot.error_kind in UNREACHABLE_ERROR_KINDS:
+        return ["unreachable_report"]
+    return CHECK_NODES
+
 # Node: Verificar SSL/TLS
+@_timed
+@_reuse_cached("ssl_status")
+@_within_deadline("ssl_status")
 def check_ssl(state: SecurityState) -> dict:
     """Node específico - SSL"""
-    result = security_agent.process({
+    result = get_security_agent().process({
         "url": state["url"],
-        "check_type": "ssl"
+        "check_type": "ssl",
+        "snapshot": state["snapshot"]
     })
     
     return {"ssl_status": result.get("ssl", {})}
 
 # Node: Verificar headers HTTP
+@_timed
+@_reuse_cached("headers_check")
+@_within_deadline("headers_check")
 def check_headers(state: SecurityState) -> dict:
     """Node específico - Headers"""
-    result = security_agent.process({
+    result = get_security_agent().process({
         "url": state["url"],
-        "check_type": "headers"
+        "check_type": "headers",
+        "snapshot": state["snapshot"]
     })
     
     return {"headers_check": result.get("headers", {})}
 
 # Node: Verificar vulnerabilidades
+@_timed
+@_reuse_cached("vulnerabilities")
+@_within_deadline("vulnerabilities")
 def check_vulnerabilities(state: SecurityState) -> dict:
     """Node específico - Vulnerabilidades"""
-    result = security_agent.process({
+    result = get_security_agent().process({
         "url": state["url"],
-        "check_type": "vulnerabilities"
+        "check_type": "vulnerabilities",
+        "snapshot": state["snapshot"]
     })
 
-    return {"vulnerabilities": result.get("vulnerabilities", [])}
+    return {"vulnerabilities": result.get("vulnerabilities", {})}
 
 # Node: Verificar SSL avançado
+@_timed
+@_reuse_cached("ssl_advanced")
+@_within_deadline("ssl_advanced")
 def check_ssl_advanced(state: SecurityState) -> dict:
     """Node específico - SSL Avançado"""
-    result = security_agent.process({
+    result = get_security_agent().process({
         "url": state["url"],
-        "check_type": "ssl_advanced"
+        "check_type": "ssl_advanced",
+        "snapshot": state["snapshot"]
     })
 
     return {"ssl_advanced": result.get("ssl_advanced", {})}
 
 # Node: Verificar arquivos expostos
+@_timed
+@_reuse_cached("exposed_files")
+@_within_deadline("exposed_files")
 def check_exposed_files(state: SecurityState) -> dict:
     """Node específico - Arquivos Expostos"""
-    result = security_agent.process({
+    result = get_security_agent().process({
         "url": state["url"],
-        "check_type": "exposed_files"
+        "check_type": "exposed_files",
+        "snapshot": state["snapshot"]
     })
 
     return {"exposed_files": result.get("exposed_files", {})}
 
 # Node: Verificar cookie security
+@_timed
+@_reuse_cached("cookie_security")
+@_within_deadline("cookie_security")
 def check_cookie_security(state: SecurityState) -> dict:
     """Node específico - Cookie Security"""
-    result = security_agent.process({
+    result = get_security_agent().process({
         "url": state["url"],
-        "check_type": "cookie_security"
+        "check_type": "cookie_security",
+        "snapshot": state["snapshot"]
     })
 
     return {"cookie_security": result.get("cookie_security", {})}
 
 # Node: Detectar CMS
+@_timed
+@_reuse_cached("cms_detection")
+@_within_deadline("cms_detection")
 def check_cms_detection(state: SecurityState) -> dict:
     """Node específico - CMS Detection"""
-    result = security_agent.process({
+    result = get_security_agent().process({
         "url": state["url"],
-        "check_type": "cms_detection"
+        "check_type": "cms_detection",
+        "snapshot": state["snapshot"]
     })
 
     return {"cms_detection": result.get("cms_detection", {})}
 
-# Node: Agregar resultados e gerar análise LLM
+# Node: Agregar resultados
 def aggregate_results(state: SecurityState) -> dict:
-    """Node final - consolida tudo e gera análise LLM"""
-
-    # Calcular risk score e level
-    risk_score = calculate_risk_score(state)
-    risk_level = calculate_risk_level(state)
+    """
+    Node final - consolida o relatório determinístico
 
-    # Preparar dados para análise LLM
-    analysis_data = {
-        "url": state["url"],
-        "security_issues": state.get("security_issues", {}),
-        "ssl_advanced": state.get("ssl_advanced", {}),
-        "headers_check": state.get("headers_check", {}),
-        "vulnerabilities": state.get("vulnerabilities", []),
-        "exposed_files": state.get("exposed_files", {}),
-        "cookie_security": state.get("cookie_security", {}),
-        "cms_detection": state.get("cms_detection", {}),
-        "risk_score": risk_score,
-        "risk_level": risk_level
-    }
+    A análise LLM não é feita aqui: é pedida depois (ver _attach_llm_analysis)
+    para que o relatório fique disponível sem esperar pelo LLM.
+    """
 
-    # Gerar análise LLM
-    llm_result = analysis_agent.process(analysis_data)
+    # Calcular risk score (uma vez) e o nível correspondente
+    risk_score = calculate_risk_score(state)
 
     return {
         "final_report": {
@@ -138,105 +298,290 @@ def aggregate_results(state: SecurityState) -> dict:
             "exposed_files": state["exposed_files"],
             "cookie_security": state["cookie_security"],
             "cms_detection": state["cms_detection"],
-            "llm_analysis": llm_result.get("llm_analysis", {}),
-            "risk_level": risk_level,
-            "risk_score": risk_score
+            "llm_analysis": (state.get("cached_sections") or {}).get("llm_analysis", {}),
+            "risk_level": risk_level(risk_score),
+            "risk_score": risk_score,
+            "reachable": state["snapshot"].reachable if state.get("snapshot") else True,
+            "timed_out": state.get("timed_out", []),
+            "timings": state.get("timings", {})
         }
     }
 
-def calculate_risk_level(state: SecurityState) -> str:
-    """Calcula nível de risco baseado em múltiplos fatores"""
-    risk_score = calculate_risk_score(state)
-
-    if risk_score >= 80:
-        return "CRITICAL"
-    elif risk_score >= 60:
-        return "HIGH"
-    elif risk_score >= 30:
-        return "MEDIUM"
-    elif risk_score > 0:
-        return "LOW"
-    return "VERY LOW"
-
-def calculate_risk_score(state: SecurityState) -> int:
-    """Calcula score de risco (0-100)"""
-    score = 0
-
-    # Vulnerabilidades gerais (até 30 pontos)
-    vuln_count = len(state.get("vulnerabilities", []))
-    score += min(vuln_count * 5, 30)
+def run_llm_analysis(report: dict, on_token: Optional[Callable[[str], None]] = None) -> dict:
+    """
+    Gera a análise LLM de um relatório determinístico (corre em background)
 
-    # Arquivos expostos críticos (até 40 pontos)
-    exposed_files = state.get("exposed_files", {})
-    critical_exposed = exposed_files.get("critical_exposed", [])
-    score += min(len(critical_exposed) * 20, 40)
+    Args:
+        report: final_report do workflow
+        on_token: Recebe a narrativa em streaming, à medida que é gerada
+    """
+    analysis_data = {
+        "url": report["url"],
+        "security_issues": report.get("security_issues", {}),
+        "ssl_advanced": report.get("ssl_advanced", {}),
+        "headers_check": report.get("headers_check", {}),
+        "vulnerabilities": report.get("vulnerabilities", {}),
+        "exposed_files": report.get("exposed_files", {}),
+        "cookie_security": report.get("cookie_security", {}),
+        "cms_detection": report.get("cms_detection", {}),
+        "risk_score": report.get("risk_score"),
+        "risk_level": report.get("risk_level")
+    }
+    return get_analysis_agent().process(analysis_data, on_token=on_token)
 
-    # SSL issues (até 20 pontos)
-    ssl_advanced = state.get("ssl_advanced", {})
-    ssl_issues = ssl_advanced.get("issues", [])
-    score += min(len(ssl_issues) * 10, 20)
+# Análises LLM em background, partilhadas por todas as sessões
+deferred_analysis = DeferredAnalysis(run_llm_analysis, max_workers=int(os.getenv("LEADGEN_LLM_WORKERS", "2")))
 
-    # Cookie security (até 10 pontos)
-    cookie_security = state.get("cookie_security", {})
-    cookie_issues = cookie_security.get("issues", [])
-    if len(cookie_issues) > 0:
-        score += min(len(cookie_issues) * 2, 10)
+# Node: Relatório leve para websites inacessíveis
+def unreachable_report(state: SecurityState) -> dict:
+    """Node final alternativo - relatório sem checks nem análise LLM"""
+    return {
+        "final_report": {
+            "url": state["url"],
+            "security_issues": state.get("security_issues", {}),
+            "ssl_status": {},
+            "ssl_advanced": {},
+            "headers_check": {},
+            "vulnerabilities": {},
+            "exposed_files": {},
+            "cookie_security": {},
+            "cms_detection": {},
+            "llm_analysis": {"status": "⏭️ Não executada (website inacessível)"},
+            "risk_level": UNREACHABLE_LEVEL,
+            "risk_score": 0,
+            "reachable": False,
+            "timed_out": [],
+            "timings": state.get("timings", {})
+        }
+    }
 
-    return min(score, 100)
+def calculate_risk_score(state: SecurityState) -> int:
+    """Calcula score de risco (0-100) a partir dos findings (ver services.risk_scoring)"""
+    return score_counts(finding_counts(state))
 
 # Construir o workflow
-workflow = StateGraph(SecurityState)
-
-# Adicionar nodes
-workflow.add_node("verify_security", verify_security)
-workflow.add_node("check_ssl", check_ssl)
-workflow.add_node("check_ssl_advanced", check_ssl_advanced)
-workflow.add_node("check_headers", check_headers)
-workflow.add_node("check_vulnerabilities", check_vulnerabilities)
-workflow.add_node("check_exposed_files", check_exposed_files)
-workflow.add_node("check_cookie_security", check_cookie_security)
-workflow.add_node("check_cms_detection", check_cms_detection)
-workflow.add_node("aggregate_results", aggregate_results)
-
-# Adicionar edges - todos os checks rodam em paralelo após verify_security
-workflow.add_edge(START, "verify_security")
-workflow.add_edge("verify_security", "check_ssl")
-workflow.add_edge("verify_security", "check_ssl_advanced")
-workflow.add_edge("verify_security", "check_headers")
-workflow.add_edge("verify_security", "check_vulnerabilities")
-workflow.add_edge("verify_security", "check_exposed_files")
-workflow.add_edge("verify_security", "check_cookie_security")
-workflow.add_edge("verify_security", "check_cms_detection")
-
-# Todos os checks convergem para aggregate_results (que gera análise LLM)
-workflow.add_edge("check_ssl", "aggregate_results")
-workflow.add_edge("check_ssl_advanced", "aggregate_results")
-workflow.add_edge("check_headers", "aggregate_results")
-workflow.add_edge("check_vulnerabilities", "aggregate_results")
-workflow.add_edge("check_exposed_files", "aggregate_results")
-workflow.add_edge("check_cookie_security", "aggregate_results")
-workflow.add_edge("check_cms_detection", "aggregate_results")
-workflow.add_edge("aggregate_results", END)
-
-# Compilar
-security_graph = workflow.compile()
+def _build_security_graph():
+    """Constrói e compila o workflow de segurança"""
+    workflow = StateGraph(SecurityState)
+
+    # Adicionar nodes
+    workflow.add_node("fetch_response", fetch_response)
+    workflow.add_node("verify_security", verify_security)
+    workflow.add_node("check_ssl", check_ssl)
+    workflow.add_node("check_ssl_advanced", check_ssl_advanced)
+    workflow.add_node("check_headers", check_headers)
+    workflow.add_node("check_vulnerabilities", check_vulnerabilities)
+    workflow.add_node("check_exposed_files", check_exposed_files)
+    workflow.add_node("check_cookie_security", check_cookie_security)
+    workflow.add_node("check_cms_detection", check_cms_detection)
+    workflow.add_node("aggregate_results", aggregate_results)
+    workflow.add_node("unreachable_report", unreachable_report)
+
+    # Adicionar edges - todos os checks rodam em paralelo após verify_security
+    # O fetch corre uma única vez, antes de qualquer check
+    workflow.add_edge(START, "fetch_response")
+    workflow.add_edge("fetch_response", "verify_security")
+
+    # Website inacessível: salta os checks e a análise LLM
+    workflow.add_conditional_edges(
+        "verify_security",
+        route_after_verify,
+        CHECK_NODES + ["unreachable_report"]
+    )
+    workflow.add_edge("unreachable_report", END)
+
+    # Todos os checks convergem para aggregate_results (relatório determinístico)
+    workflow.add_edge("check_ssl", "aggregate_results")
+    workflow.add_edge("check_ssl_advanced", "aggregate_results")
+    workflow.add_edge("check_headers", "aggregate_results")
+    workflow.add_edge("check_vulnerabilities", "aggregate_results")
+    workflow.add_edge("check_exposed_files", "aggregate_results")
+    workflow.add_edge("check_cookie_security", "aggregate_results")
+    workflow.add_edge("check_cms_detection", "aggregate_results")
+    workflow.add_edge("aggregate_results", END)
+
+    # Compilar
+    return workflow.compile()
 
 # Usar no Streamlit
-def run_security_check(url: str) -> dict:
-    """Executa o workflow completo de segurança com análise LLM"""
-    state = {
+def stream_security_check(url: str, force_refresh: bool = False, llm_mode: str = "background",
+                          budget: Optional[float] = None) -> Iterator[Tuple[str, dict]]:
+    """
+    Executa o workflow devolvendo o resultado de cada node assim que termina
+
+    Secções válidas em cache são reaproveitadas (e chegam logo no início),
+    relatórios completos vêm diretamente da cache e só relatórios de
+    websites acessíveis são guardados.
+
+    Args:
+        url: URL do website
+        force_refresh: Ignorar a cache e repetir todas as verificações
+        llm_mode: Análise LLM - "wait" (anexada antes de devolver o relatório),
+            "background" (fica pendente, ver wait_llm_analysis) ou "skip"
+        budget: Prazo global (segundos) dos checks, sem contar a análise LLM
+            (por omissão DEFAULT_SCAN_BUDGET; 0 = sem limite). Checks que não
+            terminem a tempo ficam listados em report["timed_out"]
+
+    Yields:
+        (nome do node, secções atualizadas pelo node); o último evento é
+        ("final_report", relatório final)
+    """
+    if llm_mode not in LLM_MODES:
+        raise ValueError(f"llm_mode inválido: {llm_mode}")
+
+    cache = get_scan_cache()
+    if force_refresh:
+        cache.invalidate(url)
+    cached_sections = cache.get_sections(url)
+
+    if cache.is_complete(cached_sections, exclude=("llm_analysis",)):
+        report = _report_from_cache(url, cached_sections)
+    else:
+        report = {}
+        started = time.perf_counter()
+        state = _initial_state(url, cached_sections, _scan_deadline(budget))
+        # Uma thread por check: nenhum check espera por outro (nem pelos de outros scans)
+        config = {"max_concurrency": len(CHECK_NODES)}
+        for chunk in get_security_graph().stream(state, config, stream_mode="updates"):
+            for node, update in chunk.items():
+                if not update:
+                    continue
+                if "final_report" in update:
+                    report = update["final_report"]
+                else:
+                    yield node, update
+
+        if "timings" in report:
+            report["timings"]["total"] = _total_timing(report["timings"], time.perf_counter() - started)
+
+        # Só se guardam resultados de websites que responderam (e checks que terminaram);
+        # as secções reaproveitadas da cache mantêm a validade que já tinham
+        if report.get("reachable"):
+            skip = set(report.get("timed_out", [])) | set(cached_sections)
+            cache.put_report(url, {k: v for k, v in report.items() if k not in skip})
+
+    _attach_llm_analysis(report, llm_mode)
+    yield "final_report", report
+
+def run_security_check(url: str, force_refresh: bool = False, llm_mode: str = "wait",
+                       budget: Optional[float] = None) -> dict:
+    """
+    Executa o workflow completo de segurança com análise LLM
+
+    Os resultados ficam em cache (por secção, cada uma com o seu TTL).
+    Se todas as secções estiverem válidas o relatório vem diretamente da
+    cache; se só algumas estiverem, apenas os checks em falta são executados.
+
+    Args:
+        url: URL do website
+        force_refresh: Ignorar a cache e repetir todas as verificações
+        llm_mode: "wait" (por omissão), "background" ou "skip"
+        budget: Prazo global (segundos) dos checks (ver stream_security_check)
+    """
+    report = {}
+    for node, update in stream_security_check(url, force_refresh, llm_mode, budget):
+        if node == "final_report":
+            report = update
+    return report
+
+def wait_llm_analysis(report: dict, timeout: Optional[float] = None) -> dict:
+    """
+    Espera pela análise LLM pendente de um relatório e anexa-a
+
+    Args:
+        report: Relatório devolvido com llm_mode="background"
+        timeout: Segundos máximos de espera (None = sem limite)
+
+    Returns:
+        O dict llm_analysis do relatório
+    """
+    if report.get("llm_analysis", {}).get("status") == LLM_PENDING["status"]:
+        deferred_analysis.wait(report, timeout=timeout)
+    return report.get("llm_analysis", {})
+
+def stream_llm_analysis(url: str, idle_timeout: Optional[float] = 60) -> Iterator[str]:
+    """
+    Narrativa LLM em curso para um URL, à medida que é gerada (ex: para
+    st.write_stream). Quando termina, o texto completo fica em cache e é
+    anexado ao relatório como habitualmente (ver wait_llm_analysis).
+
+    Args:
+        url: URL do relatório
+        idle_timeout: Segundos máximos sem texto novo (None = sem limite)
+
+    Yields:
+        Pedaços de texto (nada se não houver análise em curso)
+    """
+    return deferred_analysis.stream(url, idle_timeout)
+
+def llm_analysis_text(url: str) -> Optional[str]:
+    """
+    Texto já gerado da narrativa LLM em curso para um URL, sem esperar
+    (para quem volta a desenhar periodicamente, ex: um fragment com run_every)
+
+    Returns:
+        Texto até agora, ou None se não houver análise em curso
+    """
+    return deferred_analysis.text(url)
+
+def cancel_llm_analysis(url: str) -> bool:
+    """Cancela a análise LLM pendente de um URL"""
+    return deferred_analysis.cancel(url)
+
+def _attach_llm_analysis(report: dict, llm_mode: str):
+    """Anexa (ou agenda) a análise LLM conforme o modo pedido"""
+    if not report.get("reachable", True) or report.get("llm_analysis", {}).get("analysis"):
+        return
+
+    if llm_mode == "skip":
+        report["llm_analysis"] = dict(LLM_SKIPPED)
+    elif llm_mode == "background":
+        deferred_analysis.submit(report)
+        report["llm_analysis"] = dict(LLM_PENDING)
+    else:
+        deferred_analysis.wait(report)
+
+def _total_timing(timings: dict, elapsed: float) -> dict:
+    """Soma os contadores dos nodes (cada node já inclui os seus checkers)"""
+    total = {"wall_ms": round(elapsed * 1000, 1)}
+    for counter in ("requests", "bytes", "tls_handshakes", "errors"):
+        total[counter] = sum(node.get(counter, 0) for node in timings.values())
+    return total
+
+def _scan_deadline(budget: Optional[float]) -> Deadline:
+    """Prazo do scan a partir do budget pedido (0 ou negativo = sem limite)"""
+    budget = DEFAULT_SCAN_BUDGET if budget is None else budget
+    return Deadline(budget if budget > 0 else None)
+
+def _initial_state(url: str, cached_sections: dict, deadline: Optional[Deadline] = None) -> SecurityState:
+    """Estado inicial do workflow"""
+    return {
         "url": url,
+        "snapshot": None,
         "security_issues": {},
         "ssl_status": {},
         "ssl_advanced": {},
         "headers_check": {},
-        "vulnerabilities": [],
+        "vulnerabilities": {},
         "exposed_files": {},
         "cookie_security": {},
         "cms_detection": {},
         "llm_analysis": {},
+        "cached_sections": cached_sections,
+        "deadline": deadline,
+        "timed_out": [],
+        "timings": {},
         "final_report": {}
     }
 
-    result = security_graph.invoke(state)
-    return result["final_report"]
\ No newline at end of file
+def _report_from_cache(url: str, sections: dict) -> dict:
+    """Reconstrói o final_report a partir das secções guardadas em cache"""
+    risk_score = calculate_risk_score(sections)
+    return {
+        "url": url,
+        **sections,
+        "risk_level": risk_level(risk_score),
+        "risk_score": risk_score,
+        "reachable": True,
+        "from_cache": True
+    }
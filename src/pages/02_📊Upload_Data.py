@@ -18,4 +18,6 @@ if df is not None:
     st.success("✅ Dataset loaded and cached!")
     st.balloons()
     if st.button("🧙‍♂️ Start Website Analysis"):
-        st.switch_page(Pages.WEBSITE_ANALYZER.value)
\ No newline at end of file
+        st.switch_page(Pages.WEBSITE_ANALYZER.value)
+    if st.button("🛰️ Start Batch Security Scan"):
+        st.switch_page(Pages.BATCH_SCAN.value)
\ No newline at end of file
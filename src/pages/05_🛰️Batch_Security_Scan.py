@@ -0,0 +1,21 @@
+import streamlit as st
+
+from ui.batch_scan_ui import render_batch_scan
+from ui.pagesEnum import Pages
+
+st.title("🛰️ Batch Security Scan")
+
+# Verificar se já temos dados carregados
+dataset_loaded = 'uploaded_data' in st.session_state and st.session_state.uploaded_data is not None
+
+if dataset_loaded:
+    df = st.session_state.uploaded_data
+    source = st.session_state.get('dataset_source', 'uploaded file')
+
+    st.success(f"✅ Dataset loaded from {source}!")
+
+    render_batch_scan(df)
+else:
+    st.warning("⚠️ No dataset was loaded. Please upload one first.")
+    if st.button("Go to Upload Page", use_container_width=True):
+        st.switch_page(Pages.UPLOAD_DATA.value)
@@ -0,0 +1,19 @@
+"""
+Caches persistentes
+
+Caches em disco (SQLite) partilhadas entre sessões e execuções.
+"""
+
+from .scan_cache import ScanCache, SECTION_TTLS, get_scan_cache
+from .cert_cache import CertificateCache, get_cert_cache
+from .llm_cache import LLMCache, get_llm_cache
+
+__all__ = [
+    'ScanCache',
+    'SECTION_TTLS',
+    'get_scan_cache',
+    'CertificateCache',
+    'get_cert_cache',
+    'LLMCache',
+    'get_llm_cache',
+]
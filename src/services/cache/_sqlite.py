@@ -0,0 +1,28 @@
+"""
+Helpers partilhados pelas caches em disco (SQLite).
+"""
+
+from pathlib import Path
+import os
+import sqlite3
+
+
+def default_cache_dir() -> Path:
+    """Diretório das caches (LEADGEN_CACHE_DIR ou ~/.cache/leadgenerator)"""
+    path = Path(os.getenv("LEADGEN_CACHE_DIR", Path.home() / ".cache" / "leadgenerator"))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    """
+    Abre uma ligação SQLite partilhável entre threads.
+
+    O acesso concorrente dentro do processo deve ser serializado pelo
+    chamador (lock); o modo WAL permite leituras de outros processos
+    (ex: várias sessões Streamlit) enquanto se escreve.
+    """
+    conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
@@ -0,0 +1,150 @@
+"""
+TLS Certificate Cache
+
+Cache dos certificados obtidos pelo CheckSSL, indexada por (hostname, porta).
+Guarda os campos já processados e o protocolo negociado, em memória e em
+disco, para que websites no mesmo host não repitam o handshake TLS.
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import json
+import ssl
+import threading
+import time
+
+from ._sqlite import connect, default_cache_dir
+
+
+DEFAULT_MAX_AGE = 24 * 60 * 60
+DEFAULT_MAX_MEMORY_ENTRIES = 10_000
+
+
+class CertificateCache:
+    """
+    Cache de certificados com validade limitada por `notAfter` e por `max_age`.
+
+    Uma entrada deixa de ser servida quando o certificado expira ou quando
+    foi obtida há mais de `max_age` segundos (para apanhar renovações).
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_age: int = DEFAULT_MAX_AGE,
+                 max_memory_entries: int = DEFAULT_MAX_MEMORY_ENTRIES):
+        """
+        Args:
+            path: Ficheiro SQLite (por omissão, certificates.sqlite3 no diretório de cache)
+            max_age: Idade máxima (segundos) de uma entrada
+            max_memory_entries: Número máximo de entradas mantidas em memória (LRU)
+        """
+        self.path = path or default_cache_dir() / "certificates.sqlite3"
+        self.max_age = max_age
+        self.max_memory_entries = max_memory_entries
+
+        self._memory: "OrderedDict[Tuple[str, int], Tuple[float, float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = connect(self.path)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS certificates (
+                hostname TEXT NOT NULL,
+                port INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                not_after REAL NOT NULL,
+                PRIMARY KEY (hostname, port)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, hostname: str, port: int = 443) -> Optional[Dict[str, Any]]:
+        """
+        Devolve o resultado guardado se ainda estiver válido.
+
+        Args:
+            hostname: Hostname do servidor
+            port: Porta TLS
+
+        Returns:
+            Dict no formato de CheckSSL.verifica_ssl, ou None
+        """
+        key = (hostname.lower(), port)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                row = self._conn.execute(
+                    "SELECT fetched_at, not_after, payload FROM certificates WHERE hostname = ? AND port = ?",
+                    key
+                ).fetchone()
+                if row is not None:
+                    entry = (row[0], row[1], json.loads(row[2]))
+                    self._remember(key, entry)
+            else:
+                self._memory.move_to_end(key)
+
+        if entry is None:
+            return None
+
+        fetched_at, not_after, result = entry
+        if now >= not_after or now - fetched_at > self.max_age:
+            return None
+        return dict(result)
+
+    def put(self, hostname: str, port: int, result: Dict[str, Any]):
+        """
+        Guarda um certificado válido (resultados de erro não são guardados).
+
+        Args:
+            hostname: Hostname do servidor
+            port: Porta TLS
+            result: Dict devolvido por CheckSSL.verifica_ssl / processar_certificado
+        """
+        if not result.get("valido") or not result.get("valido_ate"):
+            return
+
+        try:
+            not_after = ssl.cert_time_to_seconds(result["valido_ate"])
+        except ValueError:
+            return
+
+        key = (hostname.lower(), port)
+        entry = (time.time(), float(not_after), dict(result))
+
+        with self._lock:
+            self._remember(key, entry)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO certificates (hostname, port, payload, fetched_at, not_after) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (*key, json.dumps(entry[2], ensure_ascii=False, default=str), entry[0], entry[1])
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Esvazia a cache (memória e disco)"""
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM certificates")
+            self._conn.commit()
+
+    def _remember(self, key: Tuple[str, int], entry: Tuple[float, float, Dict[str, Any]]):
+        """Guarda em memória respeitando o limite LRU (chamar com o lock)"""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+
+_cert_cache: Optional[CertificateCache] = None
+_cert_cache_lock = threading.Lock()
+
+
+def get_cert_cache() -> CertificateCache:
+    """Cache partilhada por todo o processo (criada no primeiro uso)"""
+    global _cert_cache
+    with _cert_cache_lock:
+        if _cert_cache is None:
+            _cert_cache = CertificateCache()
+        return _cert_cache
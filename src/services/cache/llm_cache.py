@@ -0,0 +1,221 @@
+"""
+LLM Response Cache
+
+Cache persistente (SQLite, com uma camada LRU em memória) das respostas
+dos agentes LLM, partilhada por todos os agentes e sessões. A chave junta
+o modelo, a temperatura, a versão do prompt do agente e o prompt já
+preenchido com os dados: voltar a analisar a mesma empresa devolve a
+resposta guardada em milissegundos, sem nova chamada à API.
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+import json
+import os
+import threading
+import time
+
+from ._sqlite import connect, default_cache_dir
+
+
+DAY = 24 * 60 * 60
+
+DEFAULT_TTL = 7 * DAY
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_MEMORY_ENTRIES = 2_000
+
+
+def make_key(model: str, temperature: Optional[float], prompt_version: str, prompt: str) -> str:
+    """
+    Chave de uma resposta
+
+    Args:
+        model: Nome do modelo
+        temperature: Temperatura do pedido
+        prompt_version: Versão do template do agente (PROMPT_VERSION)
+        prompt: Prompt final, já preenchido com os dados
+
+    Returns:
+        sha256 (hex) dos quatro campos
+    """
+    raw = json.dumps([model, temperature, prompt_version, prompt], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Cache de respostas LLM com TTL e evicção por tamanho (LRU).
+
+    As entradas mais usadas ficam também em memória; quando o tamanho em
+    disco ultrapassa `max_bytes`, as respostas usadas há mais tempo são
+    removidas até ficar abaixo de 90% do limite.
+    """
+
+    def __init__(self, path: Optional[Path] = None, ttl: int = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_memory_entries: int = DEFAULT_MAX_MEMORY_ENTRIES):
+        """
+        Args:
+            path: Ficheiro SQLite (por omissão, llm_cache.sqlite3 no diretório de cache)
+            ttl: Segundos durante os quais uma resposta é reutilizada
+            max_bytes: Tamanho máximo das respostas guardadas em disco
+            max_memory_entries: Número máximo de respostas mantidas em memória (LRU)
+        """
+        self.path = path or default_cache_dir() / "llm_cache.sqlite3"
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_memory_entries = max_memory_entries
+
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._counters = {"hits": 0, "memory_hits": 0, "misses": 0, "writes": 0}
+        self._lock = threading.Lock()
+        self._conn = connect(self.path)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                agent TEXT NOT NULL,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_access ON llm_responses (last_access)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Devolve a resposta guardada, se ainda estiver dentro do TTL.
+
+        Args:
+            key: Chave devolvida por make_key
+
+        Returns:
+            Texto da resposta, ou None
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] > now:
+                self._memory.move_to_end(key)
+                self._counters["hits"] += 1
+                self._counters["memory_hits"] += 1
+                return entry[1]
+
+            row = self._conn.execute(
+                "SELECT expires_at, response FROM llm_responses WHERE key = ? AND expires_at > ?",
+                (key, now)
+            ).fetchone()
+            if row is None:
+                self._memory.pop(key, None)
+                self._counters["misses"] += 1
+                return None
+
+            self._conn.execute("UPDATE llm_responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._remember(key, (row[0], row[1]))
+            self._counters["hits"] += 1
+            return row[1]
+
+    def put(self, key: str, response: str, agent: str = "", model: str = ""):
+        """
+        Guarda uma resposta (respostas vazias não são guardadas).
+
+        Args:
+            key: Chave devolvida por make_key
+            response: Texto da resposta do LLM
+            agent: Nome do agente (para estatísticas)
+            model: Nome do modelo (para estatísticas)
+        """
+        if not response:
+            return
+
+        now = time.time()
+        expires_at = now + self.ttl
+        size = len(response.encode("utf-8"))
+
+        with self._lock:
+            self._remember(key, (expires_at, response))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses "
+                "(key, agent, model, response, size, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, agent, model, response, size, now, expires_at, now)
+            )
+            self._counters["writes"] += 1
+            self._evict()
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores desde o arranque (hits, misses, hit_rate) e tamanho em disco"""
+        with self._lock:
+            counters = dict(self._counters)
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses"
+            ).fetchone()
+
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            **counters,
+            "hit_rate": round(counters["hits"] / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self):
+        """Esvazia a cache (memória e disco) e os contadores"""
+        with self._lock:
+            self._memory.clear()
+            self._counters = dict.fromkeys(self._counters, 0)
+            self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+
+    def _remember(self, key: str, entry: Tuple[float, str]):
+        """Guarda em memória respeitando o limite LRU (chamar com o lock)"""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        """Remove respostas expiradas e, se necessário, as menos usadas (chamar com o lock)"""
+        self._conn.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (time.time(),))
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute("SELECT key, size FROM llm_responses ORDER BY last_access ASC").fetchall()
+
+        to_delete = []
+        for key, size in rows:
+            if total <= target:
+                break
+            to_delete.append((key,))
+            total -= size
+            self._memory.pop(key, None)
+
+        self._conn.executemany("DELETE FROM llm_responses WHERE key = ?", to_delete)
+
+
+_llm_cache: Optional[LLMCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """Cache partilhada por todo o processo (criada no primeiro uso)"""
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            ttl = int(os.getenv("LEADGEN_LLM_CACHE_TTL", DEFAULT_TTL))
+            max_mb = int(os.getenv("LEADGEN_LLM_CACHE_MAX_MB", DEFAULT_MAX_BYTES // (1024 * 1024)))
+            _llm_cache = LLMCache(ttl=ttl, max_bytes=max_mb * 1024 * 1024)
+        return _llm_cache
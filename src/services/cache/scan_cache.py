@@ -0,0 +1,231 @@
+"""
+Scan Result Cache
+
+Cache persistente (SQLite) dos relatórios de segurança, partilhada por
+todas as sessões. Cada secção do relatório é guardada com o seu próprio
+TTL: dados do certificado mudam raramente, headers e cookies mudam mais.
+As entradas são indexadas pelo URL normalizado e pela versão do scanner,
+para que uma alteração aos checkers invalide os resultados antigos.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+import json
+import os
+import threading
+import time
+
+from domain.findings import decode_section, json_default
+from utils.helpers import normalize_url
+from ._sqlite import connect, default_cache_dir
+
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+# TTL (segundos) por secção do final_report
+SECTION_TTLS: Dict[str, int] = {
+    "security_issues": 6 * HOUR,
+    "ssl_status": 1 * DAY,
+    "ssl_advanced": 3 * DAY,
+    "headers_check": 6 * HOUR,
+    "vulnerabilities": 6 * HOUR,
+    "exposed_files": 12 * HOUR,
+    "cookie_security": 6 * HOUR,
+    "cms_detection": 1 * DAY,
+    "llm_analysis": 1 * DAY,
+}
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class ScanCache:
+    """
+    Cache de relatórios de segurança com TTL por secção e evicção por tamanho.
+
+    Quando o tamanho total ultrapassa `max_bytes`, as secções usadas há
+    mais tempo são removidas (LRU) até ficar abaixo de 90% do limite.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttls: Optional[Dict[str, int]] = None, version: Optional[str] = None):
+        """
+        Args:
+            path: Ficheiro SQLite (por omissão, scan_cache.sqlite3 no diretório de cache)
+            max_bytes: Tamanho máximo dos payloads guardados
+            ttls: TTL por secção (por omissão SECTION_TTLS)
+            version: Versão do scanner (por omissão services.security.SCANNER_VERSION)
+        """
+        if version is None:
+            # Import tardio: services.security depende (via CheckSSL) deste pacote
+            from services.security import SCANNER_VERSION
+            version = SCANNER_VERSION
+
+        self.version = version
+        self.path = path or default_cache_dir() / "scan_cache.sqlite3"
+        self.max_bytes = max_bytes
+        self.ttls = ttls or SECTION_TTLS
+        self._lock = threading.Lock()
+        self._conn = connect(self.path)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scan_sections (
+                url_key TEXT NOT NULL,
+                version TEXT NOT NULL,
+                section TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (url_key, version, section)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_scan_sections_access ON scan_sections (last_access)")
+        self._conn.commit()
+
+    def get_sections(self, url: str) -> Dict[str, Any]:
+        """
+        Devolve as secções ainda válidas para o URL.
+
+        Args:
+            url: URL do website (é normalizado)
+
+        Returns:
+            Dict {secção: valor} apenas com secções dentro do TTL
+        """
+        now = time.time()
+        key = normalize_url(url)
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT section, payload FROM scan_sections "
+                "WHERE url_key = ? AND version = ? AND expires_at > ?",
+                (key, self.version, now)
+            ).fetchall()
+            if rows:
+                self._conn.execute(
+                    "UPDATE scan_sections SET last_access = ? WHERE url_key = ? AND version = ?",
+                    (now, key, self.version)
+                )
+                self._conn.commit()
+
+        return {section: decode_section(json.loads(payload)) for section, payload in rows}
+
+    def get_report(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Devolve todas as secções se nenhuma tiver expirado.
+
+        Returns:
+            Dict com todas as secções cacheáveis, ou None se faltar alguma
+        """
+        sections = self.get_sections(url)
+        return sections if self.is_complete(sections) else None
+
+    def is_complete(self, sections: Dict[str, Any], exclude: Iterable[str] = ()) -> bool:
+        """True se `sections` contém todas as secções cacheáveis (exceto `exclude`)"""
+        return all(section in sections for section in self.ttls if section not in exclude)
+
+    def put_report(self, url: str, report: Dict[str, Any]):
+        """
+        Guarda as secções de um final_report.
+
+        Secções vazias e análises LLM falhadas não são guardadas, para que a
+        próxima verificação as volte a tentar. Relatórios de websites que não
+        responderam não devem ser guardados (ver run_security_check).
+
+        Args:
+            url: URL do website (é normalizado)
+            report: final_report do workflow
+        """
+        now = time.time()
+        key = normalize_url(url)
+
+        rows = []
+        for section, ttl in self.ttls.items():
+            value = report.get(section)
+            if not _is_cacheable(section, value):
+                continue
+            payload = json.dumps(value, ensure_ascii=False, default=json_default)
+            rows.append((key, self.version, section, payload, len(payload), now, now + ttl, now))
+
+        if not rows:
+            return
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO scan_sections "
+                "(url_key, version, section, payload, size, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._evict()
+            self._conn.commit()
+
+    def invalidate(self, url: str):
+        """Remove todas as secções de um URL"""
+        with self._lock:
+            self._conn.execute("DELETE FROM scan_sections WHERE url_key = ?", (normalize_url(url),))
+            self._conn.commit()
+
+    def clear(self):
+        """Esvazia a cache"""
+        with self._lock:
+            self._conn.execute("DELETE FROM scan_sections")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Número de URLs, secções e bytes guardados"""
+        with self._lock:
+            urls, sections, size = self._conn.execute(
+                "SELECT COUNT(DISTINCT url_key), COUNT(*), COALESCE(SUM(size), 0) FROM scan_sections"
+            ).fetchone()
+        return {"urls": urls, "sections": sections, "bytes": size, "max_bytes": self.max_bytes}
+
+    def _evict(self):
+        """Remove secções expiradas e, se necessário, as menos usadas (chamar com o lock)"""
+        self._conn.execute("DELETE FROM scan_sections WHERE expires_at <= ?", (time.time(),))
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM scan_sections").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute(
+            "SELECT rowid, size FROM scan_sections ORDER BY last_access ASC"
+        ).fetchall()
+
+        to_delete = []
+        for rowid, size in rows:
+            if total <= target:
+                break
+            to_delete.append((rowid,))
+            total -= size
+
+        self._conn.executemany("DELETE FROM scan_sections WHERE rowid = ?", to_delete)
+
+
+def _is_cacheable(section: str, value: Any) -> bool:
+    if value is None or value == {}:
+        return False
+    # Secções incompletas (ex: caminhos por testar no prazo) repetem-se no próximo scan
+    if isinstance(value, dict) and value.get("partial"):
+        return False
+    if section == "llm_analysis":
+        return bool(value.get("analysis"))
+    return True
+
+
+_scan_cache: Optional[ScanCache] = None
+_scan_cache_lock = threading.Lock()
+
+
+def get_scan_cache() -> ScanCache:
+    """Cache partilhada por todo o processo (criada no primeiro uso)"""
+    global _scan_cache
+    with _scan_cache_lock:
+        if _scan_cache is None:
+            max_mb = int(os.getenv("LEADGEN_SCAN_CACHE_MAX_MB", DEFAULT_MAX_BYTES // (1024 * 1024)))
+            _scan_cache = ScanCache(max_bytes=max_mb * 1024 * 1024)
+        return _scan_cache
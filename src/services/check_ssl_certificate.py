@@ -5,16 +5,24 @@ import socket
 from datetime import datetime
 from urllib.parse import urlparse
 
+from services.cache.cert_cache import get_cert_cache
+from services.deadline import DeadlineExceeded, clamp_timeout
+from services.instrumentation import record_tls_handshake
+
 class CheckSSL:
     
     @staticmethod
-    def verifica_ssl(url, timeout=5):
+    def verifica_ssl(url, timeout=5, usar_cache=True):
         """
         Verifica o certificado SSL de um site através da URL.
         
+        Enquanto o certificado do hostname estiver na cache (e válido), o
+        resultado é servido sem abrir nenhuma ligação.
+        
         Args:
             url (str): URL do site (pode incluir http://, https:// ou apenas o domínio)
             timeout (int): Timeout em segundos para a conexão
+            usar_cache (bool): Consultar/atualizar a cache de certificados
             
         Returns:
             dict: Dicionário com informações do certificado SSL ou erro
@@ -31,29 +39,25 @@ class CheckSSL:
             if ':' in hostname:
                 hostname = hostname.split(':')[0]
             
+            if usar_cache:
+                cached = CheckSSL.obter_da_cache(hostname)
+                if cached:
+                    return cached
+            
             # Criar contexto SSL
             context = ssl.create_default_context()
             
-            # Conectar ao servidor
-            with socket.create_connection((hostname, 443), timeout=timeout) as sock:
+            # Conectar ao servidor (timeout limitado ao prazo do scan, se houver)
+            with socket.create_connection((hostname, 443), timeout=clamp_timeout(timeout)) as sock:
+                record_tls_handshake()
                 with context.wrap_socket(sock, server_hostname=hostname) as ssock:
                     # Obter informações do certificado
                     cert = ssock.getpeercert()
                     
-                    # Processar informações
-                    result = {
-                        'valido': True,
-                        'hostname': hostname,
-                        'emissor': dict(x[0] for x in cert['issuer']),
-                        'assunto': dict(x[0] for x in cert['subject']),
-                        'versao': cert['version'],
-                        'serial_number': cert['serialNumber'],
-                        'valido_de': cert['notBefore'],
-                        'valido_ate': cert['notAfter'],
-                        'dias_restantes': CheckSSL._calcular_dias_restantes(cert['notAfter']),
-                        'san': cert.get('subjectAltName', []),
-                        'protocolo_ssl': ssock.version()
-                    }
+                    result = CheckSSL.processar_certificado(hostname, cert, ssock.version())
+                    
+                    if usar_cache:
+                        CheckSSL.guardar_na_cache(hostname, result)
                     
                     return result
                     
@@ -69,7 +73,7 @@ class CheckSSL:
                 'erro': 'Não foi possível resolver o hostname',
                 'hostname': hostname
             }
-        except socket.timeout:
+        except (socket.timeout, DeadlineExceeded):
             return {
                 'valido': False,
                 'erro': 'Timeout na conexão',
@@ -82,6 +86,51 @@ class CheckSSL:
                 'detalhes': str(e)
             }
     
+    @staticmethod
+    def processar_certificado(hostname, cert, protocolo):
+        """
+        Converte o certificado devolvido por getpeercert() no formato do verifica_ssl.
+        
+        Args:
+            hostname (str): Hostname ao qual o certificado pertence
+            cert (dict): Certificado validado (ssl.SSLSocket.getpeercert())
+            protocolo (str): Versão TLS negociada (ex: 'TLSv1.3')
+            
+        Returns:
+            dict: Informações do certificado SSL
+        """
+        return {
+            'valido': True,
+            'hostname': hostname,
+            'emissor': dict(x[0] for x in cert['issuer']),
+            'assunto': dict(x[0] for x in cert['subject']),
+            'versao': cert['version'],
+            'serial_number': cert['serialNumber'],
+            'valido_de': cert['notBefore'],
+            'valido_ate': cert['notAfter'],
+            'dias_restantes': CheckSSL._calcular_dias_restantes(cert['notAfter']),
+            'san': cert.get('subjectAltName', []),
+            'protocolo_ssl': protocolo
+        }
+    
+    @staticmethod
+    def obter_da_cache(hostname, port=443):
+        """
+        Devolve o certificado em cache do hostname (com dias restantes atualizados)
+        
+        Returns:
+            dict ou None se não houver entrada válida
+        """
+        result = get_cert_cache().get(hostname, port)
+        if result:
+            result['dias_restantes'] = CheckSSL._calcular_dias_restantes(result['valido_ate'])
+        return result
+    
+    @staticmethod
+    def guardar_na_cache(hostname, result, port=443):
+        """Guarda um certificado válido na cache de certificados"""
+        get_cert_cache().put(hostname, port, result)
+    
     @staticmethod
     def _calcular_dias_restantes(data_expiracao):
         """Calcula quantos dias faltam até o certificado expirar"""
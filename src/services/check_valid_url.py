@@ -1,15 +1,19 @@
 
 
 
+from typing import Optional
 from urllib.parse import urlparse
 
 import requests
 
+from services.http_client import HttpClient, get_default_client
 
-def is_valid_url(url):
+
+def is_valid_url(url, http_client: Optional[HttpClient] = None):
     """
     Verifica se o URL é válido e acessível
     """
+    http_client = http_client or get_default_client()
     try:
         # Primeiro verificar o formato básico
         result = urlparse(url)
@@ -21,15 +25,15 @@ def is_valid_url(url):
             return False
             
         # Testar se o URL é acessível (com timeout curto)
-        response = requests.head(url, timeout=20, allow_redirects=True)
+        response = http_client.head(url, timeout=20, allow_redirects=True)
         return response.status_code < 500  # Considerar sucesso se < 400
         
     except requests.exceptions.RequestException:
         # Se der erro de conexão, tentar GET como fallback
         try:
-            response = requests.get(url, timeout=5, allow_redirects=True)
+            response = http_client.get(url, timeout=5, allow_redirects=True)
             return response.status_code < 500
         except:
             return False
     except:
-        return False
\ No newline at end of file
+        return False
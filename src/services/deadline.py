@@ -0,0 +1,101 @@
+"""
+Scan Deadline
+
+Prazo global de um scan, partilhado por todos os checks. O prazo ativo
+fica num contextvar (ver deadline_scope) e é respeitado pelo HttpClient
+e pelo CheckSSL, que reduzem o timeout de cada ligação ao tempo que
+falta; depois de esgotado, novos pedidos falham com DeadlineExceeded.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional, Tuple, Union
+import os
+import time
+import requests
+
+
+Timeout = Union[float, Tuple[float, float], None]
+
+# Prazo global de um scan por omissão (segundos); 0 desativa o limite
+DEFAULT_SCAN_BUDGET = float(os.getenv("LEADGEN_SCAN_BUDGET", "45"))
+
+# Timeout mínimo dado a um pedido quando ainda falta algum tempo
+MIN_TIMEOUT = 0.1
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """O prazo global do scan esgotou (tratado como um timeout pelos checkers)"""
+
+
+class Deadline:
+    """
+    Instante limite (relógio monotónico) para terminar um scan.
+
+    Uso:
+        deadline = Deadline(30)
+        with deadline_scope(deadline):
+            http_client.get(url)      # timeout limitado ao tempo restante
+    """
+
+    def __init__(self, seconds: Optional[float]):
+        """
+        Args:
+            seconds: Duração do prazo (None = sem limite)
+        """
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+
+    def remaining(self) -> Optional[float]:
+        """Segundos que faltam (None se não houver limite)"""
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def clamp(self, timeout: Timeout) -> Timeout:
+        """
+        Limita um timeout (número ou tuplo connect/read do requests) ao tempo restante.
+
+        Raises:
+            DeadlineExceeded: Se o prazo já tiver esgotado
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        if remaining <= 0:
+            raise DeadlineExceeded("Prazo do scan esgotado")
+
+        remaining = max(remaining, MIN_TIMEOUT)
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(min(t, remaining) if t is not None else remaining for t in timeout)
+        return min(timeout, remaining)
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("scan_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Prazo ativo no contexto atual (ou None)"""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """Ativa `deadline` no contexto atual enquanto o bloco corre"""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def clamp_timeout(timeout: Timeout) -> Timeout:
+    """Limita `timeout` ao prazo ativo (sem efeito se não houver prazo)"""
+    deadline = current_deadline()
+    return deadline.clamp(timeout) if deadline else timeout
@@ -0,0 +1,140 @@
+"""
+Pooled HTTP Client
+
+Cliente HTTP partilhado pelos serviços: mantém pools de ligações
+keep-alive por host, para que pedidos seguidos ao mesmo website
+reutilizem a ligação TCP/TLS em vez de repetir o handshake.
+"""
+
+from dataclasses import dataclass
+from http.cookiejar import DefaultCookiePolicy
+from typing import Optional, Union
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from services.deadline import clamp_timeout
+from services.instrumentation import record_bytes, record_error, record_request, record_tls_handshake
+
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (compatible; LeadGenerator-SecurityScanner/1.0)"
+
+
+@dataclass
+class HttpClientConfig:
+    """
+    Configuração do cliente HTTP.
+
+    Attributes:
+        pool_connections: Número de hosts com pool de ligações mantido
+        pool_maxsize: Ligações keep-alive guardadas por host
+        timeout: Timeout por omissão (segundos) quando o pedido não indica outro
+        user_agent: User-Agent enviado em todos os pedidos
+        verify: Verificação de certificados (True, False ou caminho de CA bundle)
+    """
+    pool_connections: int = 100
+    pool_maxsize: int = 10
+    timeout: float = 10
+    user_agent: str = DEFAULT_USER_AGENT
+    verify: Union[bool, str] = True
+
+    @classmethod
+    def from_env(cls) -> "HttpClientConfig":
+        """Lê a configuração das variáveis LEADGEN_HTTP_* (com valores por omissão)"""
+        return cls(
+            pool_connections=int(os.getenv("LEADGEN_HTTP_POOL_CONNECTIONS", cls.pool_connections)),
+            pool_maxsize=int(os.getenv("LEADGEN_HTTP_POOL_MAXSIZE", cls.pool_maxsize)),
+            timeout=float(os.getenv("LEADGEN_HTTP_TIMEOUT", cls.timeout)),
+            user_agent=os.getenv("LEADGEN_HTTP_USER_AGENT", cls.user_agent),
+        )
+
+
+class _InstrumentedHTTPSConnectionPool(HTTPSConnectionPool):
+    """Pool HTTPS que regista cada nova ligação (um handshake TLS completo)"""
+
+    def _new_conn(self):
+        record_tls_handshake()
+        return super()._new_conn()
+
+
+class _InstrumentedAdapter(HTTPAdapter):
+    """HTTPAdapter cujos pools HTTPS contam handshakes TLS"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": HTTPConnectionPool,
+            "https": _InstrumentedHTTPSConnectionPool,
+        }
+
+
+class HttpClient:
+    """
+    Cliente HTTP thread-safe com ligações reutilizáveis.
+
+    Uma única Session é partilhada entre threads: os pools do urllib3 são
+    thread-safe e o cookie jar da sessão está desativado, para que cookies
+    de um website nunca sejam reenviados noutros pedidos (o que também
+    falsearia a análise de cookies).
+    """
+
+    def __init__(self, config: Optional[HttpClientConfig] = None):
+        self.config = config or HttpClientConfig()
+
+        self.session = requests.Session()
+        adapter = _InstrumentedAdapter(
+            pool_connections=self.config.pool_connections,
+            pool_maxsize=self.config.pool_maxsize
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = self.config.user_agent
+        self.session.verify = self.config.verify
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Faz um pedido usando o timeout por omissão se nenhum for indicado.
+
+        Dentro de um deadline_scope o timeout é limitado ao tempo que falta
+        ao scan (DeadlineExceeded se já tiver esgotado). Pedidos, bytes e
+        erros são registados na medição ativa (ver services.instrumentation).
+        """
+        record_request()
+        try:
+            kwargs["timeout"] = clamp_timeout(kwargs.get("timeout", self.config.timeout))
+            response = self.session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            record_error()
+            raise
+
+        # Respostas em stream registam os bytes à medida que são lidas
+        if not kwargs.get("stream"):
+            record_bytes(len(response.content))
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("allow_redirects", True)
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("allow_redirects", False)
+        return self.request("HEAD", url, **kwargs)
+
+    def close(self):
+        """Fecha todas as ligações abertas"""
+        self.session.close()
+
+
+_default_client: Optional[HttpClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> HttpClient:
+    """Cliente partilhado por todo o processo (criado no primeiro uso)"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HttpClient(HttpClientConfig.from_env())
+        return _default_client
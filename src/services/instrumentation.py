@@ -0,0 +1,104 @@
+"""
+Scan Instrumentation
+
+Medições estruturadas de cada node e checker: tempo de relógio, pedidos
+HTTP, bytes descarregados, handshakes TLS e erros.
+
+As medições ativas ficam numa pilha num contextvar: o HttpClient, o
+CheckSSL e o fetch do snapshot chamam record_* e o valor é somado a todas
+as medições da pilha (um node inclui os checkers que executou).
+
+Uso:
+    with measure("check_headers") as m:
+        ...
+    m.as_dict()   # {"wall_ms": ..., "requests": ..., ...}
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Tuple
+import threading
+import time
+
+
+@dataclass
+class Measurement:
+    """Contadores de uma secção medida (node ou checker)"""
+    name: str
+    wall_ms: float = 0.0
+    requests: int = 0
+    bytes: int = 0
+    tls_handshakes: int = 0
+    errors: int = 0
+    children: Dict[str, "Measurement"] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, counter: str, amount: int = 1):
+        # Os checkers podem registar a partir de várias threads (ex: PathProber)
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Representação serializável (incluída no final_report)"""
+        data = {
+            "wall_ms": round(self.wall_ms, 1),
+            "requests": self.requests,
+            "bytes": self.bytes,
+            "tls_handshakes": self.tls_handshakes,
+            "errors": self.errors,
+        }
+        if self.children:
+            data["checkers"] = {name: child.as_dict() for name, child in self.children.items()}
+        return data
+
+
+_active: ContextVar[Tuple[Measurement, ...]] = ContextVar("scan_measurements", default=())
+
+
+@contextmanager
+def measure(name: str) -> Iterator[Measurement]:
+    """
+    Mede o bloco: tempo de relógio e todos os record_* feitos no contexto.
+
+    Uma medição aberta dentro de outra fica registada em `children` da
+    medição exterior.
+    """
+    stack = _active.get()
+    measurement = Measurement(name)
+    if stack:
+        stack[-1].children[name] = measurement
+
+    token = _active.set(stack + (measurement,))
+    started = time.perf_counter()
+    try:
+        yield measurement
+    finally:
+        measurement.wall_ms = (time.perf_counter() - started) * 1000
+        _active.reset(token)
+
+
+def _record(counter: str, amount: int = 1):
+    for measurement in _active.get():
+        measurement.add(counter, amount)
+
+
+def record_request():
+    """Um pedido HTTP enviado"""
+    _record("requests")
+
+
+def record_bytes(amount: int):
+    """Bytes de corpo de resposta descarregados"""
+    if amount:
+        _record("bytes", amount)
+
+
+def record_tls_handshake():
+    """Uma nova ligação TLS (handshake completo)"""
+    _record("tls_handshakes")
+
+
+def record_error():
+    """Um erro de rede ou uma exceção num checker"""
+    _record("errors")
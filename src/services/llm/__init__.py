@@ -0,0 +1,33 @@
+"""
+Serviços partilhados pelos agentes LLM
+
+Clientes LLM partilhados (perfis de config_llm.yaml), contagem de
+tokens, orçamento dos prompts, rate limiting (RPM/TPM), repetição de
+pedidos recusados por excesso de pedidos e o event loop onde correm as
+chamadas assíncronas.
+"""
+
+from .budget import get_prompt_budget, record_usage, token_usage
+from .clients import LLMProfile, LLMRegistry, get_llm, get_llm_registry
+from .event_loop import LLMEventLoop, get_llm_loop, run_async
+from .rate_limit import RateLimiter, acall_with_retry, call_with_retry, get_rate_limiter
+from .tokens import count_tokens, truncate_text
+
+__all__ = [
+    'LLMEventLoop',
+    'LLMProfile',
+    'LLMRegistry',
+    'RateLimiter',
+    'acall_with_retry',
+    'call_with_retry',
+    'count_tokens',
+    'get_llm',
+    'get_llm_loop',
+    'get_llm_registry',
+    'get_prompt_budget',
+    'get_rate_limiter',
+    'record_usage',
+    'run_async',
+    'token_usage',
+    'truncate_text',
+]
@@ -0,0 +1,111 @@
+"""
+Prompt Budget
+
+Orçamento de tokens de cada agente: quantos tokens pode ocupar cada
+variável do prompt (descrições, dados de segurança...). Os textos são
+cortados numa frase ou palavra completa antes de preencher o template;
+o SecurityAnalysisAgent usa o orçamento para escolher os findings mais
+graves (ver _format_security_data).
+
+Regista também os tokens de entrada e de saída de cada chamada, por
+agente (token_usage).
+
+Os orçamentos por omissão podem ser alterados com LEADGEN_PROMPT_BUDGETS
+(ex: "SecurityAnalysisAgent.security_data=1500,NeedsAgent.descricao=300").
+"""
+
+from typing import Any, Dict, Mapping, Optional
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Agente -> {variável do prompt: tokens máximos}. Só texto livre: URLs e
+# nomes de setores cortados com "…" deixam de ser válidos para o modelo
+DEFAULT_BUDGETS: Dict[str, Dict[str, int]] = {
+    "CategorizationAgent": {"descricao": 250},
+    "NeedsAgent": {"descricao": 400},
+    "ClassificationAgent": {"necessidades": 400},
+    "SecurityAnalysisAgent": {"security_data": 900},
+}
+
+
+def parse_budgets(spec: str, base: Optional[Mapping[str, Mapping[str, int]]] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Lê orçamentos no formato "Agente.variável=tokens,..."
+
+    Args:
+        spec: Ex: "SecurityAnalysisAgent.security_data=1500" (vazio = base)
+        base: Orçamentos que não são alterados (por omissão DEFAULT_BUDGETS)
+
+    Returns:
+        Orçamentos com as variáveis indicadas substituídas
+
+    Raises:
+        ValueError: Entrada mal formada
+    """
+    budgets = {agent: dict(fields) for agent, fields in (base or DEFAULT_BUDGETS).items()}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        agent, _, field = name.strip().partition(".")
+        try:
+            tokens = int(value)
+        except ValueError:
+            raise ValueError(f"Orçamento inválido para {name.strip()!r}: {value!r}") from None
+        if not agent or not field:
+            raise ValueError(f"Orçamento sem agente ou variável: {item!r} (formato Agente.variável=tokens)")
+        budgets.setdefault(agent, {})[field] = tokens
+    return budgets
+
+
+_budgets: Optional[Dict[str, Dict[str, int]]] = None
+_budgets_lock = threading.Lock()
+
+
+def get_prompt_budget(agent: str) -> Dict[str, int]:
+    """
+    Orçamento de um agente (com as alterações de LEADGEN_PROMPT_BUDGETS)
+
+    Returns:
+        {variável do prompt: tokens máximos} ({} = sem limites)
+    """
+    global _budgets
+    with _budgets_lock:
+        if _budgets is None:
+            try:
+                _budgets = parse_budgets(os.getenv("LEADGEN_PROMPT_BUDGETS", ""))
+            except ValueError as e:
+                logger.warning(f"LEADGEN_PROMPT_BUDGETS ignorado: {e}")
+                _budgets = parse_budgets("")
+        return dict(_budgets.get(agent, {}))
+
+
+_usage: Dict[str, Dict[str, int]] = {}
+_usage_lock = threading.Lock()
+
+
+def record_usage(agent: str, prompt_tokens: int, completion_tokens: int):
+    """
+    Soma os tokens de uma chamada ao total do agente e regista-os no log
+
+    Args:
+        agent: Nome do agente
+        prompt_tokens: Tokens de entrada
+        completion_tokens: Tokens da resposta
+    """
+    logger.info(f"{agent}: {prompt_tokens} tokens in, {completion_tokens} tokens out")
+    with _usage_lock:
+        totals = _usage.setdefault(agent, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+        totals["calls"] += 1
+        totals["prompt_tokens"] += prompt_tokens
+        totals["completion_tokens"] += completion_tokens
+
+
+def token_usage() -> Dict[str, Any]:
+    """Chamadas e tokens desde o arranque, por agente e no total"""
+    with _usage_lock:
+        agents = {agent: dict(totals) for agent, totals in _usage.items()}
+    total = {key: sum(totals[key] for totals in agents.values())
+             for key in ("calls", "prompt_tokens", "completion_tokens")}
+    return {"agents": agents, **total}
@@ -0,0 +1,263 @@
+"""
+LLM Clients
+
+Registo único dos modelos do processo. Os perfis vêm de config_llm.yaml
+(na raiz do projeto, ou LEADGEN_LLM_CONFIG): a secção `llm` define o
+modelo e a temperatura base e cada perfil em `agents` (default, creative,
+precise, ...) altera só o que precisa. Cada agente escolhe um perfil
+(BaseAgent.LLM_PROFILE), que a secção opcional `routes` pode trocar por
+agente, por exemplo para mandar a categorização para um modelo mais rápido.
+
+Os clientes ChatOpenAI são criados uma vez por configuração (modelo,
+temperatura, ...) e reutilizados; todos partilham o mesmo pool de ligações
+HTTP (LEADGEN_LLM_MAX_CONNECTIONS), um para os pedidos síncronos e outro
+para os assíncronos (ainvoke). As ligações assíncronas pertencem ao event
+loop onde foram abertas, por isso o caminho assíncrono corre sempre no
+loop partilhado de event_loop (run_async). close()/aclose() são para o fim do processo:
+os agentes continuam a usar os clientes que já receberam.
+"""
+
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+CONFIG_PATH = Path(__file__).resolve().parents[3] / "config_llm.yaml"
+
+DEFAULT_PROFILE = "default"
+DEFAULT_MAX_CONNECTIONS = 20
+
+# Usado quando config_llm.yaml não existe ou não pode ser lido
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "llm": {"model": "gpt-3.5-turbo", "temperature": 0.7},
+    "agents": {
+        "default": {"temperature": 0.7},
+        "creative": {"temperature": 0.9},
+        "precise": {"temperature": 0.3},
+    },
+}
+
+
+@dataclass(frozen=True)
+class LLMProfile:
+    """Configuração de um modelo (as instâncias iguais partilham o cliente)"""
+    name: str
+    model: str
+    temperature: float
+    max_tokens: Optional[int] = None
+    timeout: Optional[float] = None
+
+    def key(self) -> Tuple[Any, ...]:
+        return self.model, self.temperature, self.max_tokens, self.timeout
+
+
+def load_llm_config(path: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Lê config_llm.yaml
+
+    Args:
+        path: Ficheiro a ler (por omissão LEADGEN_LLM_CONFIG ou CONFIG_PATH)
+
+    Returns:
+        Configuração com as secções llm, agents e routes (DEFAULT_CONFIG se
+        o ficheiro não existir ou for inválido)
+    """
+    path = Path(path or os.getenv("LEADGEN_LLM_CONFIG") or CONFIG_PATH)
+    if not path.exists():
+        logger.warning(f"{path} não encontrado, a usar a configuração LLM por omissão")
+        return DEFAULT_CONFIG
+    try:
+        import yaml
+        with open(path, encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+    except Exception as e:
+        logger.warning(f"Não foi possível ler {path}, a usar a configuração LLM por omissão: {e}")
+        return DEFAULT_CONFIG
+    if not isinstance(config, dict):
+        logger.warning(f"{path} inválido, a usar a configuração LLM por omissão")
+        return DEFAULT_CONFIG
+    return config
+
+
+def parse_profiles(config: Dict[str, Any]) -> Dict[str, LLMProfile]:
+    """
+    Perfis da configuração (cada perfil herda a secção llm)
+
+    Args:
+        config: Resultado de load_llm_config
+
+    Returns:
+        {nome: LLMProfile}, sempre com o perfil default
+    """
+    base = {**DEFAULT_CONFIG["llm"], **(config.get("llm") or {})}
+    sections = dict(config.get("agents") or {})
+    sections.setdefault(DEFAULT_PROFILE, {})
+
+    profiles = {}
+    for name, section in sections.items():
+        values = {**base, **(section or {})}
+        try:
+            profiles[name] = LLMProfile(
+                name=name,
+                model=str(values["model"]),
+                temperature=float(values["temperature"]),
+                max_tokens=int(values["max_tokens"]) if values.get("max_tokens") else None,
+                timeout=float(values["timeout"]) if values.get("timeout") else None,
+            )
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Perfil LLM '{name}' inválido, ignorado: {e}")
+    if DEFAULT_PROFILE not in profiles:
+        profiles[DEFAULT_PROFILE] = LLMProfile(DEFAULT_PROFILE, DEFAULT_CONFIG["llm"]["model"],
+                                               DEFAULT_CONFIG["llm"]["temperature"])
+    return profiles
+
+
+class LLMRegistry:
+    """Perfis de config_llm.yaml e clientes ChatOpenAI reutilizados (thread-safe)"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS):
+        """
+        Args:
+            config: Configuração (por omissão load_llm_config())
+            max_connections: Ligações HTTP abertas em simultâneo, somando todos os clientes
+        """
+        config = load_llm_config() if config is None else config
+        self.profiles = parse_profiles(config)
+        self.routes: Dict[str, str] = {str(agent): str(profile)
+                                       for agent, profile in (config.get("routes") or {}).items()}
+        self.max_connections = max(max_connections, 1)
+
+        self._clients: Dict[Tuple[Any, ...], Any] = {}
+        self._http_client = None
+        self._http_async_client = None
+        self._lock = threading.Lock()
+
+    def profile(self, name: str = DEFAULT_PROFILE) -> LLMProfile:
+        """Perfil pelo nome (o default, com um aviso, se não existir)"""
+        profile = self.profiles.get(name)
+        if profile is None:
+            logger.warning(f"Perfil LLM '{name}' não existe em config_llm.yaml, a usar '{DEFAULT_PROFILE}'")
+            profile = self.profiles[DEFAULT_PROFILE]
+        return profile
+
+    def profile_for(self, agent: str, profile: str = DEFAULT_PROFILE) -> LLMProfile:
+        """
+        Perfil de um agente
+
+        Args:
+            agent: Nome do agente (ex: "CategorizationAgent")
+            profile: Perfil escolhido pelo agente
+
+        Returns:
+            O perfil de `routes` para este agente, se existir, ou `profile`
+        """
+        return self.profile(self.routes.get(agent, profile))
+
+    def get(self, profile: str = DEFAULT_PROFILE, temperature: Optional[float] = None,
+            agent: Optional[str] = None):
+        """
+        Cliente ChatOpenAI de um perfil (criado no primeiro uso e depois reutilizado)
+
+        Args:
+            profile: Nome do perfil em config_llm.yaml
+            temperature: Substitui a temperatura do perfil
+            agent: Nome do agente, para aplicar `routes`
+
+        Returns:
+            ChatOpenAI partilhado por todos os pedidos com a mesma configuração
+        """
+        config = self.profile_for(agent, profile) if agent else self.profile(profile)
+        if temperature is not None:
+            config = replace(config, temperature=float(temperature))
+
+        key = config.key()
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._create(config)
+                self._clients[key] = client
+            return client
+
+    def close(self):
+        """Fecha o pool síncrono e esquece os clientes (o assíncrono fecha-se com aclose)"""
+        with self._lock:
+            if self._http_client is not None:
+                self._http_client.close()
+            self._http_client = None
+            self._http_async_client = None
+            self._clients.clear()
+
+    async def aclose(self):
+        """Fecha os dois pools de ligações e esquece os clientes"""
+        with self._lock:
+            async_client = self._http_async_client
+            self._http_async_client = None
+        if async_client is not None:
+            await async_client.aclose()
+        self.close()
+
+    def _create(self, config: LLMProfile):
+        """Novo ChatOpenAI com o pool partilhado (chamar com o lock)"""
+        from langchain_openai import ChatOpenAI
+
+        options: Dict[str, Any] = {}
+        if config.max_tokens:
+            options["max_tokens"] = config.max_tokens
+        if config.timeout:
+            options["timeout"] = config.timeout
+        return ChatOpenAI(
+            model=config.model,
+            temperature=config.temperature,
+            api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=self._shared_http_client(),
+            http_async_client=self._shared_http_async_client(),
+            **options,
+        )
+
+    def _shared_http_client(self):
+        """Cliente httpx dos pedidos síncronos, comum a todos os modelos (chamar com o lock)"""
+        if self._http_client is None:
+            import httpx
+            self._http_client = httpx.Client(**self._http_options())
+        return self._http_client
+
+    def _shared_http_async_client(self):
+        """Cliente httpx dos pedidos assíncronos, comum a todos os modelos (chamar com o lock)"""
+        if self._http_async_client is None:
+            import httpx
+            self._http_async_client = httpx.AsyncClient(**self._http_options())
+        return self._http_async_client
+
+    def _http_options(self) -> Dict[str, Any]:
+        """Limites do pool e timeouts, iguais nos dois clientes httpx"""
+        import httpx
+        return {
+            "limits": httpx.Limits(max_connections=self.max_connections,
+                                   max_keepalive_connections=self.max_connections),
+            "timeout": httpx.Timeout(60.0, connect=10.0),
+        }
+
+
+_registry: Optional[LLMRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_llm_registry() -> LLMRegistry:
+    """Registo partilhado por todo o processo (lê config_llm.yaml no primeiro uso)"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = LLMRegistry(
+                max_connections=int(os.getenv("LEADGEN_LLM_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)),
+            )
+        return _registry
+
+
+def get_llm(profile: str = DEFAULT_PROFILE, temperature: Optional[float] = None, agent: Optional[str] = None):
+    """Atalho para get_llm_registry().get (ver LLMRegistry.get)"""
+    return get_llm_registry().get(profile, temperature, agent)
@@ -0,0 +1,75 @@
+"""
+LLM Event Loop
+
+Event loop de longa duração, numa thread própria, onde correm todas as
+chamadas assíncronas aos modelos (ainvoke, BaseAgent.abatch). O cliente
+httpx assíncrono partilhado (ver clients) fica ligado ao loop onde abriu
+as ligações, por isso todo o caminho assíncrono usa este único loop; o
+código síncrono (threads do CLI, jobs, Streamlit) entrega-lhe as
+corrotinas com run_async e espera pelo resultado.
+"""
+
+from typing import Awaitable, Optional, TypeVar
+import asyncio
+import concurrent.futures
+import threading
+
+T = TypeVar("T")
+
+
+class LLMEventLoop:
+    """Event loop a correr numa thread daemon (partilhado pelo processo)"""
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-loop", daemon=True)
+        self._thread.start()
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """
+        Executa uma corrotina no loop e espera pelo resultado (bloqueia a thread)
+
+        Args:
+            coro: Corrotina a executar
+            timeout: Segundos máximos de espera (None = sem limite); ao fim
+                do prazo a corrotina é cancelada
+
+        Returns:
+            Resultado da corrotina
+
+        Raises:
+            RuntimeError: Se for chamado de dentro do próprio loop (usar await)
+        """
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("run_async chamado dentro do event loop LLM: usar await")
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def close(self):
+        """Pára o loop (as corrotinas ainda pendentes são abandonadas)"""
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+_llm_loop: Optional[LLMEventLoop] = None
+_llm_loop_lock = threading.Lock()
+
+
+def get_llm_loop() -> LLMEventLoop:
+    """Loop partilhado por todo o processo (criado no primeiro uso)"""
+    global _llm_loop
+    with _llm_loop_lock:
+        if _llm_loop is None:
+            _llm_loop = LLMEventLoop()
+        return _llm_loop
+
+
+def run_async(coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """Atalho para get_llm_loop().run (ver LLMEventLoop.run)"""
+    return get_llm_loop().run(coro, timeout)
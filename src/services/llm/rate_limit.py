@@ -0,0 +1,210 @@
+"""
+Rate Limiting
+
+Limita os pedidos a todos os modelos do processo a pedidos por minuto
+(RPM) e tokens por minuto (TPM), com dois token buckets partilhados por
+threads e corrotinas. Cada pedido reserva um pedido e a estimativa dos
+seus tokens (prompt + resposta máxima); quando a resposta chega, a
+reserva é acertada com os tokens realmente usados.
+
+Erros de rate limit (HTTP 429) são repetidos com backoff exponencial e
+jitter, para que os pedidos recusados não voltem todos ao mesmo tempo.
+
+Configuração: LEADGEN_LLM_RPM, LEADGEN_LLM_TPM e LEADGEN_LLM_MAX_RETRIES.
+"""
+
+from typing import Awaitable, Callable, Optional, Tuple, TypeVar
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_RPM = 3_500
+DEFAULT_TPM = 200_000
+DEFAULT_MAX_RETRIES = 5
+
+# Os buckets enchem até ao equivalente a BURST_SECONDS de pedidos/tokens
+BURST_SECONDS = 10
+
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+
+class RateLimiter:
+    """Token buckets de pedidos e de tokens por minuto (thread-safe)"""
+
+    def __init__(self, rpm: float = DEFAULT_RPM, tpm: float = DEFAULT_TPM, burst_seconds: float = BURST_SECONDS):
+        """
+        Args:
+            rpm: Pedidos por minuto
+            tpm: Tokens por minuto (prompt + resposta)
+            burst_seconds: Segundos de folga que podem ser gastos de uma vez
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self._request_rate = rpm / 60
+        self._token_rate = tpm / 60
+        self._request_capacity = max(self._request_rate * burst_seconds, 1)
+        self._token_capacity = max(self._token_rate * burst_seconds, 1)
+
+        self._requests = self._request_capacity
+        self._tokens = self._token_capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int) -> int:
+        """
+        Espera (a bloquear a thread) até haver margem para um pedido de `tokens`
+
+        Returns:
+            Tokens realmente reservados (a passar a settle)
+        """
+        reserved, delay = self._reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return reserved
+
+    async def aacquire(self, tokens: int) -> int:
+        """Versão assíncrona de acquire (não bloqueia o event loop)"""
+        reserved, delay = self._reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return reserved
+
+    def settle(self, reserved: int, used: Optional[int]):
+        """
+        Acerta uma reserva com os tokens realmente usados
+
+        Args:
+            reserved: Tokens reservados (devolvidos por acquire)
+            used: Tokens reportados pela API (None = manter a reserva)
+        """
+        if used is None:
+            return
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens + reserved - used, self._token_capacity)
+
+    def _reserve(self, tokens: int) -> Tuple[int, float]:
+        """
+        Reserva já o pedido (os buckets podem ficar negativos) e devolve
+        quanto tempo é preciso esperar até a reserva estar coberta; assim
+        os pedidos são servidos por ordem de chegada.
+
+        Pedidos maiores do que o bucket só reservam a capacidade (senão
+        nunca passariam).
+
+        Returns:
+            (tokens reservados, segundos a esperar)
+        """
+        reserved = int(min(tokens, self._token_capacity))
+        with self._lock:
+            self._refill()
+            self._requests -= 1
+            self._tokens -= reserved
+            return reserved, max(0.0, -self._requests / self._request_rate, -self._tokens / self._token_rate)
+
+    def _refill(self):
+        """Repõe os buckets pelo tempo decorrido (chamar com o lock)"""
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self._requests + elapsed * self._request_rate, self._request_capacity)
+        self._tokens = min(self._tokens + elapsed * self._token_rate, self._token_capacity)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """True para erros HTTP 429 (openai.RateLimitError e semelhantes)"""
+    if type(error).__name__ == "RateLimitError":
+        return True
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429
+
+
+def backoff_delay(attempt: int, error: Optional[BaseException] = None) -> float:
+    """
+    Espera antes da tentativa seguinte: backoff exponencial com jitter
+    total, nunca abaixo do Retry-After indicado pela API
+
+    Args:
+        attempt: Número da tentativa falhada (0 = primeira)
+        error: Erro recebido (para ler o header Retry-After)
+
+    Returns:
+        Segundos a esperar
+    """
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        retry_after = float(headers.get("retry-after", 0))
+    except (TypeError, ValueError):
+        retry_after = 0.0
+    return max(delay, min(retry_after, BACKOFF_MAX))
+
+
+def call_with_retry(call: Callable[[], T], max_retries: Optional[int] = None,
+                    can_retry: Optional[Callable[[], bool]] = None) -> T:
+    """
+    Executa `call`, repetindo-a em erros de rate limit
+
+    Args:
+        call: Função sem argumentos que faz o pedido
+        max_retries: Repetições (por omissão LEADGEN_LLM_MAX_RETRIES)
+        can_retry: Consultada depois de cada falha; False impede novas
+            tentativas (ex: um stream que já entregou texto)
+
+    Returns:
+        Resultado de `call`
+    """
+    retries = _max_retries() if max_retries is None else max_retries
+    for attempt in range(retries + 1):
+        try:
+            return call()
+        except Exception as e:
+            if attempt >= retries or not is_rate_limit_error(e) or (can_retry is not None and not can_retry()):
+                raise
+            delay = backoff_delay(attempt, e)
+            logger.warning(f"Rate limit (tentativa {attempt + 1}/{retries}), nova tentativa em {delay:.1f}s")
+            time.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+async def acall_with_retry(call: Callable[[], Awaitable[T]], max_retries: Optional[int] = None) -> T:
+    """Versão assíncrona de call_with_retry (`call` devolve uma corrotina nova a cada tentativa)"""
+    retries = _max_retries() if max_retries is None else max_retries
+    for attempt in range(retries + 1):
+        try:
+            return await call()
+        except Exception as e:
+            if attempt >= retries or not is_rate_limit_error(e):
+                raise
+            delay = backoff_delay(attempt, e)
+            logger.warning(f"Rate limit (tentativa {attempt + 1}/{retries}), nova tentativa em {delay:.1f}s")
+            await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+def _max_retries() -> int:
+    return int(os.getenv("LEADGEN_LLM_MAX_RETRIES", DEFAULT_MAX_RETRIES))
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Limitador partilhado por todo o processo (criado no primeiro uso)"""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter(
+                rpm=float(os.getenv("LEADGEN_LLM_RPM", DEFAULT_RPM)),
+                tpm=float(os.getenv("LEADGEN_LLM_TPM", DEFAULT_TPM)),
+            )
+        return _rate_limiter
@@ -0,0 +1,82 @@
+"""
+Token Counting
+
+Conta tokens com o tokenizer do modelo (tiktoken). Se o encoding não
+estiver disponível (ex: sem rede para o descarregar na primeira
+utilização), usa uma estimativa de ~4 caracteres por token.
+"""
+
+from functools import lru_cache
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+
+# Estimativa usada quando não há tokenizer (por excesso, para texto em português)
+CHARS_PER_TOKEN = 3.5
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    """Encoding tiktoken do modelo (None se não for possível carregá-lo)"""
+    try:
+        import tiktoken
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"Tokenizer indisponível para {model}, a usar estimativa: {e}")
+        return None
+
+
+def count_tokens(text: Optional[str], model: str = DEFAULT_MODEL) -> int:
+    """
+    Número de tokens de um texto
+
+    Args:
+        text: Texto a contar
+        model: Modelo cujo tokenizer deve ser usado
+
+    Returns:
+        Número de tokens (exato com tiktoken, estimado sem ele)
+    """
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is None:
+        return int(len(text) / CHARS_PER_TOKEN) + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_text(text: Optional[str], max_tokens: int, model: str = DEFAULT_MODEL) -> str:
+    """
+    Corta um texto para caber em `max_tokens`, terminando numa frase ou palavra
+
+    Args:
+        text: Texto a cortar
+        max_tokens: Tokens máximos (incluindo a reticência final)
+        model: Modelo cujo tokenizer deve ser usado
+
+    Returns:
+        O texto original se couber; senão o início até à última frase (ou
+        palavra) completa, seguido de "…"
+    """
+    text = text or ""
+    if max_tokens <= 0 or count_tokens(text, model) <= max_tokens:
+        return text
+
+    encoding = _encoding(model)
+    if encoding is None:
+        cut = text[:int((max_tokens - 1) * CHARS_PER_TOKEN)]
+    else:
+        cut = encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens - 1])
+
+    sentence_end = max(cut.rfind(mark) for mark in (". ", "! ", "? ", "\n"))
+    if sentence_end >= len(cut) * 0.6:
+        cut = cut[:sentence_end + 1]
+    elif " " in cut:
+        cut = cut[:cut.rfind(" ")]
+    return cut.rstrip(" ,;:-\n") + "…"
@@ -0,0 +1,229 @@
+"""
+Result Writers
+
+Escrita incremental dos resultados de um processamento em bulk (ver
+src/cli.py), para que um job interrompido possa ser retomado: cada
+registo tem uma chave (`row`, o índice da linha no dataset de entrada) e
+`completed_keys()` devolve as chaves que já estão no ficheiro.
+
+Formatos:
+- CSV / JSONL: um registo por linha, acrescentado e escrito logo a seguir
+- Parquet: diretório com ficheiros part-NNNNN.parquet, escritos de
+  `flush_every` em `flush_every` registos (cada ficheiro é escrito num
+  temporário e renomeado, nunca fica meio escrito)
+
+Se uma linha for reprocessada (ex: --retry-errors), o registo mais
+recente é o válido.
+"""
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+import json
+import os
+
+import pandas as pd
+
+
+KEY_COLUMN = "row"
+
+FORMATS = ("csv", "jsonl", "parquet")
+
+
+class ResultWriter(ABC):
+    """Destino incremental de registos (dicts com as mesmas colunas)"""
+
+    def __init__(self, path: Path, columns: List[str]):
+        """
+        Args:
+            path: Ficheiro (ou diretório, no caso do Parquet) de saída
+            columns: Colunas de cada registo, pela ordem de escrita
+        """
+        self.path = Path(path)
+        self.columns = columns
+
+    @abstractmethod
+    def read_existing(self) -> pd.DataFrame:
+        """Registos já escritos (DataFrame vazio se ainda não existirem)"""
+
+    @abstractmethod
+    def write(self, record: Dict[str, Any]):
+        """Acrescenta um registo"""
+
+    def flush(self):
+        """Garante que os registos pendentes estão no disco"""
+
+    def close(self):
+        self.flush()
+
+    def completed_keys(self, skip_errors: bool = False) -> Set[Any]:
+        """
+        Chaves das linhas já processadas.
+
+        Args:
+            skip_errors: Não contar linhas cujo registo mais recente tem erro
+                (para voltarem a ser processadas)
+        """
+        existing = self.read_existing()
+        if existing.empty or KEY_COLUMN not in existing.columns:
+            return set()
+
+        latest = existing.drop_duplicates(KEY_COLUMN, keep="last")
+        if skip_errors and "error" in latest.columns:
+            errors = latest["error"].fillna("").astype(str).str.strip()
+            latest = latest[errors == ""]
+        return set(latest[KEY_COLUMN].tolist())
+
+    def _record_row(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        return {column: record.get(column) for column in self.columns}
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CsvResultWriter(ResultWriter):
+    """CSV com cabeçalho, um registo por linha"""
+
+    def read_existing(self) -> pd.DataFrame:
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return pd.DataFrame(columns=self.columns)
+
+        _truncate_partial_line(self.path)
+        existing = pd.read_csv(self.path)
+        if list(existing.columns) != self.columns:
+            raise ValueError(
+                f"O ficheiro {self.path} tem colunas diferentes das desta execução "
+                f"(outras tarefas?): usar --overwrite ou outro ficheiro de saída"
+            )
+        return existing
+
+    def write(self, record: Dict[str, Any]):
+        header = not self.path.exists() or self.path.stat().st_size == 0
+        pd.DataFrame([self._record_row(record)], columns=self.columns).to_csv(
+            self.path, mode="a", header=header, index=False
+        )
+
+
+class JsonlResultWriter(ResultWriter):
+    """JSON Lines (um objeto por linha)"""
+
+    def read_existing(self) -> pd.DataFrame:
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return pd.DataFrame(columns=self.columns)
+
+        _truncate_partial_line(self.path)
+        with self.path.open(encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        return pd.DataFrame(records, columns=self.columns)
+
+    def write(self, record: Dict[str, Any]):
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(self._record_row(record), ensure_ascii=False, default=str) + "\n")
+
+
+class ParquetResultWriter(ResultWriter):
+    """Diretório de ficheiros Parquet (lido como um único dataset pelo pandas)"""
+
+    def __init__(self, path: Path, columns: List[str], flush_every: int = 100):
+        """
+        Args:
+            path: Diretório de saída (ex: resultados.parquet/)
+            columns: Colunas de cada registo
+            flush_every: Registos por ficheiro part-NNNNN.parquet
+        """
+        super().__init__(path, columns)
+        self.flush_every = max(flush_every, 1)
+        self._buffer: List[Dict[str, Any]] = []
+
+    def _parts(self) -> List[Path]:
+        return sorted(self.path.glob("part-*.parquet")) if self.path.is_dir() else []
+
+    def read_existing(self) -> pd.DataFrame:
+        parts = self._parts()
+        if not parts:
+            return pd.DataFrame(columns=self.columns)
+        return pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+
+    def write(self, record: Dict[str, Any]):
+        self._buffer.append(self._record_row(record))
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        parts = self._parts()
+        number = int(parts[-1].stem.split("-")[1]) + 1 if parts else 0
+        target = self.path / f"part-{number:05d}.parquet"
+        temporary = target.with_suffix(".parquet.tmp")
+
+        pd.DataFrame(self._buffer, columns=self.columns).astype({KEY_COLUMN: "int64"}).to_parquet(
+            temporary, index=False
+        )
+        os.replace(temporary, target)
+        self._buffer.clear()
+
+
+def infer_format(path: Path) -> str:
+    """Formato de saída a partir da extensão (csv, jsonl/ndjson, parquet)"""
+    suffix = Path(path).suffix.lower().lstrip(".")
+    if suffix == "ndjson":
+        return "jsonl"
+    if suffix not in FORMATS:
+        raise ValueError(f"Formato de saída não reconhecido: '{path}' (usar {', '.join(FORMATS)})")
+    return suffix
+
+
+def open_result_writer(path: Path, columns: List[str], fmt: Optional[str] = None,
+                       overwrite: bool = False, flush_every: int = 100) -> ResultWriter:
+    """
+    Cria o writer para `path`.
+
+    Args:
+        path: Ficheiro (CSV/JSONL) ou diretório (Parquet) de saída
+        columns: Colunas de cada registo
+        fmt: Formato ("csv", "jsonl", "parquet"); por omissão pela extensão
+        overwrite: Apagar resultados anteriores em vez de os retomar
+        flush_every: Registos por ficheiro (só Parquet)
+
+    Returns:
+        ResultWriter pronto a usar
+    """
+    path = Path(path)
+    fmt = fmt or infer_format(path)
+
+    if fmt == "parquet":
+        writer = ParquetResultWriter(path, columns, flush_every=flush_every)
+        if overwrite:
+            for part in writer._parts():
+                part.unlink()
+        return writer
+
+    if overwrite and path.exists():
+        path.unlink()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return CsvResultWriter(path, columns) if fmt == "csv" else JsonlResultWriter(path, columns)
+
+
+def _truncate_partial_line(path: Path):
+    """Remove uma última linha incompleta (processo interrompido a meio da escrita)"""
+    with path.open("rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(position - 65536, 0)
+            f.seek(start)
+            chunk = f.read(position - start)
+            if position == end and chunk.endswith(b"\n"):
+                return
+            newline = chunk.rfind(b"\n")
+            if newline >= 0:
+                f.truncate(start + newline + 1)
+                return
+            position = start
+        f.truncate(0)
@@ -0,0 +1,174 @@
+"""
+Risk Scoring
+
+Score de risco (0-100), nível e ranking das leads a partir do número de
+findings por categoria. O mesmo cálculo serve um relatório isolado
+(score_counts) e a tabela de resultados de um batch (score_table): aí as
+contagens são colunas e os scores de todos os websites são calculados de
+uma só vez com numpy. Mudar os pesos só exige voltar a pontuar a tabela,
+sem repetir nenhum scan.
+
+Os pesos por omissão podem ser alterados com LEADGEN_RISK_WEIGHTS
+(ex: "critical_exposed=25:50,cookie_issues=1").
+"""
+
+from dataclasses import dataclass, fields, replace
+from typing import Any, Dict, Mapping, Optional, Tuple
+import os
+
+import numpy as np
+import pandas as pd
+
+from domain.findings import Severity, count, findings
+
+
+# Colunas com as contagens de findings (mesma ordem que os campos de RiskWeights)
+COUNT_COLUMNS = ("vulnerabilities", "critical_exposed", "ssl_issues", "cookie_issues")
+
+# Score mínimo de cada nível (do mais grave para o menos grave)
+RISK_LEVELS = (
+    (80, "CRITICAL"),
+    (60, "HIGH"),
+    (30, "MEDIUM"),
+    (1, "LOW"),
+)
+MIN_RISK_LEVEL = "VERY LOW"
+UNREACHABLE_LEVEL = "UNREACHABLE"
+MAX_SCORE = 100
+
+
+@dataclass(frozen=True)
+class CategoryWeight:
+    """Pontos por finding e máximo de pontos de uma categoria"""
+    points: float
+    cap: float
+
+
+@dataclass(frozen=True)
+class RiskWeights:
+    """Pesos do score de risco por categoria"""
+    vulnerabilities: CategoryWeight = CategoryWeight(5, 30)
+    critical_exposed: CategoryWeight = CategoryWeight(20, 40)
+    ssl_issues: CategoryWeight = CategoryWeight(10, 20)
+    cookie_issues: CategoryWeight = CategoryWeight(2, 10)
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(pontos, máximos) na ordem de COUNT_COLUMNS"""
+        weights = [getattr(self, column) for column in COUNT_COLUMNS]
+        return (np.array([w.points for w in weights], dtype=float),
+                np.array([w.cap for w in weights], dtype=float))
+
+    @classmethod
+    def parse(cls, spec: str, base: Optional["RiskWeights"] = None) -> "RiskWeights":
+        """
+        Lê pesos no formato "categoria=pontos[:máximo],..."
+
+        Args:
+            spec: Ex: "critical_exposed=25:50,cookie_issues=1" (vazio = base)
+            base: Pesos que não são alterados (por omissão os da classe)
+
+        Returns:
+            RiskWeights com as categorias indicadas substituídas
+
+        Raises:
+            ValueError: Categoria desconhecida ou valor inválido
+        """
+        base = base or cls()
+        names = {field.name for field in fields(cls)}
+        changes: Dict[str, CategoryWeight] = {}
+
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            name, _, value = item.partition("=")
+            name = name.strip()
+            if name not in names:
+                raise ValueError(f"Categoria de risco desconhecida: {name!r} (válidas: {', '.join(COUNT_COLUMNS)})")
+            points, _, cap = value.partition(":")
+            try:
+                current = getattr(base, name)
+                changes[name] = CategoryWeight(float(points), float(cap) if cap else current.cap)
+            except ValueError:
+                raise ValueError(f"Peso inválido para {name}: {value!r}") from None
+
+        return replace(base, **changes)
+
+
+def default_weights() -> RiskWeights:
+    """Pesos por omissão (com as alterações de LEADGEN_RISK_WEIGHTS)"""
+    return RiskWeights.parse(os.getenv("LEADGEN_RISK_WEIGHTS", ""))
+
+
+def finding_counts(report: Mapping[str, Any]) -> Dict[str, int]:
+    """
+    Contagens de findings de um relatório, por categoria de risco
+
+    Args:
+        report: final_report (ou estado do workflow) com secções de findings
+
+    Returns:
+        Dict {coluna de COUNT_COLUMNS: número de findings}
+    """
+    return {
+        "vulnerabilities": count(findings(report.get("vulnerabilities"))),
+        "critical_exposed": count(findings(report.get("exposed_files")), Severity.CRITICAL),
+        "ssl_issues": count(findings(report.get("ssl_advanced")), Severity.HIGH),
+        "cookie_issues": count(findings(report.get("cookie_security"))),
+    }
+
+
+def score_counts(counts: Mapping[str, int], weights: Optional[RiskWeights] = None) -> int:
+    """Score de risco (0-100) de um único website"""
+    matrix = np.array([[counts.get(column, 0) for column in COUNT_COLUMNS]], dtype=float)
+    return int(_scores(matrix, weights or default_weights())[0])
+
+
+def risk_level(score: float) -> str:
+    """Nível de risco correspondente a um score"""
+    for threshold, level in RISK_LEVELS:
+        if score >= threshold:
+            return level
+    return MIN_RISK_LEVEL
+
+
+def score_table(results: pd.DataFrame, weights: Optional[RiskWeights] = None) -> pd.DataFrame:
+    """
+    Pontua todos os websites de uma tabela de resultados de uma só vez
+
+    Linhas sem contagens (sem website ou com erro) ficam sem score; websites
+    inacessíveis ficam com score 0 e nível UNREACHABLE. Nenhum dos dois
+    entra no ranking.
+
+    Args:
+        results: Tabela com as colunas de COUNT_COLUMNS (e opcionalmente `reachable`)
+        weights: Pesos a usar (por omissão default_weights())
+
+    Returns:
+        Cópia da tabela com risk_score, risk_level e risk_rank (1 = maior risco)
+    """
+    results = results.copy()
+    counts = results.reindex(columns=list(COUNT_COLUMNS)).to_numpy(dtype=float, na_value=np.nan)
+    scored = ~np.isnan(counts).all(axis=1)
+    scores = np.where(scored, _scores(np.nan_to_num(counts), weights or default_weights()), np.nan)
+
+    if "reachable" in results.columns:
+        unreachable = results["reachable"].eq(False).to_numpy()
+    else:
+        unreachable = np.zeros(len(results), dtype=bool)
+    scores[unreachable] = 0
+
+    thresholds = [threshold for threshold, _ in RISK_LEVELS]
+    levels = np.select([scores >= threshold for threshold in thresholds],
+                       [level for _, level in RISK_LEVELS], default=MIN_RISK_LEVEL).astype(object)
+    levels[unreachable] = UNREACHABLE_LEVEL
+    levels[~scored & ~unreachable] = None
+
+    ranked = pd.Series(np.where(unreachable, np.nan, scores), index=results.index)
+    results["risk_score"] = pd.Series(scores, index=results.index).astype("Int64")
+    results["risk_level"] = levels
+    results["risk_rank"] = ranked.rank(method="min", ascending=False).astype("Int64")
+    return results
+
+
+def _scores(counts: np.ndarray, weights: RiskWeights) -> np.ndarray:
+    """Scores (n,) a partir de uma matriz de contagens (n, len(COUNT_COLUMNS))"""
+    points, caps = weights.arrays()
+    return np.rint(np.minimum(np.minimum(counts * points, caps).sum(axis=1), MAX_SCORE))
@@ -0,0 +1,275 @@
+"""
+Sector Classifier
+
+Classificador local do setor de atividade, usado antes do
+CategorizationAgent: descrições óbvias ("clínica dentária" -> Saúde) são
+resolvidas sem chamada ao LLM.
+
+Cada descrição é convertida em n-gramas (palavras, pares de palavras e
+trigramas de caracteres, sem acentos) com hashing para um vetor de
+tamanho fixo. O modelo guarda, por setor, a soma dos vetores das
+descrições já classificadas pelo LLM (aprendizagem incremental) e a
+frequência de cada n-grama; uma descrição nova é atribuída ao setor
+cujo centróide TF-IDF é mais parecido (cosseno). Só é usada a resposta
+local se a semelhança e a margem para o segundo setor forem suficientes;
+caso contrário a decisão fica para o LLM.
+
+O modelo é guardado em sector_classifier.npz no diretório de cache.
+Desativar com LEADGEN_LOCAL_CLASSIFIER=0.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+import atexit
+import hashlib
+import logging
+import os
+import re
+import threading
+import unicodedata
+import zlib
+
+import numpy as np
+
+from domain.models import CategoriasValidas
+from services.cache._sqlite import default_cache_dir
+
+logger = logging.getLogger(__name__)
+
+N_FEATURES = 2 ** 16
+
+# Limiares de confiança (semelhança de cosseno, 0-1)
+DEFAULT_MIN_SIMILARITY = 0.25
+DEFAULT_MIN_MARGIN = 0.10
+# Descrições aprendidas que um setor precisa antes de ser sugerido localmente
+DEFAULT_MIN_EXAMPLES = 5
+
+# Gravar o modelo a cada N descrições aprendidas (e à saída do processo)
+SAVE_EVERY = 200
+
+LABELS: Tuple[str, ...] = tuple(categoria.value for categoria in CategoriasValidas)
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """Minúsculas, sem acentos e com espaços simples"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.split())
+
+
+def features(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vetor esparso de uma descrição
+
+    Args:
+        text: Descrição da atividade
+
+    Returns:
+        (índices, pesos): n-gramas com hashing em N_FEATURES, peso 1 + log(tf)
+    """
+    words = [word for word in _WORD.findall(normalize(text)) if len(word) > 1]
+    grams = list(words)
+    grams += [f"{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"<{word}>"
+        grams += [f"#{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    if not grams:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    # crc32 em vez de hash(): estável entre processos
+    hashed = np.fromiter((zlib.crc32(gram.encode("utf-8")) % N_FEATURES for gram in grams),
+                         dtype=np.int64, count=len(grams))
+    indices, counts = np.unique(hashed, return_counts=True)
+    return indices, (1 + np.log(counts)).astype(np.float32)
+
+
+class SectorClassifier:
+    """Centróides TF-IDF por setor, com aprendizagem incremental (thread-safe)"""
+
+    def __init__(self, path: Optional[Path] = None, min_similarity: float = DEFAULT_MIN_SIMILARITY,
+                 min_margin: float = DEFAULT_MIN_MARGIN, min_examples: int = DEFAULT_MIN_EXAMPLES):
+        """
+        Args:
+            path: Ficheiro do modelo (por omissão, sector_classifier.npz no diretório de cache)
+            min_similarity: Semelhança mínima com o setor escolhido
+            min_margin: Diferença mínima para o segundo setor mais parecido
+            min_examples: Descrições aprendidas que um setor precisa para ser sugerido
+        """
+        self.path = path or default_cache_dir() / "sector_classifier.npz"
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self.min_examples = min_examples
+
+        self._sums = np.zeros((len(LABELS), N_FEATURES), dtype=np.float32)
+        self._doc_freq = np.zeros(N_FEATURES, dtype=np.float32)
+        self._class_docs = np.zeros(len(LABELS), dtype=np.int64)
+        self._seen: set = set()
+        self._unsaved = 0
+        self._weighted: Optional[np.ndarray] = None  # centróides TF-IDF normalizados (recalculados após aprender)
+        self._idf: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def n_docs(self) -> int:
+        """Descrições aprendidas"""
+        return int(self._class_docs.sum())
+
+    def predict(self, text: str) -> Tuple[Optional[str], float, float]:
+        """
+        Setor mais parecido, sem aplicar os limiares
+
+        Args:
+            text: Descrição da atividade
+
+        Returns:
+            (setor ou None, semelhança, margem para o segundo setor)
+        """
+        indices, weights = features(text or "")
+        with self._lock:
+            if not len(indices) or not self.n_docs:
+                return None, 0.0, 0.0
+            centroids, idf = self._centroids()
+            query = weights * idf[indices]
+            norm = float(np.linalg.norm(query))
+            if norm == 0:
+                return None, 0.0, 0.0
+            similarities = centroids[:, indices] @ (query / norm)
+            eligible = self._class_docs >= self.min_examples
+
+        similarities = np.where(eligible, similarities, -1.0)
+        order = np.argsort(similarities)[::-1]
+        best, second = order[0], order[1]
+        if similarities[best] <= 0:
+            return None, 0.0, 0.0
+        margin = similarities[best] - max(similarities[second], 0.0)
+        return LABELS[best], float(similarities[best]), float(margin)
+
+    def classify(self, text: str) -> Optional[str]:
+        """
+        Setor da descrição, se a confiança for suficiente
+
+        Returns:
+            Valor de CategoriasValidas, ou None (usar o LLM)
+        """
+        setor, similarity, margin = self.predict(text)
+        if setor is None or similarity < self.min_similarity or margin < self.min_margin:
+            return None
+        return setor
+
+    def learn(self, text: str, setor: str):
+        """
+        Acrescenta uma descrição classificada (pelo LLM) ao modelo
+
+        Cada descrição só é aprendida uma vez, mesmo que a resposta venha
+        repetida da cache LLM.
+
+        Args:
+            text: Descrição da atividade
+            setor: Valor de CategoriasValidas
+        """
+        if not text or setor not in LABELS:
+            return
+        digest = hashlib.sha1(normalize(text).encode("utf-8")).hexdigest()[:16]
+        indices, weights = features(text)
+        if not len(indices):
+            return
+
+        with self._lock:
+            if digest in self._seen:
+                return
+            self._seen.add(digest)
+            label = LABELS.index(setor)
+            self._sums[label, indices] += weights / np.linalg.norm(weights)
+            self._doc_freq[indices] += 1
+            self._class_docs[label] += 1
+            self._weighted = None
+            self._unsaved += 1
+            save = self._unsaved >= SAVE_EVERY
+
+        if save:
+            self.save()
+
+    def fit(self, texts: Iterable[str], setores: Iterable[str]) -> int:
+        """
+        Aprende várias descrições de uma vez (ex: resultados de execuções anteriores)
+
+        Returns:
+            Número de descrições aprendidas
+        """
+        before = self.n_docs
+        for text, setor in zip(texts, setores):
+            self.learn(text, setor)
+        self.save()
+        return self.n_docs - before
+
+    def stats(self) -> Dict[str, int]:
+        """Descrições aprendidas, no total e por setor"""
+        with self._lock:
+            return {"docs": self.n_docs,
+                    **{label: int(n) for label, n in zip(LABELS, self._class_docs) if n}}
+
+    def save(self):
+        """Grava o modelo (escrita atómica)"""
+        with self._lock:
+            if not self._unsaved:
+                return
+            arrays = {
+                "labels": np.array(LABELS),
+                "sums": self._sums.copy(),
+                "doc_freq": self._doc_freq.copy(),
+                "class_docs": self._class_docs.copy(),
+                "seen": np.array(sorted(self._seen)),
+            }
+            self._unsaved = 0
+
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(tmp, "wb") as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar o classificador de setores: {e}")
+
+    def _load(self):
+        """Carrega o modelo gravado (ignorado se não existir ou se os setores mudaram)"""
+        if not self.path.exists():
+            return
+        try:
+            with np.load(self.path) as data:
+                if tuple(data["labels"]) != LABELS or data["sums"].shape != self._sums.shape:
+                    logger.warning("Classificador de setores gravado com outros setores: a recomeçar")
+                    return
+                self._sums = data["sums"].astype(np.float32)
+                self._doc_freq = data["doc_freq"].astype(np.float32)
+                self._class_docs = data["class_docs"].astype(np.int64)
+                self._seen = set(data["seen"].tolist())
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Classificador de setores ilegível, a recomeçar: {e}")
+
+    def _centroids(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Centróides TF-IDF normalizados e IDF (chamar com o lock)"""
+        if self._weighted is None:
+            self._idf = (np.log((1 + self.n_docs) / (1 + self._doc_freq)) + 1).astype(np.float32)
+            weighted = self._sums * self._idf
+            norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+            self._weighted = np.divide(weighted, norms, out=np.zeros_like(weighted), where=norms > 0)
+        return self._weighted, self._idf
+
+
+_classifier: Optional[SectorClassifier] = None
+_classifier_lock = threading.Lock()
+
+
+def get_sector_classifier() -> Optional[SectorClassifier]:
+    """Classificador partilhado por todo o processo (None se LEADGEN_LOCAL_CLASSIFIER=0)"""
+    global _classifier
+    if os.getenv("LEADGEN_LOCAL_CLASSIFIER", "1") == "0":
+        return None
+    with _classifier_lock:
+        if _classifier is None:
+            _classifier = SectorClassifier()
+            atexit.register(_classifier.save)
+        return _classifier
@@ -5,6 +5,10 @@ Este módulo contém todos os checkers de segurança utilizados
 pelo SecurityAgent para análise de websites.
 """
 
+# Incrementar quando o formato/semântica dos resultados dos checkers mudar
+# (invalida os resultados guardados em cache)
+SCANNER_VERSION = "3"
+
 from .ssl_checker import SSLChecker
 from .headers_checker import HeadersChecker
 from .vulnerability_checker import VulnerabilityChecker
@@ -12,8 +16,10 @@ from .exposed_files_checker import ExposedFilesChecker
 from .cookie_checker import CookieChecker
 from .cms_detector import CMSDetector
 from .protocol_checker import ProtocolChecker
+from .response_snapshot import ResponseSnapshot, fetch_snapshot
 
 __all__ = [
+    'SCANNER_VERSION',
     'SSLChecker',
     'HeadersChecker',
     'VulnerabilityChecker',
@@ -21,4 +27,6 @@ __all__ = [
     'CookieChecker',
     'CMSDetector',
     'ProtocolChecker',
+    'ResponseSnapshot',
+    'fetch_snapshot',
 ]
@@ -5,14 +5,23 @@ Detecta qual CMS está sendo utilizado pelo website.
 """
 
 from typing import Dict, Any, Optional, List
-import requests
 import re
+from domain.findings import Finding
+from services.http_client import HttpClient, get_default_client
+from .response_snapshot import ResponseSnapshot, fetch_snapshot
 
 
 class CMSDetector:
     """Detector de CMS"""
 
-    def detect(self, url: str) -> Dict[str, Any]:
+    def __init__(self, http_client: Optional[HttpClient] = None):
+        """
+        Args:
+            http_client: Cliente HTTP partilhado (por omissão, o do processo)
+        """
+        self.http_client = http_client or get_default_client()
+
+    def detect(self, url: str, snapshot: Optional[ResponseSnapshot] = None) -> Dict[str, Any]:
         """
         Detecção de CMS (Content Management System)
 
@@ -26,14 +35,18 @@ class CMSDetector:
 
         Args:
             url: URL do website a verificar
+            snapshot: Resposta já descarregada (se None, é feito o fetch)
 
         Returns:
             Dict com CMS detectado e informações adicionais
         """
         try:
-            response = requests.get(url, timeout=10)
-            html_content = response.text.lower()
-            headers = response.headers
+            snapshot = snapshot or fetch_snapshot(url, self.http_client)
+            if snapshot.error:
+                raise ConnectionError(snapshot.error)
+
+            html_content = snapshot.body.lower()
+            headers = snapshot.headers
 
             cms_detected = None
             version = None
@@ -75,21 +88,18 @@ class CMSDetector:
                 indicators.append("Magento detectado")
 
             if cms_detected:
-                warnings = self._get_cms_warnings(cms_detected, version)
-
                 return {
                     "cms_detection": {
-                        "status": f"✅ CMS Detectado: {cms_detected}",
+                        "findings": self._get_cms_warnings(cms_detected, version),
                         "cms": cms_detected,
                         "version": version,
-                        "indicators": indicators,
-                        "warnings": warnings
+                        "indicators": indicators
                     }
                 }
             else:
                 return {
                     "cms_detection": {
-                        "status": "ℹ️  Nenhum CMS conhecido detectado",
+                        "findings": [],
                         "cms": None
                     }
                 }
@@ -97,12 +107,11 @@ class CMSDetector:
         except Exception as e:
             return {
                 "cms_detection": {
-                    "status": "❌ Erro ao detectar CMS",
-                    "error": str(e)
+                    "findings": [Finding.of("cms.error", e)]
                 }
             }
 
-    def _get_cms_warnings(self, cms: str, version: Optional[str]) -> List[str]:
+    def _get_cms_warnings(self, cms: str, version: Optional[str]) -> List[Finding]:
         """
         Retorna avisos específicos para cada CMS
 
@@ -111,14 +120,14 @@ class CMSDetector:
             version: Versão do CMS (se detectada)
 
         Returns:
-            Lista de avisos
+            Lista de findings
         """
         warnings = []
 
         if cms == "WordPress":
-            warnings.append("⚠️  WordPress: Verificar se plugins estão atualizados")
-            warnings.append("⚠️  WordPress: Esconder versão (security through obscurity)")
+            warnings.append(Finding.of("cms.wordpress_plugins"))
+            warnings.append(Finding.of("cms.wordpress_version"))
             if version:
-                warnings.append(f"ℹ️  Versão detectada: {version}")
+                warnings.append(Finding.of("cms.version", version))
 
         return warnings
@@ -4,14 +4,23 @@ Cookie Security Checker
 Verifica a segurança dos cookies HTTP.
 """
 
-from typing import Dict, Any, List
-import requests
+from typing import Dict, Any, List, Optional
+from domain.findings import Finding
+from services.http_client import HttpClient, get_default_client
+from .response_snapshot import ResponseSnapshot, fetch_snapshot
 
 
 class CookieChecker:
     """Checker para segurança de cookies"""
 
-    def check(self, url: str) -> Dict[str, Any]:
+    def __init__(self, http_client: Optional[HttpClient] = None):
+        """
+        Args:
+            http_client: Cliente HTTP partilhado (por omissão, o do processo)
+        """
+        self.http_client = http_client or get_default_client()
+
+    def check(self, url: str, snapshot: Optional[ResponseSnapshot] = None) -> Dict[str, Any]:
         """
         Verificação de segurança de cookies
 
@@ -22,59 +31,56 @@ class CookieChecker:
 
         Args:
             url: URL do website a verificar
+            snapshot: Resposta já descarregada (se None, é feito o fetch)
 
         Returns:
-            Dict com análise de segurança dos cookies
+            Dict com a secção de cookies (findings e flags de cada cookie)
         """
         try:
-            response = requests.get(url, timeout=10)
-            cookies = response.cookies
+            snapshot = snapshot or fetch_snapshot(url, self.http_client)
+            if snapshot.error:
+                raise ConnectionError(snapshot.error)
+
+            cookies = snapshot.cookies()
 
             if len(cookies) == 0:
                 return {
                     "cookie_security": {
-                        "status": "ℹ️  Nenhum cookie definido",
+                        "findings": [],
                         "cookies_analyzed": 0
                     }
                 }
 
-            issues = []
+            findings = []
             cookie_details = []
 
             for cookie in cookies:
                 cookie_info = {
-                    "name": cookie.name,
-                    "secure": cookie.secure,
-                    "httponly": cookie.has_nonstandard_attr('HttpOnly'),
-                    "samesite": cookie.get_nonstandard_attr('SameSite', 'None')
+                    "name": cookie["name"],
+                    "secure": cookie["secure"],
+                    "httponly": cookie["httponly"],
+                    "samesite": cookie["samesite"] or 'None'
                 }
 
-                cookie_issues = []
-
                 # Verificar Secure flag
-                if not cookie.secure and url.startswith("https://"):
-                    cookie_issues.append("❌ Sem flag 'Secure' (pode ser transmitido via HTTP)")
+                if not cookie["secure"] and url.startswith("https://"):
+                    findings.append(Finding.of("cookie.no_secure", cookie["name"]))
 
                 # Verificar HttpOnly
-                if not cookie.has_nonstandard_attr('HttpOnly'):
-                    cookie_issues.append("❌ Sem flag 'HttpOnly' (vulnerável a XSS)")
+                if not cookie["httponly"]:
+                    findings.append(Finding.of("cookie.no_httponly", cookie["name"]))
 
                 # Verificar SameSite
-                samesite = cookie.get_nonstandard_attr('SameSite')
+                samesite = cookie["samesite"]
                 if not samesite or samesite == 'None':
-                    cookie_issues.append("⚠️  Sem atributo 'SameSite' (vulnerável a CSRF)")
-
-                if cookie_issues:
-                    issues.extend([f"Cookie '{cookie.name}': {issue}" for issue in cookie_issues])
+                    findings.append(Finding.of("cookie.no_samesite", cookie["name"]))
 
-                cookie_info['issues'] = cookie_issues
                 cookie_details.append(cookie_info)
 
             return {
                 "cookie_security": {
-                    "status": "⚠️  Problemas detectados" if issues else "✅ Cookies seguros",
+                    "findings": findings,
                     "cookies_analyzed": len(cookies),
-                    "issues": issues,
                     "cookie_details": cookie_details
                 }
             }
@@ -82,7 +88,6 @@ class CookieChecker:
         except Exception as e:
             return {
                 "cookie_security": {
-                    "status": "❌ Erro ao analisar cookies",
-                    "error": str(e)
+                    "findings": [Finding.of("cookies.error", e)]
                 }
             }
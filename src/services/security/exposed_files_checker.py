@@ -4,9 +4,12 @@ Exposed Files and Directories Checker
 Verifica se arquivos e diretórios sensíveis estão expostos.
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from urllib.parse import urlparse
-import requests
+from domain.findings import Finding
+from services.http_client import HttpClient, get_default_client
+from .response_snapshot import ResponseSnapshot
+from .path_prober import NOT_PROBED, PathProber
 
 
 class ExposedFilesChecker:
@@ -37,7 +40,24 @@ class ExposedFilesChecker:
         "/graphql"
     ]
 
-    def check(self, url: str) -> Dict[str, Any]:
+    def __init__(self, http_client: Optional[HttpClient] = None, max_concurrency_per_host: int = 6,
+                 deadline: float = 15.0, timeout: float = 5.0):
+        """
+        Args:
+            http_client: Cliente HTTP partilhado (por omissão, o do processo)
+            max_concurrency_per_host: Máximo de pedidos simultâneos ao mesmo host
+            deadline: Prazo global (segundos) para testar todos os caminhos
+            timeout: Timeout de cada pedido HEAD
+        """
+        self.http_client = http_client or get_default_client()
+        self.prober = PathProber(
+            self.http_client,
+            max_per_host=max_concurrency_per_host,
+            deadline=deadline,
+            timeout=timeout
+        )
+
+    def check(self, url: str, snapshot: Optional[ResponseSnapshot] = None) -> Dict[str, Any]:
         """
         Verificação de arquivos e diretórios expostos
 
@@ -49,42 +69,44 @@ class ExposedFilesChecker:
 
         Args:
             url: URL do website a verificar
+            snapshot: Resposta já descarregada; se existir, os caminhos são
+                testados no destino final dos redirects
 
         Returns:
-            Dict com arquivos expostos categorizados
+            Dict com a secção de arquivos expostos (severidade por caminho);
+            se algum caminho ficar por testar dentro do prazo, a secção
+            leva "partial": True e a lista "untested"
         """
         # Normalizar URL base
-        parsed = urlparse(url)
+        parsed = urlparse(snapshot.final_url if snapshot and snapshot.final_url else url)
         base_url = f"{parsed.scheme}://{parsed.netloc}"
 
-        exposed = []
-        safe = []
+        findings = []
+        untested = []
+
+        # Todos os caminhos são testados em paralelo (None = erro de ligação)
+        statuses = self.prober.probe(base_url, self.SENSITIVE_PATHS)
 
         for path in self.SENSITIVE_PATHS:
-            try:
-                test_url = base_url + path
-                response = requests.head(test_url, timeout=5, allow_redirects=False)
-
-                # Considerar exposto se retornar 200 ou 403 (existe mas bloqueado)
-                if response.status_code == 200:
-                    if path.startswith("/.git") or path == "/.env" or ".sql" in path or ".zip" in path:
-                        exposed.append(f"🚨 CRÍTICO: {path} (HTTP {response.status_code})")
-                    elif path in ["/admin", "/admin/", "/wp-admin", "/wp-admin/", "/phpmyadmin", "/phpmyadmin/"]:
-                        exposed.append(f"⚠️  {path} acessível (HTTP {response.status_code})")
-                    else:
-                        safe.append(f"ℹ️  {path} público (esperado)")
-                elif response.status_code == 403:
-                    exposed.append(f"⚠️  {path} existe mas bloqueado (HTTP 403)")
-
-            except:
-                # Erro de conexão = provavelmente não existe (bom sinal)
-                pass
-
-        return {
-            "exposed_files": {
-                "critical_exposed": [e for e in exposed if "CRÍTICO" in e],
-                "warnings": [e for e in exposed if "CRÍTICO" not in e],
-                "public_files": safe,
-                "total_exposed": len(exposed)
-            }
-        }
+            status_code = statuses.get(path)
+
+            # Sem resposta dentro do prazo: não se pode dizer que não está exposto
+            if status_code == NOT_PROBED:
+                untested.append(path)
+                continue
+
+            # Considerar exposto se retornar 200 ou 403 (existe mas bloqueado)
+            if status_code == 200:
+                if path.startswith("/.git") or path == "/.env" or ".sql" in path or ".zip" in path:
+                    findings.append(Finding.of("exposed.critical", path))
+                elif path in ["/admin", "/admin/", "/wp-admin", "/wp-admin/", "/phpmyadmin", "/phpmyadmin/"]:
+                    findings.append(Finding.of("exposed.admin", path))
+                else:
+                    findings.append(Finding.of("exposed.public", path))
+            elif status_code == 403:
+                findings.append(Finding.of("exposed.blocked", path))
+
+        section = {"findings": findings}
+        if untested:
+            section.update(partial=True, untested=untested)
+        return {"exposed_files": section}
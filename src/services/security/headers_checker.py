@@ -4,14 +4,23 @@ HTTP Security Headers Checker
 Verifica a presença de headers de segurança importantes.
 """
 
-from typing import Dict, Any
-import requests
+from typing import Dict, Any, Optional
+from domain.findings import Finding
+from services.http_client import HttpClient, get_default_client
+from .response_snapshot import ResponseSnapshot, fetch_snapshot
 
 
 class HeadersChecker:
     """Checker para headers de segurança HTTP"""
 
-    def check(self, url: str) -> Dict[str, Any]:
+    def __init__(self, http_client: Optional[HttpClient] = None):
+        """
+        Args:
+            http_client: Cliente HTTP partilhado (por omissão, o do processo)
+        """
+        self.http_client = http_client or get_default_client()
+
+    def check(self, url: str, snapshot: Optional[ResponseSnapshot] = None) -> Dict[str, Any]:
         """
         Verificação de headers de segurança
 
@@ -23,13 +32,17 @@ class HeadersChecker:
 
         Args:
             url: URL do website a verificar
+            snapshot: Resposta já descarregada (se None, é feito o fetch)
 
         Returns:
-            Dict com status dos headers
+            Dict com a secção de headers (um finding por header)
         """
         try:
-            response = requests.head(url, timeout=10)
-            headers = response.headers
+            snapshot = snapshot or fetch_snapshot(url, self.http_client)
+            if snapshot.error:
+                return {"headers": {"findings": [Finding.of("headers.error", snapshot.error)]}}
+
+            headers = snapshot.headers
 
             required_headers = {
                 "Content-Security-Policy": "Protege contra XSS",
@@ -38,15 +51,15 @@ class HeadersChecker:
                 "Strict-Transport-Security": "Força HTTPS",
             }
 
-            headers_check = {}
+            findings = []
 
             for header, description in required_headers.items():
                 if header in headers:
-                    headers_check[header] = f"✅ Presente: {headers[header]}"
+                    findings.append(Finding.of("header.present", header, headers[header]))
                 else:
-                    headers_check[header] = "❌ Ausente"
+                    findings.append(Finding.of("header.missing", header))
 
-            return {"headers": headers_check}
+            return {"headers": {"findings": findings}}
 
         except Exception as e:
-            return {"headers": {str(e)}}
+            return {"headers": {"findings": [Finding.of("headers.error", e)]}}
@@ -0,0 +1,135 @@
+"""
+Concurrent Path Prober
+
+Testa vários caminhos do mesmo host em paralelo, com um limite de
+pedidos simultâneos por host e um prazo global para o conjunto.
+
+Configuração: LEADGEN_PROBE_WORKERS (threads partilhadas por todos os scans).
+"""
+
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+import contextvars
+import os
+import threading
+import time
+import weakref
+import requests
+from services.deadline import clamp_timeout
+from services.http_client import HttpClient
+
+# Threads do pool partilhado por todos os probes do processo (o limite por
+# host continua a ser max_per_host)
+PROBE_WORKERS = int(os.getenv("LEADGEN_PROBE_WORKERS", "32"))
+
+# "Status" de um caminho que não chegou a ser testado (ficou em fila ou sem
+# resposta dentro do prazo): não se sabe se está exposto
+NOT_PROBED = -1
+
+
+class PathProber:
+    """
+    Executa pedidos HEAD concorrentes a uma lista de caminhos.
+
+    O limite por host é partilhado pelas instâncias com o mesmo
+    max_per_host, para que vários scans ao mesmo host (ex: batch) não o
+    sobrecarreguem. Os semáforos só existem enquanto algum probe ao host
+    está a decorrer, e os pedidos correm num pool de threads partilhado.
+    """
+
+    # Semáforos por (host, max_per_host); desaparecem quando nenhum probe os usa
+    _host_semaphores: "weakref.WeakValueDictionary[Tuple[str, int], threading.BoundedSemaphore]" = \
+        weakref.WeakValueDictionary()
+    _semaphores_lock = threading.Lock()
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+
+    def __init__(self, http_client: HttpClient, max_per_host: int = 6, deadline: float = 15.0, timeout: float = 5.0):
+        """
+        Args:
+            http_client: Cliente HTTP (pool de ligações) usado nos pedidos
+            max_per_host: Máximo de pedidos simultâneos ao mesmo host
+            deadline: Prazo global (segundos) para testar todos os caminhos
+            timeout: Timeout de cada pedido individual
+        """
+        self.http_client = http_client
+        self.max_per_host = max_per_host
+        self.deadline = deadline
+        self.timeout = timeout
+
+    def probe(self, base_url: str, paths: List[str]) -> Dict[str, Optional[int]]:
+        """
+        Testa todos os caminhos em paralelo.
+
+        Args:
+            base_url: URL base (scheme://host[:porta])
+            paths: Caminhos a testar (ex: "/.git/HEAD")
+
+        Returns:
+            Dict {caminho: status HTTP}, com None para erros de ligação e
+            NOT_PROBED para caminhos que não foram testados ou não
+            responderam dentro do prazo
+
+        Raises:
+            DeadlineExceeded: Se o prazo do scan (deadline_scope) já tiver esgotado
+        """
+        semaphore = self._semaphore_for(urlparse(base_url).netloc)
+        # O prazo global nunca ultrapassa o que falta ao scan
+        budget = clamp_timeout(self.deadline)
+        deadline_at = time.monotonic() + budget
+
+        executor = self._shared_executor()
+        # Cada pedido corre com uma cópia do contexto (medições do scan ativas)
+        futures = {
+            executor.submit(contextvars.copy_context().run, self._probe_one, semaphore, base_url + path, deadline_at): path
+            for path in paths
+        }
+
+        done, pending = wait(futures, timeout=budget)
+        # Pedidos ainda em fila são cancelados; os que já correm terminam sozinhos
+        for future in pending:
+            future.cancel()
+
+        results: Dict[str, Optional[int]] = {path: NOT_PROBED for path in paths}
+        for future in done:
+            results[futures[future]] = future.result()
+        return results
+
+    def _probe_one(self, semaphore: threading.BoundedSemaphore, url: str, deadline_at: float) -> Optional[int]:
+        """Faz um HEAD respeitando o limite por host e o prazo global"""
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0 or not semaphore.acquire(timeout=remaining):
+            return NOT_PROBED
+
+        try:
+            timeout = min(self.timeout, max(deadline_at - time.monotonic(), 0.1))
+            response = self.http_client.head(url, timeout=timeout, allow_redirects=False)
+            return response.status_code
+        except requests.exceptions.Timeout:
+            # Sem resposta a tempo (inclui o prazo do scan): não se sabe se existe
+            return NOT_PROBED
+        except requests.exceptions.RequestException:
+            # Erro de conexão = provavelmente não existe (bom sinal)
+            return None
+        finally:
+            semaphore.release()
+
+    def _semaphore_for(self, host: str) -> threading.BoundedSemaphore:
+        """Semáforo do host para este max_per_host (quem o usa mantém-no vivo)"""
+        key = (host, self.max_per_host)
+        with self._semaphores_lock:
+            semaphore = self._host_semaphores.get(key)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_per_host)
+                self._host_semaphores[key] = semaphore
+            return semaphore
+
+    @classmethod
+    def _shared_executor(cls) -> ThreadPoolExecutor:
+        """Pool de threads comum a todos os probes (criado no primeiro uso)"""
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=PROBE_WORKERS, thread_name_prefix="path-probe")
+            return cls._executor
@@ -4,14 +4,23 @@ Protocol Security Checker
 Verifica o uso de HTTP vs HTTPS e redirects.
 """
 
-from typing import Dict, Any
-import requests
+from typing import Dict, Any, Optional
+from domain.findings import Finding
+from services.http_client import HttpClient, get_default_client
+from .response_snapshot import ResponseSnapshot, fetch_snapshot
 
 
 class ProtocolChecker:
     """Checker para protocolo HTTP/HTTPS"""
 
-    def check(self, url: str) -> Dict[str, Any]:
+    def __init__(self, http_client: Optional[HttpClient] = None):
+        """
+        Args:
+            http_client: Cliente HTTP partilhado (por omissão, o do processo)
+        """
+        self.http_client = http_client or get_default_client()
+
+    def check(self, url: str, snapshot: Optional[ResponseSnapshot] = None) -> Dict[str, Any]:
         """
         Verificação Geral de Segurança
 
@@ -21,39 +30,47 @@ class ProtocolChecker:
 
         Args:
             url: URL do website a verificar
+            snapshot: Resposta já descarregada (se None, é feito o fetch)
 
         Returns:
-            Dict com issues de protocolo
+            Dict com a secção de protocolo ({"issues": {"findings": [...]}})
         """
         try:
-            # Fazer request SEM seguir redirects primeiro
-            response = requests.head(url, timeout=10, allow_redirects=False)
+            snapshot = snapshot or fetch_snapshot(url, self.http_client)
+
+            if snapshot.error_kind == "timeout":
+                return _section(Finding.of("protocol.timeout"))
+            if snapshot.error_kind == "connection":
+                return _section(Finding.of("protocol.connection"))
+            if snapshot.error:
+                return _section(Finding.of("protocol.error", snapshot.error))
 
             issues = []
             original_is_http = url.startswith("http://")
 
-            # Verificar se houve redirect
-            if response.status_code in [301, 302, 303, 307, 308]:
-                redirect_location = response.headers.get('Location', '')
+            # Verificar se houve redirect (primeira resposta da cadeia)
+            first_status = snapshot.first_status_code
+            if first_status in [301, 302, 303, 307, 308]:
+                redirect_location = snapshot.first_location
 
                 if original_is_http and redirect_location.startswith("https://"):
-                    issues.append("⚠️  Aceita HTTP mas redireciona para HTTPS (melhor: só aceitar HTTPS)")
+                    issues.append(Finding.of("protocol.http_redirect"))
                 elif original_is_http:
-                    issues.append("❌ Usa HTTP sem redirecionamento para HTTPS")
+                    issues.append(Finding.of("protocol.http_no_redirect"))
                 else:
-                    issues.append(f"⚠️  Redireciona com status {response.status_code}")
+                    issues.append(Finding.of("protocol.redirect", first_status))
             else:
                 # Sem redirect
                 if original_is_http:
-                    issues.append("❌ Usa HTTP em vez de HTTPS")
+                    issues.append(Finding.of("protocol.http"))
                 else:
-                    issues.append("✅ Usa HTTPS")
+                    issues.append(Finding.of("protocol.https"))
 
-            return {"issues": issues}
+            return _section(*issues)
 
-        except requests.exceptions.Timeout:
-            return {"issues": ["❌ Website não responde (timeout)"]}
-        except requests.exceptions.ConnectionError:
-            return {"issues": ["❌ Não conseguiu conectar ao website"]}
         except Exception as e:
-            return {"issues": [f"❌ Erro ao verificar: {str(e)}"]}
+            return _section(Finding.of("protocol.error", e))
+
+
+def _section(*findings: Finding) -> Dict[str, Any]:
+    return {"issues": {"findings": list(findings)}}
@@ -0,0 +1,224 @@
+"""
+Response Snapshot
+
+Captura, num único pedido HTTP, tudo o que os checkers de segurança
+precisam: cadeia de redirects, headers finais, Set-Cookie em bruto,
+corpo da página e certificado TLS negociado.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+import warnings
+import requests
+from requests.structures import CaseInsensitiveDict
+from urllib3.exceptions import InsecureRequestWarning
+from services.http_client import HttpClient, get_default_client
+from services.instrumentation import record_bytes
+
+
+# Limite de bytes do corpo guardado (o suficiente para detecção de CMS)
+MAX_BODY_BYTES = 2 * 1024 * 1024
+
+
+@dataclass
+class RedirectHop:
+    """Um salto da cadeia de redirects"""
+    url: str
+    status_code: int
+    location: str = ""
+
+
+@dataclass
+class ResponseSnapshot:
+    """
+    Resposta HTTP capturada uma única vez e partilhada por todos os checkers.
+
+    Attributes:
+        url: URL pedido originalmente
+        final_url: URL final depois de seguir os redirects
+        status_code: Status HTTP da resposta final
+        redirect_chain: Saltos intermédios (status + Location) até à resposta final
+        headers: Headers da resposta final
+        set_cookies: Headers Set-Cookie em bruto da resposta final
+        body: Corpo da resposta final (truncado a MAX_BODY_BYTES)
+        peer_cert: Certificado TLS validado da ligação final (se HTTPS)
+        tls_version: Versão TLS negociada na ligação final
+        ssl_error: Erro de validação SSL (o fetch é repetido sem verificação)
+        error: Mensagem de erro se o website não respondeu
+        error_kind: "timeout", "connection" ou "other"
+    """
+    url: str
+    final_url: str = ""
+    status_code: Optional[int] = None
+    redirect_chain: List[RedirectHop] = field(default_factory=list)
+    headers: CaseInsensitiveDict = field(default_factory=CaseInsensitiveDict)
+    set_cookies: List[str] = field(default_factory=list)
+    body: str = ""
+    peer_cert: Optional[Dict[str, Any]] = None
+    tls_version: Optional[str] = None
+    ssl_error: Optional[str] = None
+    error: Optional[str] = None
+    error_kind: Optional[str] = None
+
+    @property
+    def reachable(self) -> bool:
+        """True se o website devolveu uma resposta"""
+        return self.error is None
+
+    @property
+    def first_status_code(self) -> Optional[int]:
+        """Status da primeira resposta (antes de seguir redirects)"""
+        if self.redirect_chain:
+            return self.redirect_chain[0].status_code
+        return self.status_code
+
+    @property
+    def first_location(self) -> str:
+        """Header Location da primeira resposta (vazio se não houve redirect)"""
+        if self.redirect_chain:
+            return self.redirect_chain[0].location
+        return ""
+
+    def cookies(self) -> List[Dict[str, Any]]:
+        """Cookies da resposta final já interpretados"""
+        return [parse_set_cookie(header) for header in self.set_cookies]
+
+
+def parse_set_cookie(header: str) -> Dict[str, Any]:
+    """
+    Interpreta um header Set-Cookie em bruto.
+
+    Args:
+        header: Valor do header (ex: "sid=abc; Path=/; Secure; HttpOnly")
+
+    Returns:
+        Dict com name, secure, httponly e samesite (None se ausente)
+    """
+    parts = [part.strip() for part in header.split(";")]
+    name = parts[0].split("=", 1)[0].strip() if parts else ""
+
+    attributes = {}
+    for part in parts[1:]:
+        key, _, value = part.partition("=")
+        attributes[key.strip().lower()] = value.strip()
+
+    return {
+        "name": name,
+        "secure": "secure" in attributes,
+        "httponly": "httponly" in attributes,
+        "samesite": attributes.get("samesite") or None
+    }
+
+
+def fetch_snapshot(url: str, http_client: Optional[HttpClient] = None, timeout: Optional[float] = None,
+                   max_body_bytes: int = MAX_BODY_BYTES) -> ResponseSnapshot:
+    """
+    Descarrega a página uma única vez, seguindo redirects.
+
+    Se o certificado for inválido, o erro é guardado em `ssl_error` e o
+    pedido é repetido sem verificação para que os restantes checkers
+    continuem a ter headers, cookies e corpo para analisar.
+
+    Args:
+        url: URL do website
+        http_client: Cliente HTTP a usar (por omissão, o cliente partilhado)
+        timeout: Timeout em segundos (por omissão, o do cliente)
+        max_body_bytes: Máximo de bytes do corpo a guardar
+
+    Returns:
+        ResponseSnapshot (com `error` preenchido se o site não respondeu)
+    """
+    http_client = http_client or get_default_client()
+    snapshot = ResponseSnapshot(url=url)
+
+    try:
+        response = _get(http_client, url, timeout, verify=None)
+    except requests.exceptions.SSLError as e:
+        snapshot.ssl_error = str(e)
+        try:
+            response = _get(http_client, url, timeout, verify=False)
+        except requests.exceptions.RequestException as retry_error:
+            return _with_error(snapshot, retry_error)
+    except requests.exceptions.RequestException as e:
+        return _with_error(snapshot, e)
+
+    try:
+        snapshot.final_url = response.url
+        snapshot.status_code = response.status_code
+        snapshot.redirect_chain = [
+            RedirectHop(hop.url, hop.status_code, hop.headers.get("Location", ""))
+            for hop in response.history
+        ]
+        snapshot.headers = CaseInsensitiveDict(response.headers)
+        snapshot.set_cookies = _raw_set_cookies(response)
+        # O certificado tem de ser lido antes do corpo (a ligação é libertada no fim)
+        snapshot.peer_cert, snapshot.tls_version = _peer_certificate(response)
+        snapshot.body = _read_body(response, max_body_bytes)
+    except requests.exceptions.RequestException as e:
+        return _with_error(snapshot, e)
+    finally:
+        response.close()
+
+    return snapshot
+
+
+def _get(http_client: HttpClient, url: str, timeout: Optional[float], verify: Optional[bool]) -> requests.Response:
+    kwargs = {"allow_redirects": True, "stream": True}
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    if verify is not None:
+        kwargs["verify"] = verify
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", InsecureRequestWarning)
+        return http_client.get(url, **kwargs)
+
+
+def _with_error(snapshot: ResponseSnapshot, error: Exception) -> ResponseSnapshot:
+    """Preenche o snapshot com o tipo de erro de rede"""
+    snapshot.error = str(error)
+    if isinstance(error, requests.exceptions.Timeout):
+        snapshot.error_kind = "timeout"
+    elif isinstance(error, requests.exceptions.ConnectionError):
+        snapshot.error_kind = "connection"
+    else:
+        snapshot.error_kind = "other"
+    return snapshot
+
+
+def _raw_set_cookies(response: requests.Response) -> List[str]:
+    """Headers Set-Cookie em bruto (o requests junta-os numa só string)"""
+    try:
+        return list(response.raw.headers.getlist("Set-Cookie"))
+    except AttributeError:
+        return []
+
+
+def _peer_certificate(response: requests.Response) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Certificado e versão TLS da ligação usada pela resposta final"""
+    try:
+        sock = response.raw.connection.sock
+        if sock is None:
+            # Com "Connection: close" o socket passa da ligação para o corpo da resposta
+            sock = response.raw._fp.fp.raw._sock
+        # Com verify=False o getpeercert() devolve {} (certificado não validado)
+        return sock.getpeercert() or None, sock.version()
+    except Exception:
+        return None, None
+
+
+def _read_body(response: requests.Response, max_body_bytes: int) -> str:
+    chunks = []
+    size = 0
+    for chunk in response.iter_content(chunk_size=64 * 1024):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= max_body_bytes:
+            break
+
+    record_bytes(size)
+    content = b"".join(chunks)[:max_body_bytes]
+    try:
+        return content.decode(response.encoding or "utf-8", errors="replace")
+    except LookupError:
+        return content.decode("utf-8", errors="replace")
@@ -4,51 +4,61 @@ SSL/TLS Security Checker
 Verifica certificados SSL e configurações TLS de websites.
 """
 
-from typing import Dict, Any
-import requests
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse
+from domain.findings import Finding
 from services.check_ssl_certificate import CheckSSL
+from services.http_client import HttpClient, get_default_client
+from .response_snapshot import ResponseSnapshot, fetch_snapshot
 
 
 class SSLChecker:
     """Checker para verificações SSL/TLS"""
 
-    def check(self, url: str) -> Dict[str, Any]:
+    def __init__(self, http_client: Optional[HttpClient] = None):
+        """
+        Args:
+            http_client: Cliente HTTP partilhado (por omissão, o do processo)
+        """
+        self.http_client = http_client or get_default_client()
+
+    def check(self, url: str, snapshot: Optional[ResponseSnapshot] = None) -> Dict[str, Any]:
         """
         Verificação SSL/TLS Básica
 
         Args:
             url: URL do website a verificar
+            snapshot: Resposta já descarregada (se None, é feito o fetch)
 
         Returns:
-            Dict com status SSL básico
+            Dict com a secção SSL básica (findings e protocolo)
         """
         try:
+            snapshot = snapshot or fetch_snapshot(url, self.http_client)
+
+            if snapshot.ssl_error:
+                return {"ssl": {"findings": [Finding.of("ssl.handshake_error", snapshot.ssl_error)]}}
+            if snapshot.error:
+                return {"ssl": {"findings": [Finding.of("ssl.error", snapshot.error)]}}
+
             # Verificar se o URL original é HTTP ou HTTPS
             original_is_http = url.startswith("http://")
 
-            # Seguir redirects para verificar o SSL do destino final
-            response = requests.get(url, timeout=10, allow_redirects=True)
+            # O snapshot seguiu os redirects: verificar o SSL do destino final
+            final_is_https = snapshot.final_url.startswith("https://")
 
             # Se chegou aqui sem erro de SSL, o certificado é válido
-            ssl_info = {
-                "status": "✅ SSL Válido" if response.url.startswith("https://") else "❌ Sem SSL",
-                "protocol": "TLS/HTTPS" if response.url.startswith("https://") else "HTTP",
-            }
+            findings = [Finding.of("ssl.valid" if final_is_https else "ssl.missing")]
 
             # Adicionar informação sobre redirect se aplicável
-            if original_is_http and response.url.startswith("https://"):
-                ssl_info["note"] = "URL original HTTP redirecionou para HTTPS"
-
-            if hasattr(response, 'cert'):
-                ssl_info["cert_info"] = response.cert
+            if original_is_http and final_is_https:
+                findings.append(Finding.of("ssl.redirected"))
 
-            return {"ssl": ssl_info}
-        except requests.exceptions.SSLError as e:
-            return {"ssl": {"status": "❌ Erro de SSL", "details": str(e)}}
+            return {"ssl": {"findings": findings, "protocol": "TLS/HTTPS" if final_is_https else "HTTP"}}
         except Exception as e:
-            return {"ssl": {"status": "❌ Erro ao verificar SSL", "details": str(e)}}
+            return {"ssl": {"findings": [Finding.of("ssl.error", e)]}}
 
-    def check_advanced(self, url: str) -> Dict[str, Any]:
+    def check_advanced(self, url: str, snapshot: Optional[ResponseSnapshot] = None) -> Dict[str, Any]:
         """
         Verificação SSL/TLS Avançada
 
@@ -60,19 +70,27 @@ class SSLChecker:
 
         Args:
             url: URL do website a verificar
+            snapshot: Resposta já descarregada; se trouxer o certificado da
+                ligação final, evita-se um novo handshake TLS (e a cache de
+                certificados também evita o handshake enquanto for válida)
 
         Returns:
-            Dict com análise SSL avançada
+            Dict com a secção SSL avançada (findings e dados do certificado)
         """
         try:
-            # Usar a classe CheckSSL existente
-            ssl_result = CheckSSL.verifica_ssl(url)
+            if snapshot and snapshot.peer_cert:
+                final_url = urlparse(snapshot.final_url)
+                ssl_result = CheckSSL.processar_certificado(final_url.hostname, snapshot.peer_cert, snapshot.tls_version)
+                # Partilhar com outros websites servidos pelo mesmo host
+                CheckSSL.guardar_na_cache(final_url.hostname, ssl_result, final_url.port or 443)
+            else:
+                # Usar a classe CheckSSL existente (serve da cache enquanto válido)
+                ssl_result = CheckSSL.verifica_ssl(url)
 
             if not ssl_result.get('valido'):
                 return {
                     "ssl_advanced": {
-                        "status": "❌ Certificado Inválido",
-                        "error": ssl_result.get('erro', 'Erro desconhecido'),
+                        "findings": [Finding.of("ssl.cert_invalid", ssl_result.get('erro', 'Erro desconhecido'))],
                         "details": ssl_result.get('detalhes', '')
                     }
                 }
@@ -82,50 +100,46 @@ class SSLChecker:
             emissor = ssl_result.get('emissor', {})
             protocolo = ssl_result.get('protocolo_ssl', 'Desconhecido')
 
-            issues = []
-            warnings = []
+            findings = []
 
             # Verificar expiração
             if dias_restantes is not None:
                 if dias_restantes < 0:
-                    issues.append(f"❌ Certificado EXPIRADO há {abs(dias_restantes)} dias")
+                    findings.append(Finding.of("ssl.expired", abs(dias_restantes)))
                 elif dias_restantes <= 7:
-                    issues.append(f"🚨 CRÍTICO: Expira em {dias_restantes} dias")
+                    findings.append(Finding.of("ssl.expiring_critical", dias_restantes))
                 elif dias_restantes <= 30:
-                    warnings.append(f"⚠️  Expira em breve: {dias_restantes} dias")
+                    findings.append(Finding.of("ssl.expiring_soon", dias_restantes))
                 else:
-                    warnings.append(f"✅ Válido por {dias_restantes} dias")
+                    findings.append(Finding.of("ssl.valid_for", dias_restantes))
 
             # Verificar versão TLS
             if protocolo:
                 if 'TLSv1.3' in protocolo:
-                    warnings.append("✅ TLS 1.3 (mais seguro)")
+                    findings.append(Finding.of("ssl.tls13"))
                 elif 'TLSv1.2' in protocolo:
-                    warnings.append("✅ TLS 1.2 (seguro)")
+                    findings.append(Finding.of("ssl.tls12"))
                 elif 'TLSv1.1' in protocolo or 'TLSv1.0' in protocolo:
-                    issues.append(f"❌ {protocolo} - versão obsoleta e insegura")
+                    findings.append(Finding.of("ssl.tls_obsolete", protocolo))
                 elif 'SSLv' in protocolo:
-                    issues.append(f"❌ {protocolo} - EXTREMAMENTE INSEGURO")
+                    findings.append(Finding.of("ssl.sslv", protocolo))
 
             # Informações do emissor
             ca_name = emissor.get('organizationName', 'Desconhecido')
 
             return {
                 "ssl_advanced": {
-                    "status": "✅ Análise Completa" if not issues else "⚠️  Problemas Detectados",
+                    "findings": findings,
                     "dias_restantes": dias_restantes,
                     "valido_ate": ssl_result.get('valido_ate'),
                     "protocolo": protocolo,
-                    "emissor": ca_name,
-                    "issues": issues,
-                    "info": warnings
+                    "emissor": ca_name
                 }
             }
 
         except Exception as e:
             return {
                 "ssl_advanced": {
-                    "status": "❌ Erro na análise",
-                    "error": str(e)
+                    "findings": [Finding.of("ssl.analysis_error", e)]
                 }
             }
@@ -4,14 +4,23 @@ Common Vulnerabilities Checker
 Verifica vulnerabilidades comuns em websites.
 """
 
-from typing import Dict, Any, List
-import requests
+from typing import Dict, Any, List, Optional
+from domain.findings import Finding
+from services.http_client import HttpClient, get_default_client
+from .response_snapshot import ResponseSnapshot, fetch_snapshot
 
 
 class VulnerabilityChecker:
     """Checker para vulnerabilidades comuns"""
 
-    def check(self, url: str) -> Dict[str, Any]:
+    def __init__(self, http_client: Optional[HttpClient] = None):
+        """
+        Args:
+            http_client: Cliente HTTP partilhado (por omissão, o do processo)
+        """
+        self.http_client = http_client or get_default_client()
+
+    def check(self, url: str, snapshot: Optional[ResponseSnapshot] = None) -> Dict[str, Any]:
         """
         Verificação de vulnerabilidades comuns
 
@@ -24,38 +33,41 @@ class VulnerabilityChecker:
 
         Args:
             url: URL do website a verificar
+            snapshot: Resposta já descarregada (se None, é feito o fetch)
 
         Returns:
-            Dict com lista de vulnerabilidades encontradas
+            Dict com a secção de vulnerabilidades encontradas
         """
         vulnerabilities = []
 
         try:
-            response = requests.get(url, timeout=10)
-            headers = response.headers
-            cookies = response.cookies
+            snapshot = snapshot or fetch_snapshot(url, self.http_client)
+            if snapshot.error:
+                return {"vulnerabilities": {"findings": [Finding.of("vuln.error", snapshot.error)]}}
+
+            headers = snapshot.headers
 
             # Verificar cookies sem HttpOnly
-            for cookie in cookies:
-                if 'HttpOnly' not in str(cookie):
-                    vulnerabilities.append("⚠️  Cookie sem flag HttpOnly")
+            for cookie in snapshot.cookies():
+                if not cookie["httponly"]:
+                    vulnerabilities.append(Finding.of("vuln.cookie_httponly", cookie["name"]))
 
             # Verificar HSTS
             if "Strict-Transport-Security" not in headers:
-                vulnerabilities.append("⚠️  Sem HSTS header (man-in-the-middle risk)")
+                vulnerabilities.append(Finding.of("vuln.no_hsts"))
 
             # Verificar CSP
             if "Content-Security-Policy" not in headers:
-                vulnerabilities.append("⚠️  Sem Content-Security-Policy (XSS risk)")
+                vulnerabilities.append(Finding.of("vuln.no_csp"))
 
             # Verificar Server header exposto
             if "Server" in headers:
-                vulnerabilities.append(f"⚠️  Server header exposto: {headers['Server']}")
+                vulnerabilities.append(Finding.of("vuln.server_header", headers["Server"]))
 
             # Verificar X-Powered-By exposto
             if "X-Powered-By" in headers:
-                vulnerabilities.append(f"⚠️  X-Powered-By exposto: {headers['X-Powered-By']}")
+                vulnerabilities.append(Finding.of("vuln.powered_by", headers["X-Powered-By"]))
 
-            return {"vulnerabilities": vulnerabilities}
+            return {"vulnerabilities": {"findings": vulnerabilities}}
         except Exception as e:
-            return {"vulnerabilities": [f"Erro ao verificar: {str(e)}"]}
+            return {"vulnerabilities": {"findings": [Finding.of("vuln.error", e)]}}
@@ -1,17 +1,24 @@
 # src/ui/__init__.py
 """
 Pacote UI - Módulos de interface do Streamlit
+
+As funções são importadas só quando acedidas: importar `ui.x` não carrega
+os restantes módulos (em particular o workflow de segurança).
 """
-from .sidebar import render_sidebar
+from importlib import import_module
+
+_EXPORTS = {
+    'render_sidebar': '.sidebar',
+    'render_upload_data': '.upload_data',
+    'render_company_selector': '.company_selector',
+    'render_company_details': '.company_details',
+    'render_website_analysis': '.website_analysis.website_analysis_ui',
+}
+
+__all__ = list(_EXPORTS)
 
-from .company_selector import render_company_selector
-from .company_details import render_company_details
-from .website_analysis.website_analysis_ui import render_website_analysis
 
-__all__ = [
-    'render_sidebar',
-    'render_upload_data',
-    'render_company_selector',
-    'render_company_details',
-    'render_website_analysis'
-]
\ No newline at end of file
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name], __name__), name)
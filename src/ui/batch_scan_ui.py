@@ -0,0 +1,199 @@
+# src/ui/batch_scan_ui.py
+"""
+Módulo UI: Scan de segurança em batch (todas as empresas do dataset)
+"""
+import streamlit as st
+import pandas as pd
+from typing import Any, Dict, Optional
+
+from services.deadline import DEFAULT_SCAN_BUDGET
+from services.risk_scoring import COUNT_COLUMNS, CategoryWeight, RiskWeights, default_weights, score_table
+from ui.jobs import (JOB_POLL_SECONDS, get_queue, get_session_job, job_items, job_items_tail, render_cancel_button,
+                     render_job_outcome)
+
+# Nome de cada categoria do risk score nos controlos de pesos
+_WEIGHT_LABELS = {
+    "vulnerabilities": "Vulnerabilities",
+    "critical_exposed": "Critical files",
+    "ssl_issues": "SSL issues",
+    "cookie_issues": "Cookie issues",
+}
+
+
+def render_batch_scan(df: pd.DataFrame):
+    """
+    Renderiza os controlos e os resultados do scan em batch
+
+    Args:
+        df: DataFrame carregado no Upload Data (coluna Website)
+    """
+    st.markdown(f"**Dataset:** {len(df):,} companies")
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        max_workers = st.slider("Concurrent scans", 1, 64, 8, key="batch_max_workers")
+    with col2:
+        limit = st.number_input("Rows to scan (0 = all)", min_value=0, value=0, step=100, key="batch_limit")
+    with col3:
+        llm_top_n = st.number_input(
+            "🤖 LLM analysis for top-N riskiest (0 = none)", min_value=0, value=0, step=5, key="batch_llm_top_n"
+        )
+    with col4:
+        budget = st.number_input(
+            "⏱️ Time budget per site (s)", min_value=5, max_value=300, value=int(DEFAULT_SCAN_BUDGET) or 45,
+            step=5, key="batch_budget"
+        )
+
+    if st.button("🚀 Start Batch Scan", type="primary", use_container_width=True):
+        target_df = df.head(int(limit)) if limit else df
+        st.session_state.batch_job_id = _submit_batch_scan(target_df, max_workers, int(llm_top_n), float(budget))
+
+    # O batch corre em background: mudar de página não o interrompe
+    job = get_session_job("batch_job_id")
+    if job is None:
+        return
+    if job.status == "failed":
+        render_job_outcome(job)
+        return
+
+    if not job.done:
+        _poll_batch_job(job.id)
+        return
+
+    if job.status == "cancelled":
+        st.warning(f"🚫 Batch cancelado: {job.meta.get('completed', 0):,} websites analisados")
+
+    result = job.result or {}
+    _render_batch_results(_batch_results(job.id, result.get("llm_analysis", {})))
+    _render_batch_timings(pd.DataFrame(result.get("timings", [])), pd.DataFrame(result.get("histogram", [])))
+
+
+def _submit_batch_scan(df: pd.DataFrame, max_workers: int, llm_top_n: int = 0,
+                       budget: Optional[float] = None) -> str:
+    """Coloca o batch na fila de jobs e devolve o id"""
+    website = df["Website"].where(df["Website"].notna(), "")
+    rows = [
+        {"index": index, "Nome": nome, "Website": site}
+        for index, nome, site in zip(df.index, df["Nome"], website)
+    ]
+    params = {"max_workers": max_workers, "llm_top_n": llm_top_n, "budget": budget}
+    # As linhas ficam uma só vez na fila (job_inputs); o job guarda o hash
+    return get_queue().submit("batch_scan", params, inputs=rows)
+
+
+def _batch_results(job_id: str, llm_analysis: Dict[str, str]) -> pd.DataFrame:
+    """Tabela de resultados a partir das linhas emitidas pelo job"""
+    results = pd.DataFrame(job_items(job_id))
+    if llm_analysis and not results.empty:
+        results["llm_analysis"] = results["url"].map(llm_analysis)
+    return results
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def _poll_batch_job(job_id: str):
+    """Atualiza progresso, métricas e tabela enquanto o batch corre"""
+    job = get_queue().get(job_id)
+    if job is None or job.done:
+        # Tabela final desenhada pelo rerun completo da página
+        st.rerun()
+
+    meta = job.meta
+    completed, total = meta.get("completed", 0), meta.get("total", 0)
+    col_progress, col_cancel = st.columns([5, 1])
+    with col_progress:
+        if meta.get("message") == "llm_top_n":
+            st.progress(1.0, text="🤖 A gerar análise LLM para os websites de maior risco...")
+        elif job.status == "running":
+            st.progress(job.progress, text=f"{completed:,}/{total:,} websites")
+        else:
+            st.progress(0.0, text="⏳ Na fila...")
+    with col_cancel:
+        render_cancel_button(job, key=f"cancel_{job_id}")
+
+    if meta:
+        _render_batch_metrics(meta)
+        if meta.get("hosts"):
+            st.caption(f"🔗 {total:,} linhas → {meta['hosts']:,} websites únicos (um scan por website)")
+
+    rows, total_rows = job_items_tail(job_id)
+    if rows:
+        if total_rows > len(rows):
+            st.caption(f"A mostrar os últimos {len(rows):,} de {total_rows:,} resultados")
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+
+def _render_batch_metrics(meta: Dict[str, Any]):
+    """Renderiza throughput, ETA e erros (metadados de progresso do job)"""
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("✅ Scanned", f"{meta.get('completed', 0):,}/{meta.get('total', 0):,}")
+    col2.metric("⚡ Throughput", f"{meta.get('sites_per_minute', 0.0):.1f} sites/min")
+    col3.metric("⏳ ETA", _format_eta(meta.get("eta_seconds")))
+    col4.metric("❌ Errors", meta.get("failed", 0))
+
+
+def _render_batch_results(results: pd.DataFrame):
+    """Renderiza a tabela final ordenada por risco e o download CSV"""
+    st.markdown("---")
+    st.subheader("📊 Batch Results")
+
+    if results.empty:
+        st.info("Sem resultados")
+        return
+
+    # Novos pesos só voltam a pontuar a tabela (as contagens já estão nas colunas)
+    results = score_table(results, _render_risk_weights())
+    results = results.sort_values("risk_rank", na_position="last")
+
+    st.dataframe(results, use_container_width=True, hide_index=True)
+    st.download_button(
+        label="💾 Exportar CSV",
+        data=results.to_csv(index=False).encode("utf-8"),
+        file_name="batch_security_scan.csv",
+        mime="text/csv"
+    )
+
+
+def _render_risk_weights() -> RiskWeights:
+    """Controlos dos pesos do risk score (pontos por finding e máximo por categoria)"""
+    defaults = default_weights()
+    changes = {}
+    with st.expander("⚖️ Risk score weights"):
+        for column, container in zip(COUNT_COLUMNS, st.columns(len(COUNT_COLUMNS))):
+            default = getattr(defaults, column)
+            with container:
+                st.markdown(f"**{_WEIGHT_LABELS[column]}**")
+                points = st.number_input("Points per finding", min_value=0.0, value=float(default.points),
+                                         step=1.0, key=f"risk_points_{column}")
+                cap = st.number_input("Max points", min_value=0.0, max_value=100.0, value=float(default.cap),
+                                      step=5.0, key=f"risk_cap_{column}")
+            changes[column] = CategoryWeight(points, cap)
+    return RiskWeights(**changes)
+
+
+def _render_batch_timings(summary: pd.DataFrame, histogram: pd.DataFrame):
+    """Renderiza onde o tempo dos scans foi gasto (por node)"""
+    if summary.empty:
+        return
+
+    with st.expander("⏱️ Timings por check"):
+        st.dataframe(summary, use_container_width=True, hide_index=True)
+        st.bar_chart(summary.set_index("node")["p95_ms"])
+
+        if not histogram.empty:
+            st.caption("Distribuição do tempo total por website (ms)")
+            st.bar_chart(histogram.set_index("from_ms")["count"])
+
+        st.download_button(
+            label="💾 Exportar timings (CSV)",
+            data=summary.to_csv(index=False).encode("utf-8"),
+            file_name="batch_timings.csv",
+            mime="text/csv"
+        )
+
+
+def _format_eta(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "—"
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m" if hours else f"{minutes}m {secs:02d}s"
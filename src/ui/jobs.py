@@ -0,0 +1,83 @@
+# src/ui/jobs.py
+"""
+Módulo UI: Acompanhamento de jobs em background
+
+As páginas guardam apenas o id do job em st.session_state e desenham o
+estado atual a cada rerun; enquanto o job corre, um st.fragment com
+run_every volta a consultar a fila sem repetir o resto da página.
+"""
+import streamlit as st
+from typing import Any, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from orchestration.job_queue import Job, JobQueue
+
+# Intervalo entre consultas ao estado de um job em curso (segundos)
+JOB_POLL_SECONDS = 1.0
+
+# Resultados parciais mostrados enquanto um job corre
+JOB_ITEMS_PAGE = 200
+
+
+def get_queue() -> "JobQueue":
+    """Fila de jobs do processo (import tardio)"""
+    from orchestration.job_queue import get_job_queue
+    return get_job_queue()
+
+
+def get_session_job(state_key: str) -> Optional["Job"]:
+    """Job cujo id está em st.session_state[state_key] (limpa ids que já não existem)"""
+    job_id = st.session_state.get(state_key)
+    if not job_id:
+        return None
+
+    job = get_queue().get(job_id)
+    if job is None:
+        del st.session_state[state_key]
+    return job
+
+
+def job_items(job_id: str, after: int = 0, limit: Optional[int] = None) -> List[Any]:
+    """
+    Resultados parciais do job, lidos da fila (não ficam em st.session_state)
+
+    Args:
+        job_id: Id do job
+        after: Saltar os primeiros `after` items
+        limit: Máximo de items (None = todos)
+    """
+    return [item for _, item in get_queue().items(job_id, after=after, limit=limit)]
+
+
+def job_items_tail(job_id: str, limit: int = JOB_ITEMS_PAGE) -> Tuple[List[Any], int]:
+    """
+    Últimos resultados parciais do job (para mostrar enquanto corre)
+
+    Returns:
+        (até `limit` items mais recentes, total de items do job)
+    """
+    total = get_queue().item_count(job_id)
+    return job_items(job_id, after=max(total - limit, 0), limit=limit), total
+
+
+def render_job_outcome(job: "Job") -> bool:
+    """
+    Mostra o erro ou o cancelamento de um job terminado sem sucesso.
+
+    Returns:
+        True se o job falhou ou foi cancelado
+    """
+    if job.status == "failed":
+        st.error(f"❌ O job falhou: {job.error}")
+        return True
+    if job.status == "cancelled":
+        st.warning("🚫 Job cancelado")
+        return True
+    return False
+
+
+def render_cancel_button(job: "Job", key: str):
+    """Botão para cancelar um job em curso"""
+    if st.button("⏹️ Cancelar", key=key):
+        get_queue().cancel(job.id)
+        st.rerun()
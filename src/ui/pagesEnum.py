@@ -8,3 +8,4 @@ class Pages(Enum):
     COMPANY_DETAILS = "pages/04_Company_Details.py"
     DATA_ANALYSIS = "pages/05_Data_Analysis.py"
     SETTINGS = "pages/06_Settings.py"
+    BATCH_SCAN = "pages/05_🛰️Batch_Security_Scan.py"
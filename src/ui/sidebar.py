@@ -6,6 +6,9 @@ import streamlit as st
 import os
 from dotenv import dotenv_values
 
+# Chave em st.session_state da temperatura escolhida na sidebar
+LLM_TEMPERATURE_KEY = "llm_temperature"
+
 
 def render_sidebar():
     """
@@ -23,9 +26,8 @@ def render_sidebar():
         else:
             st.error("❌ API Key não encontrada no .env")
         
-        # Slider de temperatura
-        model_temp = st.slider("Temperatura do Modelo", 0.0, 1.0, 0.3)
-
+        # Slider de temperatura (usada na avaliação do website)
+        st.slider("Temperatura do Modelo", 0.0, 1.0, _default_temperature(), key=LLM_TEMPERATURE_KEY)
         
         
         # Informações adicionais
@@ -41,4 +43,10 @@ def render_sidebar():
             - 🔍 Avaliação de websites
             - 🔒 Análise de segurança
             - 📊 Relatórios detalhados
-            """)
\ No newline at end of file
+            """)
+
+
+def _default_temperature() -> float:
+    """Temperatura do perfil "precise" em config_llm.yaml"""
+    from services.llm import get_llm_registry
+    return get_llm_registry().profile("precise").temperature
@@ -1,7 +1,5 @@
 import pandas as pd
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
 
 def render_upload_data():
 
@@ -74,6 +72,9 @@ def _render_dataset_analytics(df: pd.DataFrame):
     """
     Renderiza análises visuais do dataset carregado
     """
+    # plotly só é importado quando há dataset para mostrar
+    import plotly.graph_objects as go
+
     st.markdown("---")
     st.subheader("📊 Análise do Dataset")
 
@@ -1,6 +1,7 @@
 
 from typing import Any, Dict
 import streamlit as st
+from domain.findings import Severity, findings, select, status_label
 
 def _render_cookie_details(report: Dict[str, Any]):
     """Renderiza detalhes de cookies"""
@@ -8,13 +9,14 @@ def _render_cookie_details(report: Dict[str, Any]):
         cookies = report.get("cookie_security", {})
 
         if cookies:
-            st.markdown(f"**Status:** {cookies.get('status', 'N/A')}")
+            st.markdown(f"**Status:** {status_label('cookie_security', cookies)}")
             st.markdown(f"**Cookies Analisados:** {cookies.get('cookies_analyzed', 0)}")
 
-            if cookies.get('issues'):
+            issues = select(findings(cookies))
+            if issues:
                 st.warning("**Problemas Detectados:**")
-                for issue in cookies['issues'][:5]:  # Mostrar só os 5 primeiros
-                    st.markdown(f"- {issue}")
+                for issue in issues[:5]:  # Mostrar só os 5 primeiros
+                    st.markdown(f"- {issue.label}")
             else:
                 st.success("✅ Nenhum problema detectado")
         else:
@@ -24,14 +26,16 @@ def _render_cookie_details(report: Dict[str, Any]):
 def _render_headers_details(report: Dict[str, Any]):
     """Renderiza detalhes de headers"""
     with st.expander("📋 **Headers de Segurança**"):
-        headers = report.get("headers_check", {})
+        headers = findings(report.get("headers_check"))
 
         if headers:
-            for header, status in headers.items():
-                if "✅" in status:
-                    st.success(f"**{header}**: {status}")
+            for finding in headers:
+                if finding.severity == Severity.OK:
+                    st.success(f"**{finding.evidence[0]}**: {finding.label}")
+                elif finding.severity == Severity.UNKNOWN:
+                    st.error(finding.label)
                 else:
-                    st.error(f"**{header}**: {status}")
+                    st.error(f"**{finding.evidence[0]}**: {finding.label}")
         else:
             st.info("Sem dados de headers")
 
@@ -41,7 +45,7 @@ def _render_ssl_details(report: Dict[str, Any]):
         ssl_adv = report.get("ssl_advanced", {})
 
         if ssl_adv:
-            st.markdown(f"**Status:** {ssl_adv.get('status', 'N/A')}")
+            st.markdown(f"**Status:** {status_label('ssl_advanced', ssl_adv)}")
 
             if ssl_adv.get('dias_restantes'):
                 dias = ssl_adv['dias_restantes']
@@ -54,14 +58,17 @@ def _render_ssl_details(report: Dict[str, Any]):
             if ssl_adv.get('emissor'):
                 st.markdown(f"**Emissor:** {ssl_adv['emissor']}")
 
-            if ssl_adv.get('issues'):
+            issues = select(findings(ssl_adv), Severity.HIGH)
+            if issues:
                 st.error("**Problemas:**")
-                for issue in ssl_adv['issues']:
-                    st.markdown(f"- {issue}")
+                for issue in issues:
+                    st.markdown(f"- {issue.label}")
 
-            if ssl_adv.get('info'):
-                for info in ssl_adv['info']:
-                    st.success(info)
+            for warning in select(findings(ssl_adv), Severity.LOW, Severity.MEDIUM):
+                st.warning(warning.label)
+
+            for info in select(findings(ssl_adv), Severity.OK, Severity.INFO):
+                st.success(info.label)
         else:
             st.info("Sem dados SSL avançados")
 
@@ -71,23 +78,28 @@ def _render_exposed_files(report: Dict[str, Any]):
         exposed = report.get("exposed_files", {})
 
         if exposed:
-            critical = exposed.get("critical_exposed", [])
-            warnings = exposed.get("warnings", [])
-            total = exposed.get("total_exposed", 0)
+            critical = select(findings(exposed), Severity.CRITICAL)
+            warnings = select(findings(exposed), Severity.LOW, Severity.HIGH)
+            total = len(critical) + len(warnings)
 
             st.markdown(f"**Total de arquivos verificados:** {total}")
 
             if critical:
                 st.error(f"**🚨 CRÍTICOS ({len(critical)}):**")
                 for item in critical:
-                    st.markdown(f"- {item}")
+                    st.markdown(f"- {item.label}")
             else:
                 st.success("✅ Nenhum arquivo crítico exposto")
 
             if warnings:
                 with st.expander(f"⚠️ Avisos ({len(warnings)})"):
                     for warn in warnings[:10]:  # Mostrar só os 10 primeiros
-                        st.markdown(f"- {warn}")
+                        st.markdown(f"- {warn.label}")
+
+            untested = exposed.get("untested") or []
+            if untested:
+                st.warning(f"⌛ {len(untested)} caminhos não foram testados dentro do prazo: "
+                           + ", ".join(untested))
         else:
             st.info("Sem dados de arquivos expostos")
 
@@ -95,11 +107,11 @@ def _render_exposed_files(report: Dict[str, Any]):
 def _render_vulnerabilities(report: Dict[str, Any]):
     """Renderiza vulnerabilidades"""
     with st.expander("⚠️ **Vulnerabilidades Detectadas**", expanded=True):
-        vulns = report.get("vulnerabilities", [])
+        vulns = findings(report.get("vulnerabilities"))
 
         if vulns:
             for vuln in vulns:
-                st.warning(vuln)
+                st.warning(vuln.label)
         else:
             st.success("✅ Nenhuma vulnerabilidade detectada!")
 
@@ -110,7 +122,7 @@ def _render_cms_detection(report: Dict[str, Any]):
         cms = report.get("cms_detection", {})
 
         if cms:
-            st.markdown(f"**Status:** {cms.get('status', 'N/A')}")
+            st.markdown(f"**Status:** {status_label('cms_detection', cms)}")
 
             if cms.get('cms'):
                 st.info(f"**CMS:** {cms['cms']}")
@@ -118,10 +130,10 @@ def _render_cms_detection(report: Dict[str, Any]):
                 if cms.get('version'):
                     st.markdown(f"**Versão:** {cms['version']}")
 
-                if cms.get('warnings'):
+                if findings(cms):
                     st.warning("**Avisos:**")
-                    for warn in cms['warnings']:
-                        st.markdown(f"- {warn}")
+                    for warn in findings(cms):
+                        st.markdown(f"- {warn.label}")
             else:
                 st.success("✅ Nenhum CMS conhecido detectado (pode ser site custom)")
         else:
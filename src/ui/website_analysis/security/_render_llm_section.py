@@ -33,3 +33,22 @@ def _render_llm_analysis(report: Dict[str, Any]):
             st.markdown('</div>', unsafe_allow_html=True)
     else:
         st.info("Nenhuma análise gerada")
+
+
+def _render_llm_stream(url: str):
+    """
+    Mostra a análise LLM em curso com o texto gerado até agora
+
+    Não bloqueia: é chamado a cada poll do fragment do job, que assim
+    continua a atualizar os painéis enquanto o modelo escreve. O texto
+    completo é desenhado por _render_llm_analysis quando o job termina
+    (e fica no relatório para o PDF).
+    """
+    from orchestration.security_workflow import llm_analysis_text
+
+    st.header("🤖 Análise Inteligente (GPT-3.5)")
+    text = llm_analysis_text(url)
+    if text:
+        st.markdown(text + " ▌")
+    else:
+        st.info("⏳ A gerar análise LLM...")
@@ -1,5 +1,6 @@
 from typing import Any, Dict
 import streamlit as st
+from domain.findings import Severity, count, findings
 
 def _render_quick_metrics(report: Dict[str, Any]):
     """Renderiza métricas rápidas"""
@@ -17,8 +18,7 @@ def _render_quick_metrics(report: Dict[str, Any]):
         )
 
     with col2:
-        headers = report.get("headers_check", {})
-        headers_ok = sum(1 for v in headers.values() if "✅" in str(v))
+        headers_ok = count(findings(report.get("headers_check")), Severity.OK, Severity.OK)
         st.metric(
             "📋 Headers Seguros",
             f"{headers_ok}/4",
@@ -26,7 +26,7 @@ def _render_quick_metrics(report: Dict[str, Any]):
         )
 
     with col3:
-        vulns = len(report.get("vulnerabilities", []))
+        vulns = count(findings(report.get("vulnerabilities")))
         st.metric(
             "⚠️ Vulnerabilidades",
             vulns,
@@ -35,8 +35,7 @@ def _render_quick_metrics(report: Dict[str, Any]):
         )
 
     with col4:
-        exposed = report.get("exposed_files", {})
-        critical = len(exposed.get("critical_exposed", []))
+        critical = count(findings(report.get("exposed_files")), Severity.CRITICAL)
         st.metric(
             "🚨 Arquivos Críticos",
             critical,
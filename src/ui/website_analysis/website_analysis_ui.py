@@ -3,33 +3,34 @@
 Módulo UI: Análise de Website (Tab: Relatório de Lead)
 """
 from .security._render_details import _render_cms_detection, _render_cookie_details, _render_exposed_files, _render_headers_details, _render_ssl_details, _render_vulnerabilities
-from .security._render_llm_section import _render_llm_analysis
+from .security._render_llm_section import _render_llm_analysis, _render_llm_stream
 from .security._render_metrics import _render_quick_metrics
 from .security._render_security_header import _render_risk_score_header
 import streamlit as st
 import pandas as pd
-import time
 from typing import Dict, Any, Union
+import importlib.util
 import json
 import os
 import re
 import unicodedata
-from orchestration.security_workflow import run_security_check
+from domain.findings import Severity, count, decode_report, findings, json_default, select, status_label
 from services.check_valid_url import is_valid_url
+from ui.jobs import JOB_POLL_SECONDS, get_queue, get_session_job, job_items, render_cancel_button, render_job_outcome
+from ui.sidebar import LLM_TEMPERATURE_KEY
 
-try:
-    from fpdf import FPDF
-    _CAN_EXPORT_PDF = True
-except Exception:
-    _CAN_EXPORT_PDF = False
+# Node do workflow -> (descrição, painel que mostra a sua secção)
+_SECURITY_PANELS = {
+    "check_ssl_advanced": ("Certificado SSL/TLS", _render_ssl_details),
+    "check_headers": ("Headers HTTP", _render_headers_details),
+    "check_cookie_security": ("Segurança de cookies", _render_cookie_details),
+    "check_vulnerabilities": ("Vulnerabilidades", _render_vulnerabilities),
+    "check_exposed_files": ("Ficheiros expostos", _render_exposed_files),
+    "check_cms_detection": ("Deteção de CMS", _render_cms_detection),
+}
 
-try:
-    from agents.categorization_agent import CategorizationAgent
-    from agents.website_agent import WebsiteAgent
-    from agents.needs_agent import NeedsAgent
-    from agents.classification_agent import ClassificationAgent
-except ImportError:
-    pass
+# fpdf e os agentes LLM só são importados quando usados (arranque mais rápido)
+_CAN_EXPORT_PDF = importlib.util.find_spec("fpdf") is not None
 
 
 def render_website_analysis(empresa_ou_url: Union[pd.Series, str]):
@@ -56,17 +57,24 @@ def render_website_analysis(empresa_ou_url: Union[pd.Series, str]):
         st.markdown(f"**URL:** `{url}`")
         st.markdown("---")
         
+        state_key = f"website_job_{url}"
         if(st.button("📧 Iniciar Verificação Completa", type="primary", use_container_width=True)):
-            _execute_analysis(url)
-            _avaliar_website(url)
-            _render_analysis_results(empresa)
+            if(is_valid_url(url)):
+                st.session_state[state_key] = get_queue().submit("website_evaluation", {
+                    "url": url,
+                    "temperature": st.session_state.get(LLM_TEMPERATURE_KEY),
+                })
+            else:
+                st.error(f"URL not Valid! url: {url}")
+
+        _render_website_evaluation_job(state_key, empresa)
 
 def _create_pdf_bytes(report: Dict[str, Any]) -> bytes:
     """Cria um PDF em memória com um resumo do relatório e retorna os bytes.
     Usa fpdf se disponível; caso contrário retorna JSON bytes (fallback)."""
     # Fallback para JSON quando PDF não estiver disponível
     if not _CAN_EXPORT_PDF:
-        return json.dumps(report, indent=2, ensure_ascii=False).encode("utf-8")
+        return json.dumps(report, indent=2, ensure_ascii=False, default=json_default).encode("utf-8")
 
     # Montar texto legível a partir do dicionário do report
     lines = []
@@ -88,17 +96,17 @@ def _create_pdf_bytes(report: Dict[str, Any]) -> bytes:
         dias = ssl_adv.get("dias_restantes", None)
         quick_metrics.append(f"SSL dias restantes: {dias}")
 
-    headers_check = report.get("headers_check", {})
+    headers_check = findings(report.get("headers_check"))
     if headers_check:
-        ok_count = sum(1 for v in headers_check.values() if "✅" in str(v))
-        quick_metrics.append(f"Headers seguros: {ok_count}/{len(headers_check)}")
+        ok_count = count(headers_check, Severity.OK, Severity.OK)
+        quick_metrics.append(f"Headers seguros: {ok_count}/{count(headers_check, Severity.OK)}")
 
-    vulns = report.get("vulnerabilities", [])
-    quick_metrics.append(f"Vulnerabilidades: {len(vulns)}")
+    vulns = select(findings(report.get("vulnerabilities")), Severity.UNKNOWN)
+    quick_metrics.append(f"Vulnerabilidades: {count(vulns)}")
 
     exposed = report.get("exposed_files", {})
-    critical = len(exposed.get("critical_exposed", []))
-    quick_metrics.append(f"Arquivos críticos expostos: {critical}")
+    critical_list = select(findings(exposed), Severity.CRITICAL)
+    quick_metrics.append(f"Arquivos críticos expostos: {len(critical_list)}")
 
     if quick_metrics:
         lines.append("Métricas Rápidas:")
@@ -109,38 +117,39 @@ def _create_pdf_bytes(report: Dict[str, Any]) -> bytes:
     if vulns:
         lines.append("Vulnerabilidades (lista):")
         for v in vulns[:30]:
-            lines.append(f"- {v}")
+            lines.append(f"- {v.label}")
         lines.append("")
 
     if exposed:
-        critical_list = exposed.get("critical_exposed", [])
-        warnings = exposed.get("warnings", [])
+        warnings = select(findings(exposed), Severity.LOW, Severity.HIGH)
         lines.append(f"Arquivos críticos ({len(critical_list)}):")
         for it in critical_list[:30]:
-            lines.append(f"- {it}")
+            lines.append(f"- {it.label}")
         lines.append("")
         if warnings:
             lines.append(f"Avisos ({len(warnings)}):")
             for w in warnings[:30]:
-                lines.append(f"- {w}")
+                lines.append(f"- {w.label}")
+            lines.append("")
+        if exposed.get("untested"):
+            lines.append(f"Não testados dentro do prazo: {', '.join(exposed['untested'])}")
             lines.append("")
 
     cms = report.get("cms_detection", {})
     if cms:
         lines.append("CMS Detectado:")
-        lines.append(f"- Status: {cms.get('status', 'N/A')}")
+        lines.append(f"- Status: {status_label('cms_detection', cms)}")
         if cms.get('cms'):
             lines.append(f"- CMS: {cms.get('cms')}")
         if cms.get('version'):
             lines.append(f"- Versão: {cms.get('version')}")
-        if cms.get('warnings'):
-            for w in cms.get('warnings', []):
-                lines.append(f"- {w}")
+        for w in findings(cms):
+            lines.append(f"- {w.label}")
         lines.append("")
 
     # Adicionar uma secção com JSON (resumida)
     lines.append("Dados brutos (JSON resumido):")
-    json_chunk = json.dumps(report, indent=2, ensure_ascii=False)
+    json_chunk = json.dumps(report, indent=2, ensure_ascii=False, default=json_default)
     if len(json_chunk) > 4000:
         lines.append(json_chunk[:4000] + "\n...TRUNCADO...")
     else:
@@ -165,6 +174,8 @@ def _create_pdf_bytes(report: Dict[str, Any]) -> bytes:
             return s_ascii
 
     # Gerar PDF com fpdf
+    from fpdf import FPDF
+
     pdf = FPDF()
     pdf.set_auto_page_break(True, margin=15)
     pdf.add_page()
@@ -206,36 +217,40 @@ def _create_pdf_bytes(report: Dict[str, Any]) -> bytes:
             output = output.encode("utf-8", errors="ignore")
     return output
 
-def _execute_analysis(url: str):
+def _render_website_evaluation_job(state_key: str, empresa: pd.Series):
     """
-    Executa a análise usando os agentes
+    Mostra a avaliação do website (job em background) se já foi pedida
 
     Args:
-        url: URL do website a analisar
+        state_key: Chave do session_state com o id do job
+        empresa: Series com dados da empresa
     """
-    with st.spinner("🤖 AI Agents Analyzing..."):
-        # Simular processamento
-        time.sleep(2)
-        # Executar agentes
-        if(is_valid_url(url)):
-
-            avaliacao_website = _avaliar_website(url)
-            # Armazenar resultados
-            st.session_state.analise_results = {
-                "avaliacao_website": avaliacao_website,
-            }
-        else:
-            st.error(f"URL not Valid! url: {url}")
-
-def _avaliar_website(url: str) -> str:
-    """Avalia o website usando o agente"""
-    try:
-        agent = WebsiteAgent()
-        result = agent.process({"url": url})
-        return result.get("avaliacao", "Não foi possível avaliar")
-    except Exception as e:
-        st.error(f"Erro na avaliação: {e}")
-        return "Erro na análise"
+    job = get_session_job(state_key)
+    if job is None or render_job_outcome(job):
+        return
+
+    if not job.done:
+        _poll_website_job(job.id)
+        return
+
+    # Armazenar resultados
+    st.session_state.analise_results = {
+        "avaliacao_website": job.result.get("avaliacao", "Não foi possível avaliar"),
+    }
+    _render_analysis_results(empresa)
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def _poll_website_job(job_id: str):
+    """Espera pela avaliação sem bloquear o resto da página"""
+    job = get_queue().get(job_id)
+    if job is None or job.done:
+        st.rerun()
+
+    col_status, col_cancel = st.columns([5, 1])
+    with col_status:
+        st.info("🤖 AI Agents Analyzing..." if job.status == "running" else "⏳ Na fila...")
+    with col_cancel:
+        render_cancel_button(job, key=f"cancel_{job_id}")
 
 def _render_analysis_results(empresa: pd.Series):
     """
@@ -302,47 +317,108 @@ def _render_website_evaluation(resultados: Dict):
 def render_security_section(url: str):
     """
     Renderiza análise de segurança completa com visualização melhorada
+
+    O scan corre como job em background: um rerun (ex: trocar de empresa
+    e voltar) não o interrompe nem o repete, apenas volta a mostrar o estado.
     """
 
     st.title("🔒 Security First!")
     st.markdown(f"**URL:** `{url}`")
     st.markdown("---")
 
-    if st.button("🚀 Iniciar Verificação Completa", type="primary", use_container_width=True):
-
-        # Progress bar
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-
-        status_text.text("🔍 Iniciando verificação de segurança...")
-        progress_bar.progress(10)
+    force_refresh = st.checkbox(
+        "🔄 Forçar nova verificação (ignorar cache)",
+        key=f"force_refresh_{url}",
+        help="Os resultados recentes ficam em cache e são partilhados entre sessões"
+    )
 
+    state_key = f"security_job_{url}"
+    if st.button("🚀 Iniciar Verificação Completa", type="primary", use_container_width=True):
         try:
-            # Executar workflow
-            status_text.text("🔐 Verificando SSL/TLS...")
-            progress_bar.progress(30)
-
-            report = run_security_check(url)
+            st.session_state[state_key] = get_queue().submit(
+                "security_scan", {"url": url, "force_refresh": force_refresh}
+            )
+        except Exception as e:
+            st.error(f"❌ Erro na verificação: {str(e)}")
 
-            status_text.text("✅ Análise concluída!")
-            progress_bar.progress(100)
-            time.sleep(0.5)
+    job = get_session_job(state_key)
+    if job is None or render_job_outcome(job):
+        return
 
-            # Limpar progress
-            progress_bar.empty()
-            status_text.empty()
+    if job.done:
+        if job.result.get("from_cache"):
+            st.caption("⚡ Resultados servidos a partir da cache")
+        _render_security_results(decode_report(job.result))
+    else:
+        _poll_security_job(job.id)
 
-            # Renderizar resultados
-            _render_security_results(report)
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def _poll_security_job(job_id: str):
+    """
+    Mostra o scan em curso: cada painel é desenhado assim que o respetivo
+    check termina e a análise LLM aparece no fim, com o texto gerado
+    até ao poll atual
+    """
+    job = get_queue().get(job_id)
+    if job is None or job.done:
+        # Resultado final desenhado pelo rerun completo da página
+        st.rerun()
+
+    partial: Dict[str, Any] = {}
+    finished = {}
+    report: Dict[str, Any] = {}
+    for item in job_items(job_id):
+        update = decode_report(item["update"])
+        if item["node"] == "final_report":
+            report = update
+        else:
+            partial.update(update)
+            finished[item["node"]] = update
+
+    col_progress, col_cancel = st.columns([5, 1])
+    with col_progress:
+        label = "🤖 A gerar análise LLM..." if report else "🔐 A correr verificações em paralelo..."
+        st.progress(job.progress, text=label if job.status == "running" else "⏳ Na fila...")
+    with col_cancel:
+        render_cancel_button(job, key=f"cancel_{job_id}")
+
+    # Relatórios da cache ou de websites inacessíveis aparecem de uma vez no fim
+    if report.get("from_cache") or report.get("reachable") is False:
+        return
+
+    if report:
+        _render_risk_score_header(report)
+        st.markdown("---")
+        _render_llm_stream(report["url"])
+        st.markdown("---")
+        _render_quick_metrics(report)
+        st.markdown("---")
 
-        except Exception as e:
-            st.error(f"❌ Erro na verificação: {str(e)}")
-            progress_bar.empty()
-            status_text.empty()
+    st.header("📊 Análise Detalhada")
+    col1, col2 = st.columns(2)
+    for index, (node, (label, renderer)) in enumerate(_SECURITY_PANELS.items()):
+        with col1 if index < 3 else col2:
+            update = finished.get(node)
+            if update is None:
+                st.info(f"⏳ {label}...")
+            elif update.get("timed_out"):
+                st.warning(f"⌛ {label}: a verificação não terminou dentro do prazo do scan")
+            else:
+                renderer(partial)
+
+def _render_unreachable(report: Dict[str, Any]):
+    """Renderiza o relatório de um website que não respondeu"""
+    st.error("🔌 O website não respondeu: as verificações de segurança não foram executadas")
+    for issue in findings(report.get("security_issues")):
+        st.markdown(f"- {issue.label}")
 
 def _render_security_results(report: Dict[str, Any]):
     """Renderiza resultados da análise de segurança"""
 
+    if report.get("reachable") is False:
+        _render_unreachable(report)
+        return
+
     # ========== HEADER: RISK SCORE ==========
     _render_risk_score_header(report)
 
@@ -373,9 +449,14 @@ def _render_security_results(report: Dict[str, Any]):
         _render_exposed_files(report)
         _render_cms_detection(report)
 
+    _render_report_export(report)
+
+def _render_report_export(report: Dict[str, Any]):
+    """Renderiza o JSON completo e as opções de exportação"""
+
     # ========== DADOS RAW (EXPANDIDO) ==========
     with st.expander("🔍 Ver Dados Técnicos Completos (JSON)"):
-        st.json(report)
+        st.json(json.dumps(report, ensure_ascii=False, default=json_default))
 
     # ========== EXPORTAÇÃO ==========
     st.markdown("---")
@@ -393,7 +474,7 @@ def _render_security_results(report: Dict[str, Any]):
         st.warning("Exportar para PDF requer a biblioteca 'fpdf'. Para habilitar, execute: pip install fpdf")
         st.download_button(
             label="Exportar JSON (fallback)",
-            data=json.dumps(report, indent=2, ensure_ascii=False).encode("utf-8"),
+            data=json.dumps(report, indent=2, ensure_ascii=False, default=json_default).encode("utf-8"),
             file_name="security_report.json",
             mime="application/json"
         )
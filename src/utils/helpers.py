@@ -0,0 +1,125 @@
+from typing import Dict, Iterable, Tuple
+from urllib.parse import urlsplit, urlunsplit
+import re
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normaliza um URL introduzido pelo utilizador ou vindo de um dataset.
+
+    - Remove espaços e acrescenta https:// quando falta o esquema
+    - Esquema e host em minúsculas, sem porta por omissão
+    - Remove o fragmento (#...) e garante o caminho "/"
+
+    Args:
+        url: URL em bruto (ex: "WWW.Empresa.pt", "http://x.pt:80/a#top")
+
+    Returns:
+        URL normalizado, ou string vazia se não houver URL
+    """
+    url = (url or "").strip()
+    if not url:
+        return ""
+
+    if "://" not in url:
+        url = "https://" + url
+
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+
+    try:
+        port = parts.port
+    except ValueError:
+        # Porta inválida: mantém-se só o host
+        port = None
+    if port and not (scheme == "http" and port == 80) and not (scheme == "https" and port == 443):
+        host = f"{host}:{port}"
+
+    return urlunsplit((scheme, host, parts.path or "/", parts.query, ""))
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    URL canónico do website de uma empresa (o que é efetivamente analisado).
+
+    Parte de normalize_url e, além disso:
+    - Converte hosts internacionalizados (IDN) para punycode
+    - Remove o ponto final do host ("x.pt." -> "x.pt")
+    - Descarta caminho e query: fica só a página inicial ("x.pt/contactos" -> "https://x.pt/")
+
+    Args:
+        url: URL em bruto
+
+    Returns:
+        URL canónico (ex: "https://www.xn--caf-dma.pt/"), ou string vazia
+        se não houver um host válido
+    """
+    url = normalize_url(url)
+    if not url:
+        return ""
+
+    parts = urlsplit(url)
+    host = (parts.hostname or "").rstrip(".")
+    try:
+        host = host.encode("idna").decode("ascii")
+    except UnicodeError:
+        return ""
+    # Valores como "n/a" ou "-" não são websites: exige-se um domínio com ponto
+    if not (_HOST_PATTERN.match(host) or host == "localhost"):
+        return ""
+
+    # normalize_url só mantém a porta quando não é a do esquema
+    netloc = f"{host}:{parts.port}" if parts.port else host
+    return urlunsplit((parts.scheme, netloc, "/", "", ""))
+
+
+def host_key(url: str) -> str:
+    """
+    Chave de agrupamento por website: host canónico sem "www.".
+
+    "http://x.pt", "https://www.x.pt/" e "x.pt/contactos" têm todos a
+    chave "x.pt". Uma porta não standard faz parte da chave.
+
+    Args:
+        url: URL em bruto
+
+    Returns:
+        Chave (ex: "x.pt", "x.pt:8080"), ou string vazia se não houver host válido
+    """
+    canonical = canonicalize_url(url)
+    if not canonical:
+        return ""
+
+    netloc = urlsplit(canonical).netloc
+    return netloc[4:] if netloc.startswith("www.") else netloc
+
+
+def scan_urls_by_host(urls: Iterable[str]) -> Dict[str, str]:
+    """
+    Escolhe o URL a analisar para cada host de uma lista.
+
+    Entre as variantes do mesmo host prefere-se um https:// explícito,
+    depois um http:// explícito e só então um URL sem esquema (que
+    normalize_url completa com https://); em caso de empate fica a primeira.
+
+    Args:
+        urls: URLs em bruto (ex: a coluna Website de um dataset)
+
+    Returns:
+        Dict host_key -> URL canónico (hosts inválidos são ignorados)
+    """
+    chosen: Dict[str, Tuple[int, str]] = {}
+    for url in urls:
+        key = host_key(url)
+        if not key:
+            continue
+
+        scheme = url.strip().lower().split("://", 1)[0] if "://" in url else ""
+        rank = {"https": 2, "http": 1}.get(scheme, 0)
+        if key not in chosen or rank > chosen[key][0]:
+            chosen[key] = (rank, canonicalize_url(url))
+    return {key: url for key, (_, url) in chosen.items()}
+
+
+_HOST_PATTERN = re.compile(r"^[a-z0-9_]([a-z0-9_-]*[a-z0-9_])?(\.[a-z0-9_]([a-z0-9_-]*[a-z0-9_])?)+$")
@@ -0,0 +1,125 @@
+"""Testes de agents.base_agent: chamadas ao LLM com rate limiting e novas tentativas"""
+
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.prompts import PromptTemplate
+
+from agents import base_agent
+from agents.base_agent import BaseAgent, LLMRequest
+from services.llm import rate_limit
+from services.llm.rate_limit import RateLimiter
+
+
+class RateLimitError(Exception):
+    pass
+
+
+class FakeLLM:
+    """Modelo falso: falha com 429 as primeiras `failures` tentativas"""
+
+    def __init__(self, failures=0, chunks=("Olá", " mundo"), usage=15):
+        self.failures = failures
+        self.chunks = chunks
+        self.usage = usage
+        self.calls = 0
+
+    def _attempt(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RateLimitError("429")
+
+    def _usage(self):
+        return {"input_tokens": 5, "output_tokens": self.usage - 5, "total_tokens": self.usage}
+
+    def invoke(self, prompt_value):
+        self._attempt()
+        return AIMessage(content="".join(self.chunks), usage_metadata=self._usage())
+
+    async def ainvoke(self, prompt_value):
+        return self.invoke(prompt_value)
+
+
+class FakeStream(FakeLLM):
+    """Stream que falha com 429 depois de `fail_after` pedaços nas primeiras `failures` tentativas"""
+
+    def __init__(self, failures=0, fail_after=0, **kwargs):
+        super().__init__(failures, **kwargs)
+        self.fail_after = fail_after
+
+    def stream(self, prompt_value):
+        self.calls += 1
+        for index, chunk in enumerate(self.chunks):
+            if self.calls <= self.failures and index == self.fail_after:
+                raise RateLimitError("429")
+            yield AIMessageChunk(content=chunk)
+
+
+class EchoAgent(BaseAgent):
+    def __init__(self, llm):
+        super().__init__("EchoAgent")
+        self.llm = llm
+        self.prompt = PromptTemplate.from_template("{texto}")
+        self.use_llm_cache = False
+
+    def _prepare(self, input_data):
+        return LLMRequest({"texto": input_data["texto"]})
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    # 1000 tokens de capacidade; cada pedido reserva 1 + 512 (DEFAULT_COMPLETION_TOKENS)
+    limiter = RateLimiter(rpm=6000, tpm=600, burst_seconds=100)
+    monkeypatch.setattr(base_agent, "get_rate_limiter", lambda: limiter)
+    monkeypatch.setattr(base_agent, "count_tokens", lambda text, model=None: 1)
+    monkeypatch.setattr(rate_limit, "backoff_delay", lambda attempt, error=None: 0)
+    return limiter
+
+
+def test_failed_attempts_return_their_reservation(limiter):
+    llm = FakeLLM(failures=2)
+    assert EchoAgent(llm).process({"texto": "x"}) == {"response": "Olá mundo"}
+    assert llm.calls == 3
+    assert limiter._tokens == pytest.approx(1000 - 15, abs=1)
+
+
+def test_failed_call_returns_reservation(limiter):
+    llm = FakeLLM(failures=10)
+    result = EchoAgent(llm).process({"texto": "x"})
+    assert "error" in result
+    assert limiter._tokens == pytest.approx(1000, abs=1)
+
+
+def test_async_failed_attempts_return_their_reservation(limiter):
+    llm = FakeLLM(failures=2)
+    assert asyncio.run(EchoAgent(llm).aprocess({"texto": "x"})) == {"response": "Olá mundo"}
+    assert limiter._tokens == pytest.approx(1000 - 15, abs=1)
+
+
+def test_success_without_usage_keeps_estimate(limiter):
+    class NoUsage(FakeLLM):
+        def invoke(self, prompt_value):
+            self._attempt()
+            return AIMessage(content="ok")
+
+    EchoAgent(NoUsage()).process({"texto": "x"})
+    assert limiter._tokens == pytest.approx(1000 - 513, abs=1)
+
+
+def test_stream_retried_before_first_token(limiter):
+    llm = FakeStream(failures=1, fail_after=0)
+    tokens = []
+    assert EchoAgent(llm).process({"texto": "x"}, on_token=tokens.append) == {"response": "Olá mundo"}
+    assert llm.calls == 2
+    assert tokens == ["Olá", " mundo"]
+
+
+def test_stream_not_retried_after_first_token(limiter):
+    llm = FakeStream(failures=1, fail_after=1)
+    tokens = []
+    result = EchoAgent(llm).process({"texto": "x"}, on_token=tokens.append)
+    assert "error" in result
+    assert llm.calls == 1
+    assert tokens == ["Olá"]
+    assert limiter._tokens == pytest.approx(1000, abs=1)
@@ -0,0 +1,65 @@
+"""Testes de cli.RowBatches: linhas processadas em lote"""
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+import pytest
+
+from cli import RowBatches
+
+
+def test_first_row_takes_following_rows():
+    batches = RowBatches({key: f"v{key}" for key in range(5)})
+    calls = []
+
+    def run(values):
+        calls.append(values)
+        return [{"value": value} for value in values]
+
+    assert batches.result(0, "v0", 3, run) == {"value": "v0"}
+    assert batches.result(1, "v1", 3, run) == {"value": "v1"}
+    assert batches.result(2, "v2", 3, run) == {"value": "v2"}
+    assert batches.result(3, "v3", 3, run) == {"value": "v3"}
+    assert calls == [["v0", "v1", "v2"], ["v3", "v4"]]
+
+
+def test_fit_limits_batch():
+    batches = RowBatches({key: f"v{key}" for key in range(5)})
+    calls = []
+
+    def run(values):
+        calls.append(values)
+        return [{} for _ in values]
+
+    batches.result(0, "v0", 5, run, fit=lambda candidates: 2)
+    assert calls == [["v0", "v1"]]
+
+
+def test_batch_error_reaches_every_row():
+    batches = RowBatches({0: "a", 1: "b"})
+
+    def run(values):
+        raise RuntimeError("falhou")
+
+    with pytest.raises(RuntimeError):
+        batches.result(0, "a", 2, run)
+    with pytest.raises(RuntimeError):
+        batches.result(1, "b", 2, run)
+
+
+def test_concurrent_rows_each_processed_once():
+    keys = list(range(40))
+    batches = RowBatches({key: key for key in keys})
+    seen = []
+    lock = threading.Lock()
+
+    def run(values):
+        with lock:
+            seen.extend(values)
+        return [{"value": value} for value in values]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda key: batches.result(key, key, 4, run), keys))
+
+    assert [result["value"] for result in results] == keys
+    assert sorted(seen) == keys
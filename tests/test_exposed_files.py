@@ -0,0 +1,85 @@
+"""Testes do PathProber e do ExposedFilesChecker: caminhos por testar no prazo"""
+
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+import time
+
+import requests
+
+from domain.findings import partial_sections, status_label
+from services.cache import ScanCache
+from services.security import ExposedFilesChecker
+from services.security.path_prober import NOT_PROBED, PathProber
+
+
+class FakeClient:
+    """HEAD com status, atraso ou exceção por caminho (404 por omissão)"""
+
+    def __init__(self, responses=None, delays=None):
+        self.responses = responses or {}
+        self.delays = delays or {}
+
+    def head(self, url, timeout=None, allow_redirects=True):
+        path = urlsplit(url).path
+        delay = self.delays.get(path, 0)
+        if delay > timeout:
+            time.sleep(timeout)
+            raise requests.exceptions.ReadTimeout(path)
+        time.sleep(delay)
+        response = self.responses.get(path, 404)
+        if isinstance(response, Exception):
+            raise response
+        return SimpleNamespace(status_code=response)
+
+
+def test_probe_statuses():
+    client = FakeClient({"/a": 200, "/b": 403, "/c": requests.exceptions.ConnectionError()})
+    statuses = PathProber(client).probe("https://x.pt", ["/a", "/b", "/c", "/d"])
+    assert statuses == {"/a": 200, "/b": 403, "/c": None, "/d": 404}
+
+
+def test_unanswered_paths_are_not_probed():
+    client = FakeClient({"/fast": 200}, delays={"/slow": 1.0})
+    statuses = PathProber(client, deadline=0.2, timeout=5).probe("https://x.pt", ["/fast", "/slow"])
+    assert statuses == {"/fast": 200, "/slow": NOT_PROBED}
+
+
+def test_request_timeout_is_not_probed():
+    client = FakeClient(delays={"/slow": 1.0})
+    statuses = PathProber(client, deadline=5, timeout=0.1).probe("https://x.pt", ["/slow"])
+    assert statuses == {"/slow": NOT_PROBED}
+
+
+def test_queued_paths_are_not_probed():
+    paths = [f"/{i}" for i in range(6)]
+    client = FakeClient(delays={path: 0.15 for path in paths})
+    statuses = PathProber(client, max_per_host=1, deadline=0.4).probe("https://fila.pt", paths)
+
+    assert NOT_PROBED in statuses.values()
+    assert None not in statuses.values()
+
+
+def test_checker_reports_untested_paths():
+    client = FakeClient({"/.git/HEAD": 200}, delays={"/.env": 1.0})
+    checker = ExposedFilesChecker(client, deadline=0.3)
+    section = checker.check("https://x.pt/")["exposed_files"]
+
+    assert section["partial"] is True
+    assert section["untested"] == ["/.env"]
+    assert [finding.code for finding in section["findings"]] == ["exposed.critical"]
+    assert partial_sections({"exposed_files": section, "url": "https://x.pt/"}) == ["exposed_files"]
+
+
+def test_checker_complete_section():
+    section = ExposedFilesChecker(FakeClient()).check("https://x.pt/")["exposed_files"]
+    assert section == {"findings": []}
+    assert status_label("exposed_files", section) == "✅ Sem problemas"
+
+
+def test_partial_section_label_and_cache(tmp_path):
+    section = {"findings": [], "partial": True, "untested": ["/.env"]}
+    assert status_label("exposed_files", section) == "⌛ Verificação incompleta (prazo esgotado)"
+
+    cache = ScanCache(tmp_path / "scan.sqlite3", ttls={"exposed_files": 100, "headers_check": 100}, version="t")
+    cache.put_report("https://x.pt/", {"exposed_files": section, "headers_check": {"findings": []}})
+    assert set(cache.get_sections("https://x.pt/")) == {"headers_check"}
@@ -0,0 +1,69 @@
+"""Testes de domain.findings: serialização compacta em JSON"""
+
+import json
+
+import pytest
+
+from domain.findings import (
+    CATALOG,
+    Category,
+    Finding,
+    Severity,
+    decode_report,
+    decode_section,
+    json_default,
+)
+
+
+def test_of_uses_catalog():
+    finding = Finding.of("ssl.expired", 12)
+    assert finding.severity is Severity.HIGH
+    assert finding.category is Category.SSL
+    assert finding.evidence == ("12",)
+    assert finding.label == "❌ Certificado EXPIRADO há 12 dias"
+
+
+def test_findings_without_evidence_are_shared():
+    assert Finding.of("ssl.valid") is Finding.of("ssl.valid")
+
+
+@pytest.mark.parametrize("code", sorted(CATALOG))
+def test_to_json_round_trip_every_code(code):
+    finding = Finding.of(code, "a", "b") if "{" in CATALOG[code][2] else Finding.of(code)
+    assert Finding.from_json(json.loads(json.dumps(finding.to_json()))) == finding
+
+
+def test_to_json_is_compact():
+    assert Finding.of("header.present", "Strict-Transport-Security", "max-age=1").to_json() == [
+        "header.present", "Strict-Transport-Security", "max-age=1"
+    ]
+    assert Finding.of("protocol.https").to_json() == ["protocol.https"]
+
+
+def test_from_json_accepts_finding():
+    finding = Finding.of("cookie.no_secure", "sid")
+    assert Finding.from_json(finding) is finding
+
+
+def test_from_json_unknown_code():
+    with pytest.raises(KeyError):
+        Finding.from_json(["codigo.inexistente"])
+
+
+def test_report_round_trip():
+    report = {
+        "ssl_advanced": {"findings": [Finding.of("ssl.tls13"), Finding.of("ssl.expiring_soon", 20)], "days": 20},
+        "cookie_security": {"findings": [], "cookies_analyzed": 0},
+        "cms_detection": {"cms": None},
+        "score": 42,
+    }
+    encoded = json.loads(json.dumps(report, default=json_default))
+
+    assert encoded["ssl_advanced"]["findings"] == [["ssl.tls13"], ["ssl.expiring_soon", "20"]]
+    assert decode_report(encoded) == report
+
+
+def test_decode_section_leaves_other_values():
+    assert decode_section(None) is None
+    assert decode_section("texto") == "texto"
+    assert decode_section({"findings": []}) == {"findings": []}
@@ -0,0 +1,46 @@
+"""Testes de utils.helpers: URL canónico e chave de host"""
+
+import pytest
+
+from utils.helpers import canonicalize_url, host_key, normalize_url
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("WWW.Empresa.pt", "https://www.empresa.pt/"),
+    ("http://x.pt:80/a?b=1#top", "http://x.pt/"),
+    ("https://x.pt:443/contactos", "https://x.pt/"),
+    ("x.pt.", "https://x.pt/"),
+    ("  https://x.pt:8080/loja ", "https://x.pt:8080/"),
+    ("café.pt", "https://xn--caf-dma.pt/"),
+    ("http://localhost:8000", "http://localhost:8000/"),
+])
+def test_canonicalize_url(raw, expected):
+    assert canonicalize_url(raw) == expected
+
+
+@pytest.mark.parametrize("raw", ["", None, "   ", "n/a", "-", "sem website"])
+def test_canonicalize_url_rejects_non_websites(raw):
+    assert canonicalize_url(raw) == ""
+
+
+def test_canonicalize_url_is_idempotent():
+    url = canonicalize_url("HTTP://WWW.Café.pt./x")
+    assert canonicalize_url(url) == url
+
+
+@pytest.mark.parametrize("raw", ["http://x.pt", "https://www.x.pt/", "x.pt/contactos", "X.PT."])
+def test_host_key_groups_variants(raw):
+    assert host_key(raw) == "x.pt"
+
+
+def test_host_key_keeps_non_standard_port():
+    assert host_key("https://www.x.pt:8080/") == "x.pt:8080"
+    assert host_key("http://x.pt:80/") == "x.pt"
+
+
+def test_host_key_invalid():
+    assert host_key("n/a") == ""
+
+
+def test_normalize_url_keeps_path():
+    assert normalize_url("x.pt/contactos#topo") == "https://x.pt/contactos"
@@ -0,0 +1,114 @@
+"""Testes de orchestration.job_queue: deduplicação, inputs, items e retoma"""
+
+import threading
+import time
+
+import pytest
+
+from orchestration.job_queue import INPUTS_PARAM, QUEUED, RUNNING, SUCCEEDED, JobQueue
+
+
+def wait_done(queue, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job.done:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"O job {job_id} não terminou")
+
+
+@pytest.fixture
+def release():
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def blocking_handlers(release):
+    def blocked(params, context):
+        release.wait(5)
+        return {"ok": True}
+
+    def emitting(params, context):
+        for value in context.inputs():
+            context.emit({"value": value})
+        return {"total": len(context.inputs())}
+
+    return {"blocked": blocked, "emitting": emitting}
+
+
+def test_same_params_reuse_active_job(tmp_path, release):
+    queue = JobQueue(tmp_path / "jobs.sqlite3", handlers=blocking_handlers(release))
+    first = queue.submit("blocked", {"url": "https://a.pt/"})
+
+    assert queue.submit("blocked", {"url": "https://a.pt/"}) == first
+    assert queue.submit("blocked", {"url": "https://b.pt/"}) != first
+
+    release.set()
+    wait_done(queue, first)
+    assert queue.submit("blocked", {"url": "https://a.pt/"}) != first
+    queue.shutdown()
+
+
+def test_inputs_are_deduplicated_by_content(tmp_path, release):
+    queue = JobQueue(tmp_path / "jobs.sqlite3", handlers=blocking_handlers(release))
+    first = queue.submit("blocked", {"budget": 1}, inputs=[{"url": "a.pt"}])
+
+    assert queue.submit("blocked", {"budget": 1}, inputs=[{"url": "a.pt"}]) == first
+    assert queue.submit("blocked", {"budget": 1}, inputs=[{"url": "b.pt"}]) != first
+
+    params = queue.get(first).params
+    assert set(params) == {"budget", INPUTS_PARAM}
+    assert queue._load_inputs(params[INPUTS_PARAM]) == [{"url": "a.pt"}]
+    queue.shutdown(wait=False)
+
+
+def test_items_paging_and_count(tmp_path, release):
+    queue = JobQueue(tmp_path / "jobs.sqlite3", handlers=blocking_handlers(release))
+    job = wait_done(queue, queue.submit("emitting", {}, inputs=list(range(10))))
+
+    assert job.status == SUCCEEDED
+    assert job.result == {"total": 10}
+    assert queue.item_count(job.id) == 10
+    assert [seq for seq, _ in queue.items(job.id, limit=3)] == [1, 2, 3]
+    assert queue.items(job.id, after=8) == [(9, {"value": 8}), (10, {"value": 9})]
+    assert queue.item_count("desconhecido") == 0
+    queue.shutdown()
+
+
+def test_unknown_kind_is_rejected(tmp_path, release):
+    queue = JobQueue(tmp_path / "jobs.sqlite3", handlers=blocking_handlers(release))
+    with pytest.raises(ValueError):
+        queue.submit("outro", {})
+    queue.shutdown()
+
+
+def test_interrupted_jobs_resume_on_restart(tmp_path, release):
+    path = tmp_path / "jobs.sqlite3"
+    interrupted = JobQueue(path, max_workers=1, handlers=blocking_handlers(release))
+    running = interrupted.submit("blocked", {"n": 1})
+    queued = interrupted.submit("blocked", {"n": 2})
+
+    deadline = time.monotonic() + 5
+    while interrupted.get(running).status != RUNNING and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert interrupted.get(running).status == RUNNING
+    assert interrupted.get(queued).status == QUEUED
+
+    resumed = []
+
+    def record(params, context):
+        resumed.append(params["n"])
+        return {"n": params["n"]}
+
+    restarted = JobQueue(path, handlers={"blocked": record})
+    for job_id in (running, queued):
+        job = wait_done(restarted, job_id)
+        assert job.status == SUCCEEDED
+        assert job.result == {"n": job.params["n"]}
+    assert sorted(resumed) == [1, 2]
+
+    release.set()
+    interrupted.shutdown()
+    restarted.shutdown()
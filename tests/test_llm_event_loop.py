@@ -0,0 +1,67 @@
+"""Testes de services.llm.event_loop: o loop partilhado das chamadas assíncronas"""
+
+import asyncio
+import concurrent.futures
+import threading
+
+import pytest
+
+from services.llm.event_loop import LLMEventLoop
+
+
+@pytest.fixture
+def loop():
+    loop = LLMEventLoop()
+    yield loop
+    loop.close()
+
+
+def test_run_returns_result(loop):
+    async def double(value):
+        await asyncio.sleep(0)
+        return value * 2
+
+    assert loop.run(double(21)) == 42
+
+
+def test_calls_from_many_threads_share_one_loop(loop):
+    async def current_loop():
+        await asyncio.sleep(0.01)
+        return id(asyncio.get_running_loop())
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
+        loops = set(pool.map(lambda _: loop.run(current_loop()), range(16)))
+    assert len(loops) == 1
+
+
+def test_errors_are_raised_in_caller(loop):
+    async def fail():
+        raise ValueError("x")
+
+    with pytest.raises(ValueError):
+        loop.run(fail())
+
+
+def test_timeout_cancels_coroutine(loop):
+    cancelled = threading.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(concurrent.futures.TimeoutError):
+        loop.run(slow(), timeout=0.05)
+    assert cancelled.wait(1)
+
+
+def test_run_inside_loop_is_rejected(loop):
+    async def nested():
+        async def inner():
+            return 1
+        loop.run(inner())
+
+    with pytest.raises(RuntimeError):
+        loop.run(nested())
@@ -0,0 +1,167 @@
+"""Testes de services.llm.rate_limit: reserva e acerto dos token buckets"""
+
+import asyncio
+
+import pytest
+
+from services.llm import rate_limit
+from services.llm.rate_limit import RateLimiter, call_with_retry, is_rate_limit_error
+
+
+class FakeClock:
+    """Substitui o módulo time: sleep faz avançar o relógio"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept += seconds
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+def limiter(rpm=600, tpm=6000, burst_seconds=10):
+    # 10 pedidos e 100 tokens por segundo; buckets de 100 pedidos e 1000 tokens
+    return RateLimiter(rpm=rpm, tpm=tpm, burst_seconds=burst_seconds)
+
+
+def test_acquire_within_capacity_does_not_wait(clock):
+    bucket = limiter()
+    assert bucket.acquire(400) == 400
+    assert bucket.acquire(600) == 600
+    assert clock.slept == 0
+
+
+def test_acquire_waits_for_deficit(clock):
+    bucket = limiter()
+    bucket.acquire(1000)
+    assert bucket.acquire(250) == 250
+    assert clock.slept == pytest.approx(2.5)
+
+
+def test_oversized_request_reserves_only_capacity(clock):
+    bucket = limiter()
+    assert bucket.acquire(5000) == 1000
+    assert clock.slept == 0
+    assert bucket._tokens == pytest.approx(0)
+
+
+def test_settle_refunds_unused_tokens(clock):
+    bucket = limiter()
+    reserved = bucket.acquire(800)
+    bucket.settle(reserved, 300)
+    assert bucket._tokens == pytest.approx(700)
+
+
+def test_settle_charges_extra_tokens(clock):
+    bucket = limiter()
+    reserved = bucket.acquire(200)
+    bucket.settle(reserved, 500)
+    assert bucket._tokens == pytest.approx(500)
+
+
+def test_settle_oversized_refund_is_bounded_by_reservation(clock):
+    bucket = limiter()
+    reserved = bucket.acquire(5000)
+    bucket.settle(reserved, 100)
+    # Só os 1000 reservados contam: devolve 900, não 4900
+    assert bucket._tokens == pytest.approx(900)
+
+
+def test_settle_never_exceeds_capacity(clock):
+    bucket = limiter()
+    reserved = bucket.acquire(500)
+    clock.now += 60
+    bucket.settle(reserved, 0)
+    assert bucket._tokens == pytest.approx(1000)
+
+
+def test_settle_without_usage_keeps_reservation(clock):
+    bucket = limiter()
+    bucket.settle(bucket.acquire(500), None)
+    assert bucket._tokens == pytest.approx(500)
+
+
+def test_refill_over_time(clock):
+    bucket = limiter()
+    bucket.acquire(1000)
+    clock.now += 3
+    assert bucket.acquire(300) == 300
+    assert clock.slept == 0
+
+
+def test_aacquire_matches_acquire(clock, monkeypatch):
+    waits = []
+
+    async def fake_sleep(seconds):
+        waits.append(seconds)
+
+    monkeypatch.setattr(rate_limit.asyncio, "sleep", fake_sleep)
+    bucket = limiter()
+    assert asyncio.run(bucket.aacquire(1000)) == 1000
+    assert asyncio.run(bucket.aacquire(100)) == 100
+    assert waits == [pytest.approx(1.0)]
+
+
+class RateLimitError(Exception):
+    pass
+
+
+def test_call_with_retry_repeats_rate_limit_errors(clock, monkeypatch):
+    monkeypatch.setattr(rate_limit, "backoff_delay", lambda attempt, error=None: 0.5)
+    calls = []
+
+    def call():
+        calls.append(1)
+        if len(calls) < 3:
+            raise RateLimitError()
+        return "ok"
+
+    assert call_with_retry(call, max_retries=5) == "ok"
+    assert len(calls) == 3
+    assert clock.slept == pytest.approx(1.0)
+
+
+def test_call_with_retry_gives_up(clock, monkeypatch):
+    monkeypatch.setattr(rate_limit, "backoff_delay", lambda attempt, error=None: 0)
+
+    def call():
+        raise RateLimitError()
+
+    with pytest.raises(RateLimitError):
+        call_with_retry(call, max_retries=2)
+
+
+def test_other_errors_are_not_retried(clock):
+    calls = []
+
+    def call():
+        calls.append(1)
+        raise ValueError()
+
+    with pytest.raises(ValueError):
+        call_with_retry(call, max_retries=5)
+    assert len(calls) == 1
+    assert not is_rate_limit_error(ValueError())
+
+
+def test_call_with_retry_respects_can_retry(clock):
+    calls = []
+
+    def call():
+        calls.append(1)
+        raise RateLimitError()
+
+    with pytest.raises(RateLimitError):
+        call_with_retry(call, max_retries=5, can_retry=lambda: False)
+    assert len(calls) == 1
@@ -0,0 +1,99 @@
+"""Testes de services.result_writer: retoma e linhas incompletas"""
+
+import pytest
+
+from services.result_writer import KEY_COLUMN, infer_format, open_result_writer
+
+COLUMNS = [KEY_COLUMN, "url", "error"]
+
+
+@pytest.mark.parametrize("name", ["out.csv", "out.jsonl"])
+def test_completed_keys_after_resume(tmp_path, name):
+    path = tmp_path / name
+    with open_result_writer(path, COLUMNS) as writer:
+        writer.write({"row": 0, "url": "https://a.pt/", "error": ""})
+        writer.write({"row": 1, "url": "https://b.pt/", "error": "timeout"})
+
+    writer = open_result_writer(path, COLUMNS)
+    assert writer.completed_keys() == {0, 1}
+    assert writer.completed_keys(skip_errors=True) == {0}
+
+
+@pytest.mark.parametrize("name", ["out.csv", "out.jsonl"])
+def test_latest_record_wins(tmp_path, name):
+    path = tmp_path / name
+    with open_result_writer(path, COLUMNS) as writer:
+        writer.write({"row": 1, "url": "https://b.pt/", "error": "timeout"})
+        writer.write({"row": 1, "url": "https://b.pt/", "error": ""})
+
+    assert open_result_writer(path, COLUMNS).completed_keys(skip_errors=True) == {1}
+
+
+def test_csv_partial_line_is_truncated(tmp_path):
+    path = tmp_path / "out.csv"
+    with open_result_writer(path, COLUMNS) as writer:
+        writer.write({"row": 0, "url": "https://a.pt/", "error": ""})
+    with path.open("a", encoding="utf-8") as f:
+        f.write("1,https://b.p")
+
+    writer = open_result_writer(path, COLUMNS)
+    assert writer.completed_keys() == {0}
+    assert path.read_text(encoding="utf-8").endswith("\n")
+
+    writer.write({"row": 1, "url": "https://b.pt/", "error": ""})
+    assert writer.completed_keys() == {0, 1}
+
+
+def test_jsonl_partial_line_is_truncated(tmp_path):
+    path = tmp_path / "out.jsonl"
+    with open_result_writer(path, COLUMNS) as writer:
+        writer.write({"row": 0, "url": "https://a.pt/", "error": ""})
+    with path.open("a", encoding="utf-8") as f:
+        f.write('{"row": 1, "url": "https://b')
+
+    writer = open_result_writer(path, COLUMNS)
+    assert writer.completed_keys() == {0}
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 1
+
+
+def test_partial_only_line_empties_file(tmp_path):
+    path = tmp_path / "out.jsonl"
+    path.write_text('{"row": 0', encoding="utf-8")
+
+    assert open_result_writer(path, COLUMNS).completed_keys() == set()
+    assert path.read_bytes() == b""
+
+
+@pytest.mark.parametrize("name", ["out.csv", "out.jsonl", "out.parquet"])
+def test_overwrite_discards_previous_results(tmp_path, name):
+    path = tmp_path / name
+    with open_result_writer(path, COLUMNS, flush_every=1) as writer:
+        writer.write({"row": 0, "url": "https://a.pt/", "error": ""})
+
+    assert open_result_writer(path, COLUMNS).completed_keys() == {0}
+    assert open_result_writer(path, COLUMNS, overwrite=True).completed_keys() == set()
+
+
+def test_parquet_resume_across_parts(tmp_path):
+    path = tmp_path / "out.parquet"
+    with open_result_writer(path, COLUMNS, flush_every=2) as writer:
+        for row in range(5):
+            writer.write({"row": row, "url": f"https://{row}.pt/", "error": ""})
+
+    assert len(list(path.glob("part-*.parquet"))) == 3
+    assert open_result_writer(path, COLUMNS).completed_keys() == set(range(5))
+
+
+def test_csv_with_other_columns_is_rejected(tmp_path):
+    path = tmp_path / "out.csv"
+    with open_result_writer(path, COLUMNS) as writer:
+        writer.write({"row": 0, "url": "https://a.pt/", "error": ""})
+
+    with pytest.raises(ValueError):
+        open_result_writer(path, [KEY_COLUMN, "url"]).completed_keys()
+
+
+def test_infer_format():
+    assert infer_format("x.ndjson") == "jsonl"
+    with pytest.raises(ValueError):
+        infer_format("x.txt")
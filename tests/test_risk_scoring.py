@@ -0,0 +1,92 @@
+"""Testes de services.risk_scoring: score, nível e ranking"""
+
+import pandas as pd
+import pytest
+
+from services.risk_scoring import (
+    CategoryWeight,
+    RiskWeights,
+    UNREACHABLE_LEVEL,
+    default_weights,
+    risk_level,
+    score_counts,
+    score_table,
+)
+
+WEIGHTS = RiskWeights()
+
+
+def counts(vulnerabilities=0, critical_exposed=0, ssl_issues=0, cookie_issues=0):
+    return {"vulnerabilities": vulnerabilities, "critical_exposed": critical_exposed,
+            "ssl_issues": ssl_issues, "cookie_issues": cookie_issues}
+
+
+@pytest.mark.parametrize("values, expected", [
+    (counts(), 0),
+    (counts(vulnerabilities=2), 10),
+    (counts(vulnerabilities=10), 30),
+    (counts(critical_exposed=1, ssl_issues=1), 30),
+    (counts(critical_exposed=5, vulnerabilities=10, ssl_issues=5, cookie_issues=10), 100),
+])
+def test_score_counts(values, expected):
+    assert score_counts(values, WEIGHTS) == expected
+
+
+@pytest.mark.parametrize("score, level", [
+    (100, "CRITICAL"), (80, "CRITICAL"), (79, "HIGH"), (60, "HIGH"),
+    (30, "MEDIUM"), (1, "LOW"), (0, "VERY LOW"),
+])
+def test_risk_level(score, level):
+    assert risk_level(score) == level
+
+
+def test_score_table():
+    table = pd.DataFrame([
+        {**counts(vulnerabilities=2), "reachable": True},
+        {**counts(critical_exposed=2, ssl_issues=2), "reachable": True},
+        {**counts(), "reachable": True},
+        {**counts(critical_exposed=2), "reachable": False},
+        {"vulnerabilities": None, "critical_exposed": None, "ssl_issues": None, "cookie_issues": None,
+         "reachable": None},
+        {**counts(vulnerabilities=2), "reachable": True},
+    ])
+    scored = score_table(table, WEIGHTS)
+
+    assert scored["risk_score"].tolist() == [10, 60, 0, 0, pd.NA, 10]
+    levels = scored["risk_level"]
+    assert levels.drop(4).tolist() == ["LOW", "HIGH", "VERY LOW", UNREACHABLE_LEVEL, "LOW"]
+    assert pd.isna(levels[4])
+    assert scored["risk_rank"].tolist() == [2, 1, 4, pd.NA, pd.NA, 2]
+    assert "risk_score" not in table.columns
+
+
+def test_score_table_without_reachable_column():
+    table = pd.DataFrame([counts(ssl_issues=1), counts(cookie_issues=3)])
+    scored = score_table(table, WEIGHTS)
+    assert scored["risk_score"].tolist() == [10, 6]
+    assert scored["risk_rank"].tolist() == [1, 2]
+
+
+def test_score_table_matches_score_counts():
+    rows = [counts(v, c, s, k) for v in (0, 3) for c in (0, 1) for s in (0, 2) for k in (0, 4)]
+    scored = score_table(pd.DataFrame(rows), WEIGHTS)
+    assert scored["risk_score"].tolist() == [score_counts(row, WEIGHTS) for row in rows]
+
+
+def test_parse_weights():
+    weights = RiskWeights.parse("critical_exposed=25:50, cookie_issues=1")
+    assert weights.critical_exposed == CategoryWeight(25, 50)
+    assert weights.cookie_issues == CategoryWeight(1, 10)
+    assert weights.vulnerabilities == WEIGHTS.vulnerabilities
+    assert RiskWeights.parse("") == WEIGHTS
+
+
+@pytest.mark.parametrize("spec", ["desconhecida=1", "ssl_issues=x", "ssl_issues=1:y"])
+def test_parse_weights_invalid(spec):
+    with pytest.raises(ValueError):
+        RiskWeights.parse(spec)
+
+
+def test_default_weights_from_env(monkeypatch):
+    monkeypatch.setenv("LEADGEN_RISK_WEIGHTS", "ssl_issues=15")
+    assert default_weights().ssl_issues == CategoryWeight(15, 20)
@@ -0,0 +1,125 @@
+"""Testes de orchestration.security_workflow: reaproveitamento da cache e prazo dos checks"""
+
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+import pytest
+
+from orchestration import security_workflow
+from services.cache import ScanCache, scan_cache as scan_cache_module
+from services.deadline import Deadline, current_deadline
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+class FakeGraph:
+    """Grafo que reaproveita as secções em cache e refaz as restantes"""
+
+    def __init__(self):
+        self.runs = 0
+
+    def stream(self, state, config=None, stream_mode=None):
+        self.runs += 1
+        cached = state["cached_sections"]
+        report = {
+            "url": state["url"],
+            "ssl_advanced": cached.get("ssl_advanced", {"findings": [], "scan": self.runs}),
+            "headers_check": cached.get("headers_check", {"findings": [], "scan": self.runs}),
+            "reachable": True,
+            "timed_out": [],
+        }
+        yield {"aggregate_results": {"final_report": report}}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(scan_cache_module, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch, clock):
+    cache = ScanCache(tmp_path / "scan.sqlite3", ttls={"ssl_advanced": 100, "headers_check": 10}, version="t")
+    monkeypatch.setattr(security_workflow, "get_scan_cache", lambda: cache)
+    return cache
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    graph = FakeGraph()
+    monkeypatch.setattr(security_workflow, "get_security_graph", lambda: graph)
+    return graph
+
+
+def test_reused_section_keeps_original_expiry(cache, graph, clock):
+    url = "https://x.pt/"
+    security_workflow.run_security_check(url, llm_mode="skip")
+    assert set(cache.get_sections(url)) == {"ssl_advanced", "headers_check"}
+
+    # headers_check expira e força um scan parcial que reaproveita ssl_advanced
+    clock.now += 20
+    report = security_workflow.run_security_check(url, llm_mode="skip")
+    assert graph.runs == 2
+    assert report["ssl_advanced"]["scan"] == 1
+    assert report["headers_check"]["scan"] == 2
+
+    # ssl_advanced expira 100s depois do primeiro scan, não do segundo
+    clock.now += 85
+    assert set(cache.get_sections(url)) == set()
+
+
+def test_complete_cache_skips_graph(cache, graph, clock):
+    url = "https://x.pt/"
+    security_workflow.run_security_check(url, llm_mode="skip")
+    clock.now += 5
+    report = security_workflow.run_security_check(url, llm_mode="skip")
+
+    assert graph.runs == 1
+    assert report["from_cache"] is True
+
+
+def sleeping_check(seconds):
+    @security_workflow._within_deadline("headers_check")
+    def check(state):
+        assert current_deadline() is state["deadline"]
+        time.sleep(seconds)
+        return {"headers_check": {"findings": []}}
+    return check
+
+
+def test_check_within_deadline_keeps_result():
+    update = sleeping_check(0.01)({"deadline": Deadline(5)})
+    assert update == {"headers_check": {"findings": []}}
+
+
+def test_check_past_deadline_is_timed_out():
+    update = sleeping_check(0.2)({"deadline": Deadline(0.05)})
+    assert update == {"headers_check": security_workflow.TIMED_OUT, "timed_out": ["headers_check"]}
+
+
+def test_check_after_expired_deadline_does_not_run():
+    deadline = Deadline(0)
+    calls = []
+
+    @security_workflow._within_deadline("headers_check")
+    def check(state):
+        calls.append(1)
+        return {}
+
+    assert check({"deadline": deadline})["timed_out"] == ["headers_check"]
+    assert calls == []
+
+
+def test_concurrent_checks_do_not_queue_against_deadline():
+    # Muitos checks em simultâneo (ex: batch): o prazo mede só o tempo de cada um
+    checks = [sleeping_check(0.1) for _ in range(100)]
+    with ThreadPoolExecutor(max_workers=100) as pool:
+        updates = list(pool.map(lambda check: check({"deadline": Deadline(1)}), checks))
+    assert all("timed_out" not in update for update in updates)